@@ -4,11 +4,11 @@ import platform
 import sqlite3
 import re
 import glob
+import multiprocessing
+from collections import OrderedDict
 import paramiko
-from io import BytesIO
 import qrcode
-from scipy.signal import savgol_filter
-import matplotlib.pyplot as plt
+from matplotlib import colormaps
 from matplotlib.ticker import AutoLocator, FormatStrFormatter
 
 # Import Qt components
@@ -17,13 +17,13 @@ from PyQt6.QtWidgets import (
     QFrame, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
     QListWidget, QListWidgetItem, QGridLayout, QLabel, QDateEdit,
     QFileDialog, QMessageBox, QInputDialog, QStackedWidget, 
-    QTableView, QStatusBar, QHeaderView
+    QTableView, QStatusBar, QHeaderView, QProgressBar, QCheckBox
 )
 from PyQt6.QtGui import (
     QIcon, QPixmap, QImage
 )
 from PyQt6.QtCore import (
-    Qt, QRect, QSize, QRegularExpression, QSortFilterProxyModel
+    Qt, QRect, QSize, QRegularExpression
 )
 # Import validators from the correct location in PyQt6
 from PyQt6.QtGui import QRegularExpressionValidator
@@ -40,148 +40,113 @@ widgets = None
 # from src.customWidgets import *
 
 class WidgetCache:
-    def __init__(self):
-        self.cache = {}
-        
-    def save(self, tab_widget, db_id):
-        widgets = [tab_widget.widget(index) for index in range(tab_widget.count())]
-        self.cache[db_id] = widgets
+    """
+    LRU cache of the tab widgets built for each database.
 
-    def restore(self, tab_widget, db_id):
-        if db_id in self.cache:
-            tab_widget.clear()
-            widgets = self.cache[db_id]
-            for widget in widgets:
-                tab_widget.addTab(widget, widget.windowTitle())
-    def returnCache(self):
-        return self.cache
-    
-class FileListWidgetItem(QWidget):
+    Every entry is weighed by an estimate of the memory its widgets hold (table cells and
+    graph pixmaps). When the total goes over ``maxBytes`` the least recently used
+    databases are evicted and their widgets deleted.
     """
-    A custom widget for displaying file list items in the database explorer.
-
-    Attributes:
-    -----------#+
-    layout : QVBoxLayout#+
-        The vertical layout for arranging the widgets.#+
-#+
-    Methods:#+
-    --------#+
-    __init__(self, file_path: str, parent: QWidget = None)#+
-        Initializes the FileListWidgetItem with the given file path and parent widget.#+
-        Creates and adds necessary widgets to the layout.#+
-    """#+
-#+
-    def __init__(self, file_path: str, parent: QWidget = None):#+
-        """#+
-        Initializes the FileListWidgetItem with the given file path and parent widget.#+
-        Creates and adds necessary widgets to the layout.#+
-#+
-        Parameters:#+
-        -----------#+
-        file_path : str#+
-            The path of the file to be displayed.#+
-        parent : QWidget, optional#+
-            The parent widget for this item. The default is None.#+
-        """#+
-        super().__init__(parent)#+
-#+
-        self.layout = QVBoxLayout()#+
-#+
-        file_name = os.path.basename(file_path)#+
-        file_icon = QIcon(file_path)#+
-#+
-        file_label = QLabel(file_name)#+
-        file_label.setAlignment(Qt.AlignLeft)#+
-        file_label.setPixmap(file_icon.pixmap(32, 32))#+
-#+
-        self.layout.addWidget(file_label)#+
-        self.setLayout(self.layout)#+
-
-    def __init__(self, file_path):
-        super().__init__()
-        
-        self.filePath = file_path
-        self.fileName = os.path.basename(file_path)
-        self.fileBaseName = os.path.splitext(self.fileName)[0]
-        
-        self.initUI()
-    
-    def initUI(self):
-        layout = QVBoxLayout()  
-        
-        self.nameLabel = QLabel(self.formatString(self.fileBaseName))
-        self.nameLabel.setFixedHeight(30)
-        self.nameLabel.setAlignment(Qt.AlignCenter)
-            
-        layout.addWidget(self.nameLabel)
-        layout.setAlignment(Qt.AlignCenter)        
-        self.setLayout(layout)
-        
-    @staticmethod
-    def formatString(string):
-        formattedString = string.replace('_', ' ')
-        formattedString = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', formattedString)
-        
-        return formattedString
-    
 
-class CustomFilterProxyModel(QSortFilterProxyModel):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.test_id = ""
-        self.selected_date = ""
+    BYTES_PER_CELL = 64
 
-    def setTestID(self, test_id):
-        self.test_id = test_id
-        self.invalidateFilter()
+    def __init__(self, maxBytes=Settings.WIDGET_CACHE_MAX_BYTES, onChange=None):
+        self.cache = OrderedDict()
+        self.sizes = {}
+        self.maxBytes = maxBytes
+        self.totalBytes = 0
+        self.onChange = onChange
 
-    def setSelectedDate(self, selected_date):
-        self.selected_date = selected_date
-        self.invalidateFilter()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
-    def filterAcceptsRow(self, source_row, source_parent):
-        model = self.sourceModel()
-        if not model:
-            return True
+    def save(self, tab_widget, db_id):
+        widgets = [tab_widget.widget(index) for index in range(tab_widget.count())]
+        self.cache[db_id] = widgets
+        self.cache.move_to_end(db_id)
+        self.updateSize(db_id)
+        self.evict(keep=db_id)
 
-        # Default to accepting the row if no filters are set
-        if not self.test_id and not self.selected_date:
-            return True
-            
-        # Find the TestID column (usually column 0, but let's make sure)
-        test_id_column = 0
-        for col in range(model.columnCount()):
-            header = model.headerData(col, Qt.Orientation.Horizontal)
-            if isinstance(header, str) and "id" in header.lower():
-                test_id_column = col
-                break
-                
-        # Find the Date column (usually column 1, but let's check)
-        date_column = 1
-        for col in range(model.columnCount()):
-            header = model.headerData(col, Qt.Orientation.Horizontal)
-            if isinstance(header, str) and "date" in header.lower() or "tarih" in header.lower():
-                date_column = col
+    def restore(self, tab_widget, db_id):
+        if db_id not in self.cache:
+            self.misses += 1
+            self.notify()
+            return False
+
+        self.hits += 1
+        self.cache.move_to_end(db_id)
+        tab_widget.clear()
+        widgets = self.cache[db_id]
+        for widget in widgets:
+            tab_widget.addTab(widget, widget.windowTitle())
+
+        # Paged tables may have grown since they were saved
+        self.updateSize(db_id)
+        self.evict(keep=db_id)
+        return True
+
+    def updateSize(self, db_id):
+        size = sum(self.estimateSize(widget) for widget in self.cache[db_id])
+        self.totalBytes += size - self.sizes.get(db_id, 0)
+        self.sizes[db_id] = size
+
+    def evict(self, keep=None):
+        while self.totalBytes > self.maxBytes:
+            db_id = next((key for key in self.cache if key != keep), None)
+            if db_id is None:
                 break
+            self.remove(db_id)
+            self.evictions += 1
+        self.notify()
 
-        # Get the data for filtering
-        test_id_index = model.index(source_row, test_id_column, source_parent)
-        date_index = model.index(source_row, date_column, source_parent)
-        
-        # Get the actual data
-        test_id_data = str(model.data(test_id_index) or "")
-        date_data = str(model.data(date_index) or "")
-        
-        # Debug output
-        print(f"Filtering row {source_row}: TestID '{test_id_data}' against '{self.test_id}', Date '{date_data}' against '{self.selected_date}'")
+    def remove(self, db_id):
+        widgets = self.cache.pop(db_id, [])
+        self.totalBytes -= self.sizes.pop(db_id, 0)
+        for widget in widgets:
+            self.releaseWidget(widget)
 
-        # Filter logic: test_id_matches is True if test_id is empty or if it's in the data
-        test_id_matches = not self.test_id or self.test_id in test_id_data
-        date_matches = not self.selected_date or self.selected_date in date_data
+    @staticmethod
+    def releaseWidget(widget):
+        for view in widget.findChildren(QTableView):
+            model = view.model()
+            if isinstance(model, SQLiteTableModel):
+                model.close()
+        widget.deleteLater()
+
+    @classmethod
+    def estimateSize(cls, widget):
+        size = 0
+        # QTableWidget is a QTableView as well
+        for view in widget.findChildren(QTableView):
+            model = view.model()
+            if model is not None:
+                size += model.rowCount() * model.columnCount() * cls.BYTES_PER_CELL
+        for label in widget.findChildren(QLabel):
+            pixmap = label.pixmap()
+            if pixmap is not None and not pixmap.isNull():
+                size += pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        for canvas in widget.findChildren(PlotCanvas):
+            size += canvas.imageBytes()
+        return size
+
+    def stats(self):
+        return {
+            'entries': len(self.cache),
+            'bytes': self.totalBytes,
+            'maxBytes': self.maxBytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
 
-        return test_id_matches and date_matches
+    def notify(self):
+        if self.onChange is not None:
+            self.onChange(self.stats())
 
+    def returnCache(self):
+        return self.cache
+    
 class TableItem:
     def __init__(self, data):
         self._data = data
@@ -210,12 +175,16 @@ class MainWindow(QMainWindow):
         self.ui.setupUi(self)
         self.lastSelectedRow = None
         self.widgetCache = WidgetCache()
+        self.taskManager = TaskManager(self)
+        self.prefetcher = Prefetcher(self.taskManager, self)
         global widgets
         widgets = self.ui
 
         self.initUI()
 
-        self.addDataBaseFromDir("./databases")
+        self.databaseDir = "./databases"
+        self.setupDatabaseList()
+        self.addDataBaseFromDir(self.databaseDir)
         self.add_component_row()
 
         self.ui.addDatabaseButton.clicked.connect(self.addDatabase)
@@ -273,6 +242,9 @@ class MainWindow(QMainWindow):
         # ///////////////////////////////////////////////////////////////
         self.show()
 
+        # Report charts are drawn by worker processes, started once the window is up
+        QTimer.singleShot(0, startChartPool)
+
         # SET CUSTOM THEME
         # ///////////////////////////////////////////////////////////////
         useCustomTheme = True
@@ -323,6 +295,20 @@ class MainWindow(QMainWindow):
         widgets.btn_generate_pdf_1.clicked.connect(self.make_pdf)
         widgets.btn_generate_qr_1.clicked.connect(self.make_qrcode)
 
+        # Pick up tests the instruments write while a database is open
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.timeout.connect(self.refreshOpenTables)
+        self.refreshTimer.timeout.connect(self.updateSearchIndex)
+        self.refreshTimer.start(Settings.DB_REFRESH_INTERVAL)
+        self.updateSearchIndex()
+
+        # React to databases copied into, replaced in or removed from the directory
+        self.databaseWatcher = DatabaseWatcher(self.databaseDir, parent=self)
+        self.databaseWatcher.added.connect(self.onDatabaseAdded)
+        self.databaseWatcher.removed.connect(self.onDatabaseRemoved)
+        self.databaseWatcher.replaced.connect(self.onDatabaseReplaced)
+        self.databaseWatcher.grown.connect(self.onDatabaseGrown)
+
     def initUI(self):
         # Apply modern design principles to the entire UI
         self.setStyleSheet("""
@@ -486,35 +472,14 @@ class MainWindow(QMainWindow):
             }
         """)
         
-        # Style the list widget for databases
+        # Style the list view for databases, DatabaseItemDelegate paints the entries
         self.ui.listWidget.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: rgb(44, 49, 58);
                 border-radius: 5px;
                 border: 1px solid rgb(52, 59, 72);
                 padding: 5px;
             }
-            QListWidget::item {
-                background-color: rgb(52, 59, 72);
-                margin: 5px;
-                border-radius: 5px;
-                border: 1px solid rgb(44, 49, 58);
-                padding: 8px;
-            }
-            QListWidget::item:hover {
-                background-color: rgb(57, 65, 80);
-                border: 1px solid rgb(61, 70, 86);
-            }
-            QListWidget::item:selected {
-                background-color: rgb(189, 147, 249);
-                border: 1px solid rgb(170, 132, 255);
-            }
-            QLabel {
-                background: transparent;
-                border: none;
-                color: rgb(221, 221, 221);
-                font-weight: bold;
-            }
         """)
         
         # Style table views
@@ -565,6 +530,7 @@ class MainWindow(QMainWindow):
         # Apply filter section improvements
         self.setupSearchFunctionality()
         self.styleFilterSection()
+        self.setupComparison()
         
         # Add tooltips for better usability
         self.addTooltips()
@@ -725,17 +691,41 @@ class MainWindow(QMainWindow):
         test_id_label = QLabel("Test ID:", filter_frame)
         test_id_label.setAlignment(Qt.AlignLeft)
         self.ui.testID.setPlaceholderText("Enter Test ID")
+        self.ui.testID.setMaxLength(MAX_ID_DIGITS)
+        self.exactIdCheck = QCheckBox("Exact match", filter_frame)
         test_id_layout.addWidget(test_id_label)
         test_id_layout.addWidget(self.ui.testID)
+        test_id_layout.addWidget(self.exactIdCheck)
         controls_layout.addLayout(test_id_layout)
         
-        # Date section
+        # Date range section, only applied when checked
         date_layout = QVBoxLayout()
-        date_label = QLabel("Test Date:", filter_frame)
-        date_label.setAlignment(Qt.AlignLeft)
-        date_layout.addWidget(date_label)
-        date_layout.addWidget(self.ui.testdate)
+        self.dateRangeCheck = QCheckBox("Test Date between:", filter_frame)
+        self.testDateTo = QDateEdit(QDate.currentDate(), filter_frame)
+        self.testDateTo.setCalendarPopup(True)
+        for dateEdit in (self.ui.testdate, self.testDateTo):
+            dateEdit.setEnabled(False)
+            self.dateRangeCheck.toggled.connect(dateEdit.setEnabled)
+        date_range_layout = QHBoxLayout()
+        date_range_layout.addWidget(self.ui.testdate)
+        date_range_layout.addWidget(self.testDateTo)
+        date_layout.addWidget(self.dateRangeCheck)
+        date_layout.addLayout(date_range_layout)
         controls_layout.addLayout(date_layout)
+
+        # Operator and standard sections
+        self.operatorFilter = QLineEdit(filter_frame)
+        self.operatorFilter.setPlaceholderText("Operator")
+        self.standardFilter = QLineEdit(filter_frame)
+        self.standardFilter.setPlaceholderText("Standard")
+        for labelText, lineEdit in (("Operator:", self.operatorFilter), ("Standard:", self.standardFilter)):
+            text_layout = QVBoxLayout()
+            text_label = QLabel(labelText, filter_frame)
+            text_label.setAlignment(Qt.AlignLeft)
+            lineEdit.setStyleSheet("background-color: rgb(33, 37, 43);")
+            text_layout.addWidget(text_label)
+            text_layout.addWidget(lineEdit)
+            controls_layout.addLayout(text_layout)
         
         # Buttons section
         button_layout = QVBoxLayout()
@@ -763,12 +753,67 @@ class MainWindow(QMainWindow):
         self.ui.resetFilterButton.setIcon(QIcon("icons/reset.png"))  # Make sure this icon exists
         self.ui.resetFilterButton.setIconSize(QSize(16, 16))
         
+        # Runs the date range on every listed database at once
+        self.allDatabasesButton = QPushButton("All Databases", filter_frame)
+        self.allDatabasesButton.clicked.connect(self.queryAllDatabases)
+
         buttons_row.addWidget(self.ui.filtersearch)
         buttons_row.addWidget(self.ui.resetFilterButton)
+        buttons_row.addWidget(self.allDatabasesButton)
         button_layout.addLayout(buttons_row)
+
+        # Jumps the current table to a test id or date
+        self.jumpField = QLineEdit(filter_frame)
+        self.jumpField.setPlaceholderText("Go to Test ID or yyyy-mm-dd")
+        self.jumpField.setStyleSheet("background-color: rgb(33, 37, 43);")
+        self.jumpField.returnPressed.connect(self.jumpToTest)
+        button_layout.addWidget(self.jumpField)
+
+        # Runs "last value of a curve column above a threshold" on every listed database at once
+        self.finalColumnField = QLineEdit(filter_frame)
+        self.finalColumnField.setPlaceholderText("Column, e.g. Sicaklik")
+        self.finalThresholdField = QLineEdit(filter_frame)
+        self.finalThresholdField.setPlaceholderText("Final value above")
+        self.finalThresholdField.setValidator(QDoubleValidator(self.finalThresholdField))
+        for lineEdit in (self.finalColumnField, self.finalThresholdField):
+            lineEdit.setStyleSheet("background-color: rgb(33, 37, 43);")
+            lineEdit.returnPressed.connect(self.queryFinalValues)
+        self.finalValuesButton = QPushButton("Final Above", filter_frame)
+        self.finalValuesButton.clicked.connect(self.queryFinalValues)
+        final_values_row = QHBoxLayout()
+        final_values_row.addWidget(self.finalColumnField)
+        final_values_row.addWidget(self.finalThresholdField)
+        final_values_row.addWidget(self.finalValuesButton)
+        button_layout.addLayout(final_values_row)
         
         controls_layout.addLayout(button_layout)
         filter_layout.addLayout(controls_layout)
+
+        # Full-text search over the tests of every listed database
+        self.globalSearch = QLineEdit(filter_frame)
+        self.globalSearch.setPlaceholderText("Search all databases: sample, request no, operator, material code")
+        self.globalSearch.setStyleSheet("background-color: rgb(33, 37, 43);")
+        self.searchResults = QListWidget(filter_frame)
+        self.searchResults.setMaximumHeight(150)
+        self.searchResults.hide()
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(200)
+        self.searchTimer.timeout.connect(self.runGlobalSearch)
+        self.globalSearch.textChanged.connect(self.searchTimer.start)
+        self.globalSearch.returnPressed.connect(self.runGlobalSearch)
+        self.searchResults.itemActivated.connect(self.openSearchHit)
+        self.searchResults.itemClicked.connect(self.openSearchHit)
+        filter_layout.addWidget(self.globalSearch)
+        filter_layout.addWidget(self.searchResults)
+
+        # Merged tests of all databases, filled in date order as the databases answer
+        self.fanOutModel = None
+        self.fanOutView = QTableView(filter_frame)
+        self.fanOutView.setSelectionBehavior(QTableView.SelectRows)
+        self.fanOutView.setMaximumHeight(200)
+        self.fanOutView.hide()
+        filter_layout.addWidget(self.fanOutView)
         
         # Add the filter frame to the home layout
         # Note: You may need to adjust this based on your existing layout
@@ -797,219 +842,175 @@ class MainWindow(QMainWindow):
         
         # Add initial message
         self.statusBar.showMessage("Ready")
+
+        # Tab cache usage, kept up to date by the cache itself
+        self.cacheStatsLabel = QLabel()
+        self.cacheStatsLabel.setStyleSheet("color: rgb(150, 150, 150); padding-right: 10px;")
+        self.statusBar.addPermanentWidget(self.cacheStatsLabel)
+        self.widgetCache.onChange = self.showCacheStats
+        self.showCacheStats(self.widgetCache.stats())
+
+        # Progress of the background database tasks
+        self.taskProgressBar = QProgressBar()
+        self.taskProgressBar.setMaximumWidth(200)
+        self.taskProgressBar.setMaximumHeight(14)
+        self.taskProgressBar.setTextVisible(False)
+        self.taskProgressBar.hide()
+        self.statusBar.addPermanentWidget(self.taskProgressBar)
+        self.taskManager.progressChanged.connect(self.showTaskProgress)
+        self.taskManager.idle.connect(self.taskProgressBar.hide)
         
         # Connect signals to update status
         self.ui.filtersearch.clicked.connect(lambda: self.statusBar.showMessage("Filtering data..."))
         self.ui.resetFilterButton.clicked.connect(lambda: self.statusBar.showMessage("Filters reset"))
         self.ui.addDatabaseButton.clicked.connect(lambda: self.statusBar.showMessage("Select a database file to add"))
-        self.ui.listWidget.itemClicked.connect(lambda: self.statusBar.showMessage("Loading database..."))
+        self.ui.listWidget.clicked.connect(lambda: self.statusBar.showMessage("Loading database..."))
         self.ui.createReportButton.clicked.connect(lambda: self.statusBar.showMessage("Generating report..."))
 
+    def showCacheStats(self, stats):
+        self.cacheStatsLabel.setText(
+            f"Cache: {stats['entries']} DB, {stats['bytes'] / 2**20:.1f}/{stats['maxBytes'] / 2**20:.0f} MB | "
+            f"hits {stats['hits']}, misses {stats['misses']}, evictions {stats['evictions']}"
+        )
+        connections = connectionPool.stats()
+        queries = queryCache.stats()
+        plots = plotCache.stats()
+        self.cacheStatsLabel.setToolTip(
+            f"SQLite connections opened {connections['opened']}, reused {connections['reused']}\n"
+            f"Query results: {queries['entries']}, {queries['bytes'] / 2**20:.1f}/{queries['maxBytes'] / 2**20:.0f} MB, "
+            f"hit rate {queries['hitRate']:.0%} ({queries['hits']} + {queries['diskHits']} from disk, {queries['misses']} misses)\n"
+            f"Plots: hit rate {plots['hitRate']:.0%} ({plots['hits']} + {plots['diskHits']} from disk, {plots['misses']} rendered)"
+        )
+
+    def showTaskProgress(self, message, done, total):
+        # An unknown total shows a busy indicator
+        self.taskProgressBar.setRange(0, max(total, 0))
+        self.taskProgressBar.setValue(min(done, total) if total > 0 else 0)
+        self.taskProgressBar.show()
+        self.statusBar.showMessage(f"{message}: {done}/{total} rows" if total > 0 else f"{message}...")
+
     def addTooltips(self):
         """Add helpful tooltips to UI elements"""
-        self.ui.testID.setToolTip("Enter the Test ID to filter by")
-        self.ui.testdate.setToolTip("Select a date to filter tests by date")
+        self.ui.testID.setToolTip("Enter the Test ID, or its first digits, to filter by")
+        self.ui.testdate.setToolTip("First day of the date range")
+        self.exactIdCheck.setToolTip("Match the Test ID exactly instead of by its first digits")
+        self.testDateTo.setToolTip("Last day of the date range")
+        self.operatorFilter.setToolTip("Part of the operator's name")
+        self.standardFilter.setToolTip("Part of the standard's name")
         self.ui.filtersearch.setToolTip("Apply the filter to find matching tests")
         self.ui.resetFilterButton.setToolTip("Clear all filters and show all data")
+        self.allDatabasesButton.setToolTip("List the tests of every database within the date range")
+        self.finalColumnField.setToolTip("Curve column to check, e.g. Sicaklik for the VICAT temperature")
+        self.finalThresholdField.setToolTip("List the test lines whose last value of the column is above this")
+        self.finalValuesButton.setToolTip("List the test lines of every database whose last value of the column is above the threshold")
+        self.jumpField.setToolTip("Sort the current table by Test ID or date and scroll to the given one")
         self.ui.addDatabaseButton.setToolTip("Add a new database file")
         self.ui.createReportButton.setToolTip("Generate a report for the selected test")
         self.ui.getDetailsButton.setToolTip("View detailed information for the selected test")
         self.ui.visualizeDataButton.setToolTip("Create visualizations of the selected test data")
+        self.addToComparisonButton.setToolTip("Add the selected tests to the comparison; Ctrl or Shift click selects several, from any database")
+        self.compareButton.setToolTip("Overlay the curves of the tests in the comparison on shared axes")
+        self.clearComparisonButton.setToolTip("Remove every test from the comparison")
 
-    def filterByTestID(self):
-        """Improved filter function with better user feedback"""
-        test_id = self.ui.testID.text().strip()
-        selected_date = self.ui.testdate.date().toString("yyyy-MM-dd")
-
-        # Update status
-        self.statusBar.showMessage(f"Filtering for Test ID: {test_id}, Date: {selected_date}")
+    def setupSearchFunctionality(self):
+        self.ui.filtersearch.clicked.connect(self.filterByTestID)
+        self.ui.resetFilterButton.clicked.connect(self.resetFilter)
 
-        if not test_id and not selected_date:
-            # Show a message to the user
+    def filterByTestID(self):
+        """Filters the table in the current tab in SQLite, against the indexed sidecar copy"""
+        dateRange = self.dateRangeCheck.isChecked()
+        testFilter = TestFilter(
+            testId=self.ui.testID.text(),
+            exactId=self.exactIdCheck.isChecked(),
+            dateFrom=self.ui.testdate.date().toPython() if dateRange else None,
+            dateTo=self.testDateTo.date().toPython() if dateRange else None,
+            operator=self.operatorFilter.text(),
+            standard=self.standardFilter.text(),
+        )
+        self.statusBar.showMessage(f"Filtering with {testFilter.describe()}")
+
+        if testFilter.isEmpty():
             QMessageBox.information(self, "Filter Criteria", "Please enter at least one filter criteria.")
             self.statusBar.showMessage("No filter criteria provided")
             return
 
-        current_tab = self.ui.tabWidget.currentWidget()
-        if not current_tab:
-            QMessageBox.warning(self, "No Tab Selected", "Please select a tab with test data first.")
-            self.statusBar.showMessage("No tab selected for filtering")
+        sourceModel = self.currentTableModel()
+        if sourceModel is None:
+            QMessageBox.warning(self, "No Data View", "No data table found in the current tab.")
+            self.statusBar.showMessage("No data table found for filtering")
             return
-            
-        # Look for QTableView or QTableWidget in the tab
-        tableView = None
-        if current_tab.layout():
-            for i in range(current_tab.layout().count()):
-                widget = current_tab.layout().itemAt(i).widget()
-                if isinstance(widget, QTableView):
-                    tableView = widget
-                    break
-        
-        if not tableView:
-            tableView = current_tab.findChild(QTableView)
-            if not tableView:
-                QMessageBox.warning(self, "No Data View", "No data table found in the current tab.")
-                self.statusBar.showMessage("No data table found for filtering")
-                return
-
-        # Show a "Filtering..." progress message
-        self.statusBar.showMessage("Applying filters, please wait...")
-        QApplication.processEvents()  # Allow the UI to update
-        
-        # Get the current model
-        currentModel = tableView.model()
-        if not currentModel:
-            QMessageBox.warning(self, "No Data Model", "The data table has no model to filter.")
-            self.statusBar.showMessage("No data model found for filtering")
-            return
-            
-        # Determine the source model
-        sourceModel = currentModel
-        if isinstance(currentModel, QSortFilterProxyModel):
-            sourceModel = currentModel.sourceModel()
-        
-        # Create and configure the proxy model
-        proxy_model = CustomFilterProxyModel(tableView)
-        proxy_model.setSourceModel(sourceModel)
-        proxy_model.setTestID(test_id)
-        proxy_model.setSelectedDate(selected_date)
-        
-        # Set the model to the view
-        tableView.setModel(proxy_model)
-        
-        # Set up selection handling
-        self.setupQTableView(tableView, sourceModel)
-        
-        # Show results
-        row_count = proxy_model.rowCount()
-        self.statusBar.showMessage(f"Filter applied: Found {row_count} matching records")
-        
-        # Highlight the first row if available
-        if row_count > 0:
-            tableView.selectRow(0)
-        
-        # Visual feedback for user
-        if row_count == 0:
-            # No results found - show in a subtle, non-intrusive way
-            result_label = QLabel(f"No matches found for the specified criteria", current_tab)
-            result_label.setStyleSheet("color: rgb(255, 170, 127); padding: 10px; font-style: italic;")
-            result_label.setAlignment(Qt.AlignCenter)
-            
-            # Add to layout if possible, or show as overlay
-            if hasattr(current_tab, 'layout') and current_tab.layout():
-                current_tab.layout().addWidget(result_label)
-            else:
-                result_label.setParent(tableView)
-                result_label.move(tableView.width() // 2 - result_label.width() // 2, 
-                                tableView.height() // 2 - result_label.height() // 2)
-                result_label.show()
-                # Schedule removal after 5 seconds
-                QTimer.singleShot(5000, result_label.deleteLater)
 
-    def setupSearchFunctionality(self):
-        self.ui.filtersearch.clicked.connect(self.filterByTestID)
-        self.ui.resetFilterButton.clicked.connect(self.resetFilter)
+        try:
+            adapter = getSchemaAdapter(sourceModel.filePath)
+            where, params = testFilter.compile(adapter, sourceModel.tableName)
+        except ValueError as e:
+            QMessageBox.warning(self, "Filter Criteria", str(e))
+            self.statusBar.showMessage(f"Filter not applied: {e}")
+            return
 
-    def filterByTestID(self):
-        test_id = self.ui.testID.text().strip()
-        selected_date = self.ui.testdate.date().toString("yyyy-MM-dd")
+        sourceModel.setFilter(where, params)
+        row_count = sourceModel.countRows()
+        self.statusBar.showMessage(f"Filter applied: Found {row_count} matching records")
 
-        print(f"Filtering with TestID: '{test_id}', Date: '{selected_date}'")
+    def resetFilter(self):
+        sourceModel = self.currentTableModel()
+        if sourceModel is None:
+            self.statusBar.showMessage("No data table found in the current tab")
+            return
 
-        if not test_id and not selected_date:
-            print("No filter criteria provided")
+        if sourceModel.isFiltered():
+            sourceModel.setFilter(None)
+            self.statusBar.showMessage("Filter reset, showing all rows")
+
+        # Clear the filter fields
+        self.ui.testID.clear()
+        self.operatorFilter.clear()
+        self.standardFilter.clear()
+        self.exactIdCheck.setChecked(False)
+        self.dateRangeCheck.setChecked(False)
+        self.testDateTo.setDate(QDate.currentDate())
+
+    def jumpToTest(self):
+        """Sorts the current table by test id or date and scrolls to the first test at or after the given one"""
+        text = self.jumpField.text().strip()
+        sourceModel = self.currentTableModel()
+        if not text or sourceModel is None:
             return
 
-        current_tab = self.ui.tabWidget.currentWidget()
-        if not current_tab:
-            print("No current tab selected")
+        if re.fullmatch(r'\d{4}-\d{2}-\d{2}', text):
+            role, value = 'date', text
+        elif text.isdigit():
+            role, value = 'testId', int(text)
+        else:
+            QMessageBox.information(self, "Go To", "Enter a Test ID or a date as yyyy-mm-dd.")
             return
-            
-        # Look for QTableView or QTableWidget in the tab
-        tableView = None
-        if current_tab.layout():
-            for i in range(current_tab.layout().count()):
-                widget = current_tab.layout().itemAt(i).widget()
-                if isinstance(widget, QTableView):
-                    tableView = widget
-                    print("Found QTableView in tab")
-                    break
-        
-        if not tableView:
-            tableView = current_tab.findChild(QTableView)
-            if tableView:
-                print("Found QTableView with findChild")
-            else:
-                print("No QTableView found in the current tab")
-                return
 
-        # Get the current model
-        currentModel = tableView.model()
-        if not currentModel:
-            print("No model found in the TableView")
+        column = getSchemaAdapter(sourceModel.filePath).roles.get(sourceModel.tableName, {}).get(role)
+        if column is None:
+            self.statusBar.showMessage(f"This table has no {'date' if role == 'date' else 'Test ID'} column")
             return
-            
-        # Determine the source model
-        sourceModel = currentModel
-        if isinstance(currentModel, QSortFilterProxyModel):
-            sourceModel = currentModel.sourceModel()
-            print("Using existing proxy model's source")
-        
-        print(f"Source model found with {sourceModel.rowCount()} rows and {sourceModel.columnCount()} columns")
-        
-        # Create and configure the proxy model
-        proxy_model = CustomFilterProxyModel(tableView)
-        proxy_model.setSourceModel(sourceModel)
-        proxy_model.setTestID(test_id)
-        proxy_model.setSelectedDate(selected_date)
-        
-        # Set the model to the view
-        tableView.setModel(proxy_model)
-        
-        # Set up selection handling
-        self.setupQTableView(tableView, sourceModel)
-        
-        print(f"Filter applied, view now shows {proxy_model.rowCount()} rows")
 
-    def resetFilter(self):
-        print("Resetting filter")
+        row = sourceModel.seek(column, value)
+        tableView = self.ui.tabWidget.currentWidget().findChild(QTableView)
+        # Same order as the model's, so the view does not sort again
+        tableView.horizontalHeader().setSortIndicator(sourceModel.columns.index(column),
+                                                      Qt.DescendingOrder if sourceModel.descending else Qt.AscendingOrder)
+        if row < sourceModel.rowCount():
+            tableView.selectRow(row)
+            tableView.scrollTo(sourceModel.index(row, 0), QTableView.PositionAtTop)
+            self.statusBar.showMessage(f"Moved to {text}")
+        else:
+            self.statusBar.showMessage(f"No test after {text}")
+
+    def currentTableModel(self):
+        """Returns the SQLiteTableModel shown in the current tab, if any"""
         current_tab = self.ui.tabWidget.currentWidget()
-        if not current_tab:
-            print("No current tab selected")
-            return
-            
-        # Look for QTableView in the tab
-        tableView = None
-        if current_tab.layout():
-            for i in range(current_tab.layout().count()):
-                widget = current_tab.layout().itemAt(i).widget()
-                if isinstance(widget, QTableView):
-                    tableView = widget
-                    break
-        
-        if not tableView:
-            tableView = current_tab.findChild(QTableView)
-            if not tableView:
-                print("No QTableView found in the current tab")
-                return
-
-        # Get the current model
-        currentModel = tableView.model()
-        if not currentModel:
-            print("No model found in the TableView")
-            return
-            
-        # If using a proxy model, restore the source model
-        if isinstance(currentModel, QSortFilterProxyModel):
-            sourceModel = currentModel.sourceModel()
-            tableView.setModel(sourceModel)
-            self.setupQTableView(tableView, sourceModel)
-            print("Filter reset, restored original model")
-            
-            # Clear the text fields
-            self.ui.testID.clear()
-            # Reset date to current date
-            self.ui.testdate.setDate(QDate.currentDate())
+        tableView = current_tab.findChild(QTableView) if current_tab else None
+        if tableView is None or isinstance(tableView, QTableWidget):
+            return None
+
+        model = tableView.model()
+        return model if isinstance(model, SQLiteTableModel) else None
 
     def addDataBaseFromDir(self, path):
         if not os.path.isdir(path):
@@ -1018,12 +1019,31 @@ class MainWindow(QMainWindow):
         path = glob.glob(os.path.join(path, '*.db'))
         
         for file_path in path:
-            item_widget = FileListWidgetItem(file_path)
-            item = QListWidgetItem()
-            item.setSizeHint(item_widget.sizeHint())
-            item.setData(Qt.UserRole, file_path)
-            self.ui.listWidget.addItem(item)
-            self.ui.listWidget.setItemWidget(item, item_widget)
+            self.addDatabaseItem(file_path)
+
+    def setupDatabaseList(self):
+        """Backs the database list with a model whose summaries are read in the background"""
+        self.databaseModel = DatabaseListModel(self.databaseDir, taskManager=self.taskManager,
+                                               nameFormatter=self.formatString, parent=self)
+        self.databaseDelegate = DatabaseItemDelegate(self.ui.listWidget)
+        self.databaseModel.dataChanged.connect(self.databaseDelegate.onDataChanged)
+        self.ui.listWidget.setModel(self.databaseModel)
+        self.ui.listWidget.setItemDelegate(self.databaseDelegate)
+        self.ui.listWidget.viewport().setAttribute(Qt.WA_Hover)
+        self.ui.listWidget.setMaximumHeight(76)
+
+    def addDatabaseItem(self, file_path):
+        """Lists a database file unless it is listed already. Returns its index or None"""
+        return self.databaseModel.addDatabase(file_path)
+
+    def findDatabaseItem(self, file_path):
+        """Returns the index of a listed database file, or None"""
+        row = self.databaseModel.findRow(file_path)
+        return self.databaseModel.index(row) if row >= 0 else None
+
+    def selectedDatabase(self):
+        indexes = self.ui.listWidget.selectionModel().selectedIndexes()
+        return indexes[0].data(Qt.UserRole) if indexes else None
 
     def addDatabase(self):
         options = QFileDialog.Options()
@@ -1031,109 +1051,240 @@ class MainWindow(QMainWindow):
         
         if fileName:
             fileName = fileName[0]
-            existingPaths = [self.ui.listWidget.item(i).data(Qt.UserRole) for i in range(self.ui.listWidget.count())]
-            for file in existingPaths:
+            for file in self.listedDatabases():
                 if self.comparePaths(fileName, file, home=os.getcwd()):
                     print(f"File '{fileName}' is already in the list.")
                     return
-            item_widget = FileListWidgetItem(fileName)
-            item = QListWidgetItem()
-            item.setSizeHint(item_widget.sizeHint())
-            item.setData(Qt.UserRole, fileName)
-            self.ui.listWidget.addItem(item)
-            self.ui.listWidget.setItemWidget(item, item_widget)
+            self.addDatabaseItem(fileName)
+            self.databaseWatcher.watch(fileName)
+            self.updateSearchIndex()
+
+    def onDatabaseAdded(self, file_path):
+        if self.addDatabaseItem(file_path) is not None:
+            self.statusBar.showMessage(f"New database: {os.path.basename(file_path)}")
+            self.updateSearchIndex()
+
+    def onDatabaseRemoved(self, file_path):
+        item = self.findDatabaseItem(file_path)
+        if item is None:
+            return
+
+        db_id = item.data(Qt.UserRole)
+        isOpen = self.ui.listWidget.selectionModel().isSelected(item)
+        self.databaseModel.removeDatabase(db_id)
+        if isOpen:
+            self.updateTabs()
+        self.widgetCache.remove(db_id)
+        connectionPool.invalidate(file_path)
+        self.statusBar.showMessage(f"Database removed: {os.path.basename(file_path)}")
+        self.updateSearchIndex()
+
+    def onDatabaseReplaced(self, file_path):
+        """Drops the views built from the old file and rebuilds them if it is the open database"""
+        connectionPool.invalidate(file_path)
+        queryCache.invalidate(file_path)
+        reattachSidecarIndex(file_path)
+
+        item = self.findDatabaseItem(file_path)
+        if item is None:
+            return
+
+        db_id = item.data(Qt.UserRole)
+        isOpen = self.ui.listWidget.selectionModel().isSelected(item)
+        if isOpen:
+            self.taskManager.cancelDatabaseTasks()
+            self.ui.tabWidget.clear()
+            self.lastSelectedRow = None
+        self.widgetCache.remove(db_id)
+        if isOpen:
+            self.populateTabs(db_id)
+
+        self.databaseModel.invalidate(db_id)
+        self.databaseModel.setNote(db_id, f"Replaced at {QTime.currentTime().toString('HH:mm:ss')}")
+        self.statusBar.showMessage(f"Database replaced: {os.path.basename(file_path)}")
+        self.updateSearchIndex()
+
+    def onDatabaseGrown(self, file_path):
+        # Cached views of other databases catch up when they are opened again
+        item = self.findDatabaseItem(file_path)
+        if item is None:
+            return
+
+        if self.ui.listWidget.selectionModel().isSelected(item):
+            self.refreshOpenTables()
+        self.databaseModel.invalidate(file_path)
+        self.databaseModel.setNote(file_path, f"Updated at {QTime.currentTime().toString('HH:mm:ss')}")
+        self.updateSearchIndex()
+
+    def listedDatabases(self):
+        return list(self.databaseModel.filePaths)
+
+    def updateSearchIndex(self):
+        """Indexes the tests added to the listed databases since the last update, in the background"""
+        if not self.taskManager.isRunning(SearchIndexTask):
+            task = SearchIndexTask(self.databaseDir, self.listedDatabases())
+            task.signals.result.connect(self.onSearchIndexUpdated)
+            task.signals.error.connect(self.onTaskError)
+            self.taskManager.start(task)
+
+    def queryAllDatabases(self):
+        """Lists the tests of every listed database within the date range, merged by date"""
+        if not self.dateRangeCheck.isChecked():
+            QMessageBox.information(self, "Filter Criteria", "Please check and set the test date range.")
+            return
+
+        self.runFanOut(TestsBetween(self.ui.testdate.date().toPython(), self.testDateTo.date().toPython()))
+
+    def queryFinalValues(self):
+        """Lists the test lines of every listed database whose last value of a column is above the threshold"""
+        keyword = self.finalColumnField.text().strip()
+        threshold, valid = self.finalThresholdField.locale().toDouble(self.finalThresholdField.text())
+        if not keyword or not valid:
+            QMessageBox.information(self, "Filter Criteria", "Please enter a column and the value its last reading must be above.")
+            return
+
+        self.runFanOut(FinalValueAbove(keyword, threshold))
+
+    def runFanOut(self, query):
+        if self.fanOutModel is not None:
+            self.fanOutModel.cancel()
+        self.fanOutModel = FanOutResultModel(query, self)
+        self.fanOutModel.finished.connect(self.showFanOutTimings)
+        self.fanOutView.setModel(self.fanOutModel)
+        self.fanOutView.show()
+        self.fanOutModel.run(self.listedDatabases(), self.taskManager)
+
+    def showFanOutTimings(self, timings):
+        model = self.sender()
+        if model is not self.fanOutModel:
+            return
+
+        perDatabase = [
+            f"{name} {timing['rows']} rows in {timing['seconds'] * 1000:.0f} ms"
+            + (f" (first after {timing['first'] * 1000:.0f} ms)" if timing['first'] is not None else "")
+            for name, timing in sorted(timings.items(), key=lambda item: item[1]['seconds'])
+        ]
+        perDatabase += [f"{name} failed: {message}" for name, message in model.errors.items()]
+        self.statusBar.showMessage(f"All databases: {model.rowCount()} rows | " + " | ".join(perDatabase))
+        self.fanOutView.setToolTip("\n".join(perDatabase))
+
+    def onSearchIndexUpdated(self, task, written):
+        if written and self.globalSearch.text().strip():
+            self.runGlobalSearch()
+
+    def runGlobalSearch(self):
+        self.searchTimer.stop()
+        self.searchResults.clear()
+
+        hits = getSearchIndex(self.databaseDir).search(self.globalSearch.text())
+        for hit in hits:
+            line = f", Hat No: {hit.lineNum}" if hit.lineNum is not None else ""
+            item = QListWidgetItem(f"{os.path.basename(hit.filePath)} | Test Id: {hit.testId}{line} | {hit.snippet}")
+            item.setData(Qt.UserRole, hit)
+            self.searchResults.addItem(item)
+
+        self.searchResults.setVisible(bool(hits))
+        if self.globalSearch.text().strip():
+            self.statusBar.showMessage(f"{len(hits)} matching tests")
+
+    def openSearchHit(self, item):
+        """Opens the hit's database, narrows its table to the test and shows the test's details"""
+        hit = item.data(Qt.UserRole)
+
+        listItem = self.findDatabaseItem(hit.filePath)
+        if listItem is None:
+            self.statusBar.showMessage("The database of this test is no longer listed")
+            return
+        self.ui.listWidget.setCurrentIndex(listItem)
+
+        found = self.findTableView(hit.tableName)
+        if found is None:
+            self.statusBar.showMessage(f"No tab shows table '{hit.tableName}'")
+            return
+        tab_index, tableView, sourceModel = found
+        self.ui.tabWidget.setCurrentIndex(tab_index)
+
+        testFilter = TestFilter(str(hit.testId), exactId=True, lineNum=hit.lineNum)
+        where, params = testFilter.compile(getSchemaAdapter(sourceModel.filePath), sourceModel.tableName)
+        sourceModel.setFilter(where, params)
+        sourceModel.fetchAll()
+        self.ui.testID.setText(str(hit.testId))
+        self.exactIdCheck.setChecked(True)
+
+        if sourceModel.rowCount() > 0:
+            tableView.selectRow(0)
+            self.getTestDetails()
+
+    def findTableView(self, table_name):
+        """Returns (tab index, view, SQLiteTableModel) of the tab showing a database table"""
+        for index in range(self.ui.tabWidget.count()):
+            for tableView in self.ui.tabWidget.widget(index).findChildren(QTableView):
+                model = tableView.model()
+                if isinstance(model, SQLiteTableModel) and model.tableName == table_name:
+                    return index, tableView, model
+        return None
 
     def populateTabs(self, file_path):
-        conn = sqlite3.connect(file_path)
-        cursor = conn.cursor()
+        for table_name in getSchemaAdapter(file_path).masterTables:
+            tab = QWidget()
+            tab_layout = QVBoxLayout()
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        
-        regExp = re.compile(re.escape("TestAna"), re.IGNORECASE)
-        
-        for table_name, in tables:
-            pattern = r'[_\-\\p{P}\s]'
-            s = re.sub(pattern, '', table_name)
-            if regExp.search(s):
-                tab = QWidget()
-                tab_layout = QVBoxLayout()  
-                tableWidget = QTableWidget()
-                
-                cursor.execute(f"SELECT * FROM {table_name};")
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                
-                formattedColums = [self.formatString(column) for column in columns]
+            # Rows are paged in from SQLite on the thread pool as the view scrolls
+            model = SQLiteTableModel(file_path, table_name, headerFormatter=self.formatString, taskManager=self.taskManager)
 
-                tableWidget.setColumnCount(len(columns))
-                tableWidget.setHorizontalHeaderLabels(formattedColums)
-                tableWidget.setRowCount(len(rows))
+            tableView = QTableView()
+            tableView.setModel(model)
 
-                for row_idx, row in enumerate(rows):
-                    for col_idx, value in enumerate(row):
-                        item = QTableWidgetItem(str(value))
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                        tableWidget.setItem(row_idx, col_idx, item)
-                        
-                # Create a QSortFilterProxyModel
-                proxy_model = QSortFilterProxyModel()
-                proxy_model.setSourceModel(tableWidget.model())  # Set the source model
-                
-                # Set the proxy model to the table view
-                tableView = QTableView()
-                tableView.setModel(proxy_model)
-                
-                # Set the selection behavior to select entire rows
-                tableView.setSelectionBehavior(QTableView.SelectRows)
-                
-                # Add this line to set the stylesheet for the selected row
-                tableView.setStyleSheet("""
-                    QTableView::item:selected {
-                        background-color: rgb(189, 147, 249); /* Change this color to your preference */
-                    }
-                """)
-                
-                tab_layout.addWidget(tableView)  # Add the table view to the tab layout
-                self.setupQTableView(tableView, tableWidget.model())
-                
-                # Hide the QTableWidget
-                tableWidget.setVisible(False)
-                
-                tableWidget.setSelectionBehavior(QTableWidget.SelectRows)
-                tableWidget.setSelectionMode(QTableWidget.SingleSelection)
-                tableWidget.itemSelectionChanged.connect(self.selectRow)
+            # Clicking a header sorts in SQLite, see SQLiteTableModel.sort
+            tableView.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            tableView.setSortingEnabled(True)
+
+            # Set the selection behavior to select entire rows
+            tableView.setSelectionBehavior(QTableView.SelectRows)
+
+            # Add this line to set the stylesheet for the selected row
+            tableView.setStyleSheet("""
+                QTableView::item:selected {
+                    background-color: rgb(189, 147, 249); /* Change this color to your preference */
+                }
+            """)
+
+            tab_layout.addWidget(tableView)  # Add the table view to the tab layout
+            self.setupQTableView(tableView, model)
+            # Several tests can be selected to be added to the comparison
+            tableView.setSelectionMode(QTableView.ExtendedSelection)
+
+            tab.setLayout(tab_layout)
+            tab.setWindowTitle(self.formatString(table_name))
+            self.ui.tabWidget.addTab(tab, self.formatString(table_name))
 
-                tab_layout.addWidget(tableWidget)
-                tab.setLayout(tab_layout)
-                tab.setWindowTitle(self.formatString(table_name))
-                self.ui.tabWidget.addTab(tab, self.formatString(table_name))
-                
         self.widgetCache.save(self.ui.tabWidget, file_path)
-        conn.close()
     def setupQTableView(self, tableView, sourceModel):
         # Set up selection handling for QTableView
         tableView.setSelectionMode(QTableView.SingleSelection)
         tableView.setSelectionBehavior(QTableView.SelectRows)
         tableView.selectionModel().selectionChanged.connect(self.onTableViewSelectionChanged)
+        # Rows before a jumped-to test are paged in when the view is scrolled to the top
+        tableView.verticalScrollBar().valueChanged.connect(lambda value, view=tableView: self.fetchPreviousRows(view, value))
+
+    def fetchPreviousRows(self, tableView, value):
+        model = tableView.model()
+        if value == tableView.verticalScrollBar().minimum() and isinstance(model, SQLiteTableModel) and model.canFetchPrevious():
+            added = model.fetchPrevious()
+            if added:
+                tableView.scrollTo(model.index(added, 0), QTableView.PositionAtTop)
         
     def onTableViewSelectionChanged(self, selected, deselected):
         indexes = selected.indexes()
         if indexes:
-            proxyModel = self.sender().model()
-            sourceModel = proxyModel.sourceModel()
-            
-            # Get the selected row from the proxy model
-            proxyRow = indexes[0].row()
-            
-            # Convert to source model row if using proxy
-            sourceRow = proxyModel.mapToSource(indexes[0]).row()
+            sourceModel = self.sender().model()
+            sourceRow = indexes[0].row()
             
-            # Store selected row data similar to QTableWidget format
+            # Store selected row data similar to QTableWidget format, keyed by the database's column names
             columns = []
             items = []
             for column in range(sourceModel.columnCount()):
-                headerData = sourceModel.headerData(column, Qt.Horizontal)
+                headerData = sourceModel.columns[column] if isinstance(sourceModel, (SQLiteTableModel, ColumnTableModel)) else sourceModel.headerData(column, Qt.Horizontal)
                 columns.append(headerData)
                 modelIndex = sourceModel.index(sourceRow, column)
                 data = sourceModel.data(modelIndex)
@@ -1142,10 +1293,27 @@ class MainWindow(QMainWindow):
                 items.append(item)
                 
             self.lastSelectedRow = [columns, items] 
+            self.prefetchAround(sourceModel, sourceRow)
+
+    def prefetchAround(self, model, row):
+        """Reads the details and curves of the selected test and the tests next to it in the background"""
+        if not isinstance(model, SQLiteTableModel):
+            return
+
+        adapter = getSchemaAdapter(model.filePath)
+        position = adapter.roleIndexes(model.columns).get('testId')
+        if model.tableName not in adapter.masterTables or position is None:
+            return
+
+        rows = [row]
+        for distance in range(1, Settings.PREFETCH_NEIGHBOURS + 1):
+            rows += [row + distance, row - distance]
+        testIds = [model.store.value(neighbour, position) for neighbour in rows if 0 <= neighbour < model.rowCount()]
+        self.prefetcher.prefetch(model.filePath, testIds, withCurves=adapter.testType in ('DSC-OIT', 'VICAT'))
 
 
     def searchtest(self):
-        conn = sqlite3.connect(file_path)
+        conn = getConnection(file_path)
         cursor = conn.cursor()
 
         testid = self.ui.lineEdit.text()  
@@ -1190,7 +1358,7 @@ class MainWindow(QMainWindow):
                 self.ui.tabWidget.addTab(tab, self.formatString(table_name))
                 
         self.widgetCache.save(self.ui.tabWidget, file_path)
-        conn.close()
+        cursor.close()
 
     
         
@@ -1208,7 +1376,7 @@ class MainWindow(QMainWindow):
             for column in range(tableWidget.columnCount()):
                 item = tableWidget.horizontalHeaderItem(column)
                 if item:
-                    columns.append(item.text())
+                    columns.append(item.data(Qt.UserRole) or item.text())
             self.lastSelectedRow = [columns, selected_items]
             
     def getTestDetails(self):
@@ -1221,92 +1389,82 @@ class MainWindow(QMainWindow):
             print("No test selected or error in finding test details.")
             return
 
-        conn = sqlite3.connect(file_path)
-        cursor = conn.cursor()
+        # Usually prefetched when the test was selected
+        details = self.prefetcher.details(file_path, testId, hatId)
+        if details is not None:
+            for table_name, columns, types, rows in details:
+                self.addDetailTab(file_path, testId, hatId, columns, types).appendRows(rows)
+            return
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        
-        regExp = re.compile(re.escape("TestDetay"), re.IGNORECASE)
-        regExp2 = re.compile(re.escape("TestId"), re.IGNORECASE)
-        pattern = r'[_\-\\p{P}\s]'
-            
-        for table_name, in tables:
-            s = re.sub(pattern, '', table_name)
-            if regExp.search(s):
-                try:
-                    tab = QWidget()
-                    tab_layout = QVBoxLayout()  
-                    tableWidget = QTableWidget()
-                    
-                    cursor.execute(f"SELECT * FROM {table_name};")
-                    rows = cursor.fetchall()
-                    columns = [description[0] for description in cursor.description]
-                    
-                    i = next((column_idx for column_idx, column in enumerate(columns) if regExp2.search(re.sub(pattern, '', column)) is not None), None)
+        # Details are streamed from the indexed sidecar copy on the thread pool
+        task = DetailLoadTask(file_path, testId, hatId)
+        task.signals.started.connect(self.onDetailTableStarted)
+        task.signals.rowsReady.connect(self.onDetailRowsReady)
+        task.signals.error.connect(self.onTaskError)
+        self.taskManager.start(task)
+
+    def onDetailTableStarted(self, task, table):
+        if task.cancelled:
+            return
+
+        table_name, columns, types = table
+        task.targets[table_name] = self.addDetailTab(task.filePath, task.testId, task.lineNum, columns, types)
+
+    def addDetailTab(self, file_path, testId, lineNum, columns, types):
+        """Adds a tab for the detail rows of a test and returns the model to fill it with"""
+        tab = QWidget()
+        tab_layout = QVBoxLayout()
+
+        # The model keeps the columns' own names for findSelectedTest
+        model = ColumnTableModel(columns, types, headerFormatter=self.formatString)
+        tableView = QTableView()
+        tableView.setModel(model)
+        model.setParent(tableView)
+        self.setupQTableView(tableView, model)
+        # Clicking a header sorts the loaded rows by their typed values
+        tableView.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        tableView.setSortingEnabled(True)
+
+        tab_name = f'Test Id: {testId}, Hat No: {lineNum}' if lineNum is not None else f'Test Id: {testId}'
+        tab_layout.addWidget(tableView)
+        tab.setLayout(tab_layout)
+        tab.setWindowTitle(tab_name)
+
+        self.ui.tabWidget.addTab(tab, tab_name)
+        self.widgetCache.save(self.ui.tabWidget, file_path)
+        return model
+
+    def onDetailRowsReady(self, task, batch):
+        table_name, rows = batch
+        model = task.targets.get(table_name)
+        if task.cancelled or model is None:
+            return
+
+        model.appendRows(rows)
+
+    def onTaskError(self, task, message):
+        if not task.cancelled:
+            print(f"Error while {task.description[0].lower() + task.description[1:]}: {message}")
+            self.statusBar.showMessage(f"Error: {message}")
 
-                    filteredRows = [row for row in rows if row[i] == int(testId)]
-                    
-                    formattedColums = [self.formatString(column) for column in columns]
-                                        
-                    tableWidget.setColumnCount(len(columns))
-                    tableWidget.setHorizontalHeaderLabels(formattedColums)
-                    tableWidget.setRowCount(len(filteredRows))
-                    
-                    for row_idx, row in enumerate(filteredRows):
-                        for col_idx, value in enumerate(row):
-                            item = QTableWidgetItem(str(value))
-                            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                            item.setFlags(Qt.ItemIsEnabled)
-                            tableWidget.setItem(row_idx, col_idx, item)
-                            
-                    tableWidget.setSelectionBehavior(QTableWidget.SelectRows)
-                    tableWidget.setSelectionMode(QTableWidget.SingleSelection)
-                    tableWidget.itemSelectionChanged.connect(self.selectRow)
-                    
-                    tab_name = f'Test Id: {testId}, Hat No: {hatId}' if hatId is not None else f'Test Id: {testId}'
-                    tab_layout.addWidget(tableWidget)
-                    tab.setLayout(tab_layout)
-                    tab.setWindowTitle(tab_name)
-                    
-                    self.ui.tabWidget.addTab(tab, tab_name)
-                    self.widgetCache.save(self.ui.tabWidget, file_path)
-                except:
-                    print(f"Error processing table '{table_name}': {e}")
-                    pass
-                
     def findSelectedTest(self):
-        selected_items = self.ui.listWidget.selectedItems()
-        
-        if selected_items and self.lastSelectedRow:
-            remPunct = r'[_\-\\p{P}\s]'
-            patterns = [
-                (re.compile(re.escape("DSCOIT"), re.IGNORECASE), 'DSC-OIT'),
-                (re.compile(re.escape("MFI"), re.IGNORECASE), 'MFI'),
-                (re.compile(re.escape("VICAT"), re.IGNORECASE), 'VICAT')
-            ]
-            
-            selected_item = selected_items[0]
-            file_path = selected_item.data(Qt.UserRole)
-            
+        file_path = self.selectedDatabase()
+        
+        if file_path and self.lastSelectedRow:
             testType = None
 
             if file_path:
-                for pattern, test_type in patterns:
-                    if pattern.search(re.sub(remPunct, '', file_path)) is not None:
-                        testType = test_type
-                
-                regExp = re.compile(re.escape("TestId"), re.IGNORECASE)
-                regExp2 = re.compile(re.escape("Hat"), re.IGNORECASE)
-                
-                if testType == 'VICAT':
-                    if regExp2.search(re.sub(remPunct, '', self.lastSelectedRow[0][1])) is None:
-                        print("00")
-                        return
-
-                # Iterate through the column names and find the column id belonging to 'TestId' and 'HatNum'
-                i = next((column_idx for column_idx, column in enumerate(self.lastSelectedRow[0]) if regExp.search(re.sub(remPunct, '', column)) is not None), None)
-                j = next((column_idx for column_idx, column in enumerate(self.lastSelectedRow[0]) if regExp2.search(re.sub(remPunct, '', column)) is not None), None)
+                adapter = getSchemaAdapter(file_path)
+                testType = adapter.testType
+
+                # Positions of the 'TestId' and 'HatNum' columns in the selected row
+                roles = adapter.roleIndexes(self.lastSelectedRow[0])
+                i = roles.get('testId')
+                j = roles.get('line')
+
+                if testType == 'VICAT' and j is None:
+                    print("00")
+                    return
                 
                 try:
                     testId = int(self.lastSelectedRow[1][i].data(0))
@@ -1336,14 +1494,35 @@ class MainWindow(QMainWindow):
             print("No test selected or error in finding test details.")
             return
         
+        adapter = getSchemaAdapter(file_path)
+        # The MFI results are shown as a table, with their values as stored
+        tabular = testType == 'MFI'
+
+        # Usually prefetched when the test was selected
+        columns = self.prefetcher.curves(file_path, testId, lineNum, adapter.curveColumns, tabular)
+        if columns is not None:
+            self.showTestData(file_path, self.buildTestData(testType, columns))
+            return
+
+        # Curves are read as arrays on the thread pool, whether or not the details are open; only drawing is left to the GUI thread
+        task = CurveLoadTask(file_path, testType, testId, lineNum, adapter.curveColumns, tabular)
+        task.signals.result.connect(self.onCurveLoaded)
+        task.signals.error.connect(self.onTaskError)
+        self.taskManager.start(task)
+
+    def onCurveLoaded(self, task, columns):
+        if task.cancelled:
+            return
+
+        self.showTestData(task.filePath, self.buildTestData(task.testType, columns))
+
+    def showTestData(self, file_path, data):
         tab = QWidget()
         tab_name = 'Test'
         tab_layout = QGridLayout()
         tab.setLayout(tab_layout)
         tab.setWindowTitle(tab_name)
         
-        data = self.getTestData(testType)
-        
         # If data is None or empty, show a message and return
         if not data:
             message_label = QLabel("No data available to visualize")
@@ -1373,7 +1552,7 @@ class MainWindow(QMainWindow):
             
             for row_index, row_data in enumerate(columns):
                 for col_index, item in enumerate(row_data):
-                    cell = QTableWidgetItem(item if isinstance(item, str) and bool(item) else '-')
+                    cell = QTableWidgetItem(self.formatValue(item))
                     cell.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
                     tableWidget.setItem(col_index, row_index, cell)
             
@@ -1393,111 +1572,180 @@ class MainWindow(QMainWindow):
                 yAxises.append(sublist[3])
             
             for index in range(len(dataset)):
-                graphImage = self.createGraph(dataset[index], title=titles[index], xAxis=xAxises[index], yAxis=yAxises[index])
-                graphPixmap = QPixmap.fromImage(graphImage)
-                
-                graphLabel = QLabel()
-                graphLabel.setPixmap(graphPixmap)
-                graphLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                graphCanvas = self.createGraph(dataset[index], title=titles[index], xAxis=xAxises[index], yAxis=yAxises[index])
                 
                 if (len(dataset) % 2 != 0 and index == len(dataset) - 1):
-                    tab_layout.addWidget(graphLabel, index // 2, 0, 1, 2)
+                    tab_layout.addWidget(graphCanvas, index // 2, 0, 1, 2)
                 else:
-                    tab_layout.addWidget(graphLabel, index // 2, index % 2)
-                
-            tab_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                    tab_layout.addWidget(graphCanvas, index // 2, index % 2)
         
         self.ui.tabWidget.addTab(tab, tab_name)
         self.widgetCache.save(self.ui.tabWidget, file_path)
-        
-    def getTestData(self, testType):
-        print(f"Getting data for test type: {testType}")
-        remPunct = r'[_\-\\p{P}\s]'
-        
-        tabExp = re.compile(re.escape("TestId"), re.IGNORECASE)
-        
-        tab = None
-        print(f"Searching through {self.ui.tabWidget.count()} tabs")
-        
-        for index in range(self.ui.tabWidget.count()):
-            tab_text = self.ui.tabWidget.tabText(index)
-            print(f"Checking tab {index}: '{tab_text}'")
-            if tabExp.search(re.sub(remPunct, '', tab_text)):
-                tab = self.ui.tabWidget.widget(index)
-                print(f"Found matching tab: {tab_text}")
-                break
-        
-        if tab is None:
-            print("No tab with TestId found")
-            return []
-                
-        if tab.layout() and tab.layout().count() > 0:
-            # Try to find QTableView or QTableWidget in the tab
-            table = None
-            for i in range(tab.layout().count()):
-                widget = tab.layout().itemAt(i).widget()
-                if isinstance(widget, QTableView):
-                    print("Found QTableView")
-                    table = widget
-                    break
-                elif isinstance(widget, QTableWidget):
-                    print("Found QTableWidget")
-                    table = widget
-                    break
-            
-            if table is None:
-                print("No table widget found in tab")
-                return []
-            
-            print(f"Found table of type: {type(table).__name__}")
+
+    def setupComparison(self):
+        # Tests to overlay as (database, test id, line), kept while other databases are browsed
+        self.comparison = []
+        self.comparisonTasks = {}
+        self.comparisonPending = set()
+        self.comparisonCurves = {}
+
+        self.addToComparisonButton = QPushButton("Add to Comparison", self.ui.buttonsFrame)
+        self.addToComparisonButton.clicked.connect(self.addToComparison)
+        self.compareButton = QPushButton("Compare", self.ui.buttonsFrame)
+        self.compareButton.clicked.connect(self.compareTests)
+        self.clearComparisonButton = QPushButton("Clear Comparison", self.ui.buttonsFrame)
+        self.clearComparisonButton.clicked.connect(self.clearComparison)
+
+        # Next to "Visualize Data"
+        layout = self.ui.horizontalLayout_14
+        position = layout.indexOf(self.ui.visualizeDataButton)
+        for offset, button in enumerate((self.addToComparisonButton, self.compareButton, self.clearComparisonButton)):
+            layout.insertWidget(position + offset + 1, button)
+        self.showComparisonCount()
+
+    def showComparisonCount(self):
+        self.compareButton.setText(f"Compare ({len(self.comparison)})")
+        self.compareButton.setEnabled(bool(self.comparison))
+        self.clearComparisonButton.setEnabled(bool(self.comparison))
+
+    def addToComparison(self):
+        """Adds the tests of the rows selected in the current table to the comparison"""
+        file_path = self.selectedDatabase()
+        tab = self.ui.tabWidget.currentWidget()
+        tableView = tab.findChild(QTableView) if tab is not None else None
+        model = tableView.model() if tableView is not None else None
+        if not file_path or not isinstance(model, SQLiteTableModel):
+            self.statusBar.showMessage("Select tests in a test table to compare them")
+            return
+
+        adapter = getSchemaAdapter(file_path)
+        roles = adapter.roleIndexes(model.columns)
+        if adapter.comparisonColumns is None or 'testId' not in roles:
+            self.statusBar.showMessage(f"{adapter.testType} results cannot be overlaid")
+            return
+        # Only curves of the same kind share axes
+        comparedType = getSchemaAdapter(self.comparison[0][0]).testType if self.comparison else adapter.testType
+        if comparedType != adapter.testType:
+            self.statusBar.showMessage(f"The comparison holds {comparedType} tests, clear it to compare {adapter.testType} tests")
+            return
+
+        for index in tableView.selectionModel().selectedRows():
+            testId = model.store.value(index.row(), roles['testId'])
+            lineNum = model.store.value(index.row(), roles['line']) if 'line' in roles else None
+            try:
+                key = (os.path.abspath(file_path), int(testId), None if lineNum is None else int(lineNum))
+            except (TypeError, ValueError):
+                continue
+            if key not in self.comparison:
+                self.comparison.append(key)
+        self.showComparisonCount()
+
+    def clearComparison(self):
+        for task in self.comparisonTasks.values():
+            task.cancel()
+        self.comparison = []
+        self.comparisonTasks = {}
+        self.comparisonPending = set()
+        self.comparisonCurves = {}
+        self.showComparisonCount()
+
+    def compareTests(self):
+        """Reads the curves of the compared tests, with one task per database, and overlays them"""
+        if not self.comparison:
+            return
+
+        tests = OrderedDict()
+        for file_path, testId, lineNum in self.comparison:
+            tests.setdefault(file_path, []).append((testId, lineNum))
+
+        for task in self.comparisonTasks.values():
+            task.cancel()
+        self.comparisonTasks = {}
+        self.comparisonPending = set(tests)
+        self.comparisonCurves = {}
+        for file_path, keys in tests.items():
+            task = ComparisonLoadTask(file_path, keys, getSchemaAdapter(file_path).comparisonColumns)
+            task.signals.result.connect(self.onComparisonLoaded)
+            task.signals.error.connect(self.onTaskError)
+            task.signals.finished.connect(self.onComparisonTaskFinished)
+            self.comparisonTasks[file_path] = task
+            self.taskManager.start(task)
+        self.statusBar.showMessage(f"Loading {len(self.comparison)} tests from {len(tests)} databases to compare...")
+
+    def onComparisonLoaded(self, task, curves):
+        if self.comparisonTasks.get(task.filePath) is task and not task.cancelled:
+            self.comparisonCurves[task.filePath] = curves
+
+    def onComparisonTaskFinished(self, task):
+        if self.comparisonTasks.get(task.filePath) is not task or task.cancelled:
+            return
+        self.comparisonPending.discard(task.filePath)
+        # Shown once every database answered, with whatever could be read
+        if not self.comparisonPending:
+            self.showComparison()
+
+    def showComparison(self):
+        series = []
+        seen = set()
+        for file_path in self.comparisonTasks:
+            name = os.path.splitext(os.path.basename(file_path))[0]
+            for testId, lineNum, (x, y) in self.comparisonCurves.get(file_path, []):
+                # A test added with and without its line is drawn once
+                if (file_path, testId, lineNum) in seen:
+                    continue
+                seen.add((file_path, testId, lineNum))
+                label = f'{name} {testId}/{lineNum}' if lineNum is not None else f'{name} {testId}'
+                series.append((label, x, y))
+
+        tab = QWidget()
+        tab_layout = QVBoxLayout()
+        tab.setLayout(tab_layout)
+        if series:
+            title, xAxis, yAxis = getSchemaAdapter(next(iter(self.comparisonTasks))).COMPARISON_LABELS
+            tab_layout.addWidget(self.createComparisonGraph(series, title, xAxis, yAxis))
         else:
-            print("Tab has no layout or empty layout")
-            return []
-                    
-        data = []
-        
-        if testType == 'DSC-OIT':
-            patterns = [
-                [re.compile(re.escape("Numune"), re.IGNORECASE), []],
-                [re.compile(re.escape("Referans"), re.IGNORECASE), []],
-                [re.compile(re.escape("Watt"), re.IGNORECASE), []],
-                [re.compile(re.escape("TestSure"), re.IGNORECASE), []]
-            ]
-        elif testType == 'MFI':
-            patterns = [
-                [re.compile(re.escape("Agirlik"), re.IGNORECASE), []],
-                [re.compile(re.escape("Zaman"), re.IGNORECASE), []],
-                [re.compile(re.escape("MVR"), re.IGNORECASE), []],
-                [re.compile(re.escape("MFR"), re.IGNORECASE), []]
-            ]
-        elif testType == 'VICAT':
-            patterns = [
-                [re.compile(re.escape("Sicaklik"), re.IGNORECASE), []],
-                [re.compile(re.escape("Batma"), re.IGNORECASE), []]
-            ]
-        else: 
-            return []  # Return empty list instead of None
-
-        for column in range(table.columnCount() if isinstance(table, QTableWidget) else 
-                     table.model().columnCount()):
-    
-            # Get column header text
-            if isinstance(table, QTableWidget):
-                item = table.horizontalHeaderItem(column)
-                column_text = item.text() if item else ""
-            else:  # QTableView
-                model = table.model()
-                column_text = model.headerData(column, Qt.Horizontal) or ""
-            
-            print(f"Column {column}: '{column_text}'")
-            
-            # Match patterns
-            for pattern, columnData in patterns:
-                if pattern.search(re.sub(remPunct, '', column_text)):
-                    print(f"Pattern match: {pattern.pattern}")
-                    columnData.extend(self.getColumnData(table, column))
+            tab_layout.addWidget(QLabel("No curves found for the compared tests"))
+
+        tab_name = f'Comparison ({len(series)})'
+        tab.setWindowTitle(tab_name)
+        self.ui.tabWidget.addTab(tab, tab_name)
+        self.ui.tabWidget.setCurrentWidget(tab)
+        file_path = self.selectedDatabase()
+        if file_path:
+            self.widgetCache.save(self.ui.tabWidget, file_path)
+        self.statusBar.showMessage(f"Overlaid {len(series)} curves")
+
+    @staticmethod
+    def createComparisonGraph(series, title, xAxis, yAxis):
+        """Overlays [(label, x, y)] curves, resampled onto one grid, on a single canvas"""
+        grid, matrix = overlayCurves([(x, y) for _, x, y in series])
+        labels = [label for label, _, _ in series]
+
+        canvas = PlotCanvas()
+        axes = canvas.figure.add_subplot()
+        colors = colormaps['tab20']
+        for position, (label, values) in enumerate(zip(labels, matrix)):
+            part = dataRange(values)
+            if part is None:
+                continue
+            # Each series is decimated to the width of the canvas on its own, keeping the lowest and
+            # highest value per pixel, which is vectorized and keeps many curves quick to zoom
+            canvas.plot(axes, grid[part], values[part], method='minmax', label=label, linewidth=1,
+                        color=colors(position % colors.N), linestyle=('-', '--', ':')[position // colors.N % 3])
+
+        axes.set_title(title)
+        axes.set_xlabel(xAxis)
+        axes.set_ylabel(yAxis)
+        axes.grid(color='gray', linestyle='dashdot', linewidth=1)
+        axes.legend(fontsize='x-small', ncol=1 + len(series) // 12)
+        canvas.figure.set_layout_engine('tight')
+        canvas.cacheKey = contentKey([(label, grid, values) for label, values in zip(labels, matrix)],
+                                     ('comparison', title, xAxis, yAxis))
+        return canvas
         
-        columns = [sublist[1] for sublist in patterns]
+    @staticmethod
+    def buildTestData(testType, columns):
+        data = []
         
         if testType == 'DSC-OIT':
             data.append([[['Numune Sıcaklığı', columns[3], columns[0]], ['Referans Sıcaklığı', columns[3], columns[1]]], 'Sıcaklık Zaman Grafiği', 'Test Süresi', 'Sıcaklık'])
@@ -1512,31 +1760,11 @@ class MainWindow(QMainWindow):
         return data  # Explicitly return data
     
     @staticmethod
-    def getColumnData(table, index):
-        column_data = []
-        
-        # Check if we have a QTableWidget
-        if isinstance(table, QTableWidget):
-            row_count = table.rowCount()
-            for row in range(row_count):
-                item = table.item(row, index)
-                if item:
-                    column_data.append(item.text())
-        
-        # Check if we have a QTableView
-        elif isinstance(table, QTableView):
-            model = table.model()
-            if model:
-                row_count = model.rowCount()
-                for row in range(row_count):
-                    model_index = model.index(row, index)
-                    data = model.data(model_index)
-                    if data:
-                        column_data.append(str(data))
-        
-        # Print the data length for debugging
-        print(f"Column {index} has {len(column_data)} data points")
-        return column_data
+    def formatValue(value):
+        # NULLs, the '' the instruments write for missing values and NaN are all shown as '-'
+        if value is None or value == '' or (isinstance(value, float) and value != value):
+            return '-'
+        return str(value)
 
     @staticmethod
     def comparePaths(path1, path2, home=None):
@@ -1559,65 +1787,26 @@ class MainWindow(QMainWindow):
 
     @staticmethod
     def createGraph(data, title='Title', xAxis='xAxisLabel', yAxis='yAxisLabel'):
-        def smooth_data(x, y, window_length=11, polyorder=2):
-            try:
-                # Convert to float if needed
-                x_float = [float(val) if val not in (None, 'None') else 0.0 for val in x]
-                y_float = [float(val) if val not in (None, 'None') else 0.0 for val in y]
-                
-                # Check if we have enough data points for the window length
-                if len(y_float) < window_length:
-                    window_length = max(min(len(y_float) // 2 * 2 - 1, 5), 3)  # Ensure odd number
-                    polyorder = min(polyorder, window_length - 1)  # Polyorder must be less than window length
-                
-                return savgol_filter(y_float, window_length=window_length, polyorder=polyorder)
-            except Exception as e:
-                print(f"Error in smooth_data: {e}")
-                return y  # Return original data if smoothing fails
-        
-        def prepareData(x, y):
-            try:
-                # Filter out None, 'None', and convert to float
-                valid_indices = []
-                for i in range(min(len(x), len(y))):
-                    if x[i] not in (None, 'None') and y[i] not in (None, 'None'):
-                        try:
-                            float(x[i])
-                            float(y[i])
-                            valid_indices.append(i)
-                        except (ValueError, TypeError):
-                            pass
-                
-                x_cleaned = [float(x[i]) for i in valid_indices]
-                y_cleaned = [float(y[i]) for i in valid_indices]
-                return x_cleaned, y_cleaned
-            except Exception as e:
-                print(f"Error in prepareData: {e}")
-                return [], []  # Return empty lists if preparation fails
-
-        buf = BytesIO()
+        # Drawn live from the arrays; the canvas supports zooming and panning
+        canvas = PlotCanvas()
+        axes = canvas.figure.add_subplot()
         
         try:
-            plt.figure(figsize=(8, 6))
-            
+            # The same graph at the same size is painted from the plot cache, see modules/plotCache.py
+            canvas.cacheKey = contentKey(data, ('graph', title, xAxis, yAxis))
             valid_datasets = 0
             for dataset in data:
                 try:
                     label, x, y = dataset
-                    if not x or not y:  # Skip empty datasets
+                    if len(x) == 0 or len(y) == 0:  # Skip empty datasets
                         continue
                         
-                    x, y = prepareData(x, y)
+                    # Missing points dropped and smoothed with NumPy, see modules/curvePrep.py
+                    x, y = prepareCurve(x, y)
                     
-                    if len(x) > 0 and len(y) > 0:  # Only plot if we have valid data
-                        window_len = min(11, max(3, len(x) // 2 * 2 + 1))
-                        polyorder = min(2, window_len - 1)
-                        
-                        if len(x) > 3:  # Need at least 3 points for smoothing
-                            y_smooth = smooth_data(x, y, window_length=window_len, polyorder=polyorder)
-                            plt.plot(x, y_smooth, label=label)
-                        else:
-                            plt.plot(x, y, label=label)
+                    if len(x) > 0:  # Only plot if we have valid data
+                        # Decimated to the width of the canvas, see modules/decimation.py
+                        canvas.plot(axes, x, y, label=label)
                         valid_datasets += 1
                 except Exception as e:
                     print(f"Error plotting dataset: {e}")
@@ -1625,65 +1814,65 @@ class MainWindow(QMainWindow):
             
             if valid_datasets == 0:
                 # Create a simple message if no valid datasets
-                plt.text(0.5, 0.5, "No valid data to plot", 
+                axes.text(0.5, 0.5, "No valid data to plot", 
                         horizontalalignment='center', verticalalignment='center',
-                        transform=plt.gca().transAxes)
+                        transform=axes.transAxes)
             else:
-                plt.gca().xaxis.set_major_locator(AutoLocator())
-                plt.gca().yaxis.set_major_locator(AutoLocator())
+                axes.xaxis.set_major_locator(AutoLocator())
+                axes.yaxis.set_major_locator(AutoLocator())
                 
                 # Use safe formatting (only if there's data)
                 if len(x) > 0:
                     try:
-                        plt.gca().xaxis.set_major_formatter(FormatStrFormatter('%d' if isinstance(x[0], int) else '%.2f'))
-                        plt.gca().yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
+                        axes.xaxis.set_major_formatter(FormatStrFormatter('%d' if isinstance(x[0], int) else '%.2f'))
+                        axes.yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
                     except:
                         pass  # Fallback to default formatting
             
-            plt.title(title)
-            plt.xlabel(xAxis)
-            plt.ylabel(yAxis)
-            plt.grid(color='gray', linestyle='dashdot', linewidth=1)
+            axes.set_title(title)
+            axes.set_xlabel(xAxis)
+            axes.set_ylabel(yAxis)
+            axes.grid(color='gray', linestyle='dashdot', linewidth=1)
             if valid_datasets > 0:
-                plt.legend()
-            
-            plt.savefig(buf, format='png', bbox_inches='tight')
-            plt.close()
-            buf.seek(0)
-            
-            plot_image = QImage()
-            plot_image.loadFromData(buf.getvalue())
-            
-            return plot_image
+                axes.legend()
+            canvas.figure.set_layout_engine('tight')
         except Exception as e:
             print(f"Error in createGraph: {e}")
-            # Create a simple error image
-            plt.figure(figsize=(8, 6))
-            plt.text(0.5, 0.5, f"Error creating graph: {str(e)}", 
-                    horizontalalignment='center', verticalalignment='center',
-                    transform=plt.gca().transAxes)
-            plt.savefig(buf, format='png', bbox_inches='tight')
-            plt.close()
-            buf.seek(0)
-            
-            plot_image = QImage()
-            plot_image.loadFromData(buf.getvalue())
-            
-            return plot_image
+            # Show the error in place of the graph
+            canvas.cacheKey = None
+            canvas.figure.clear()
+            canvas.figure.text(0.5, 0.5, f"Error creating graph: {str(e)}", 
+                    horizontalalignment='center', verticalalignment='center')
+        
+        return canvas
     def updateTabs(self):
+        # Whatever is still loading belongs to the database being left
+        self.taskManager.cancelDatabaseTasks()
         self.ui.tabWidget.clear()
         self.lastSelectedRow = None
         
-        selected_items = self.ui.listWidget.selectedItems()
-        if selected_items:
-            selected_item = selected_items[0]
-            file_path = selected_item.data(Qt.UserRole)
-            
-            if file_path:
-                if file_path in self.widgetCache.returnCache():
-                    self.widgetCache.restore(self.ui.tabWidget, file_path)
-                else:
-                    self.populateTabs(file_path)
+        file_path = self.selectedDatabase()
+        if file_path:
+            if self.widgetCache.restore(self.ui.tabWidget, file_path):
+                self.refreshOpenTables()
+            else:
+                self.populateTabs(file_path)
+
+    def refreshOpenTables(self):
+        """Appends the rows written since the tables in the open tabs were loaded"""
+        added = 0
+        for index in range(self.ui.tabWidget.count()):
+            for tableView in self.ui.tabWidget.widget(index).findChildren(QTableView):
+                model = tableView.model()
+                if isinstance(model, SQLiteTableModel):
+                    added += model.refresh()
+                    # A first page cancelled by switching databases is requested again
+                    if model.rowCount() == 0 and model.canFetchMore():
+                        model.fetchMore()
+
+        if added:
+            self.statusBar.showMessage(f"Loaded {added} new rows")
+        return added
                    
 
     def setupComboBox(self):
@@ -1770,12 +1959,7 @@ class MainWindow(QMainWindow):
 
 
 
-            item_widget = FileListWidgetItem(local_path)
-            item = QListWidgetItem()
-            item.setSizeHint(item_widget.sizeHint())
-            item.setData(Qt.UserRole, local_path)
-            self.ui.listWidget.addItem(item)
-            self.ui.listWidget.setItemWidget(item, item_widget)
+            self.addDatabaseItem(local_path)
 
         # Close the SFTP session
             sftp.close()
@@ -1812,12 +1996,7 @@ class MainWindow(QMainWindow):
 
 
 
-            item_widget = FileListWidgetItem(local_path)
-            item = QListWidgetItem()
-            item.setSizeHint(item_widget.sizeHint())
-            item.setData(Qt.UserRole, local_path)
-            self.ui.listWidget.addItem(item)
-            self.ui.listWidget.setItemWidget(item, item_widget)
+            self.addDatabaseItem(local_path)
 
         # Close the SFTP session
             sftp.close()
@@ -2028,6 +2207,8 @@ class MainWindow(QMainWindow):
             print('Mouse click: RIGHT CLICK')
 
 if __name__ == "__main__":
+    # Report charts are drawn in worker processes, which a frozen build has to start itself
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("alargepng.ico"))
     window = MainWindow()
@@ -16,5 +16,25 @@ from . ui_functions import *
 from . app_functions import *
 
 from . createReport import ReportCreator
+from . chartRenderer import startChartPool
 from . subWindows import *
 from . customWidgets import *
+from . dbHelpers import *
+from . connectionPool import connectionPool, getConnection
+from . queryCache import queryCache
+from . dbTasks import TaskManager, DetailLoadTask, CurveLoadTask, ComparisonLoadTask, SearchIndexTask
+from . schemaAdapters import getSchemaAdapter
+from . tableModels import SQLiteTableModel, ColumnTableModel
+from . curvePrep import prepareCurve
+from . plotCanvas import PlotCanvas
+from . plotCache import plotCache, contentKey
+from . decimation import decimate
+from . curveOverlay import overlayCurves, dataRange
+from . testFilter import TestFilter, MAX_ID_DIGITS
+from . searchIndex import getSearchIndex
+from . fanOutQuery import FanOutResultModel, TestsBetween, FinalValueAbove
+from . sidecarIndex import getSidecarIndex, reattachSidecarIndex
+from . databaseWatcher import DatabaseWatcher
+from . databaseList import DatabaseListModel, DatabaseItemDelegate
+from . curveCache import getCurveCache
+from . prefetcher import Prefetcher
@@ -7,6 +7,47 @@ class Settings():
     RIGHT_BOX_WIDTH = 240
     TIME_ANIMATION = 500
 
+    # TAB WIDGETS KEPT IN MEMORY FOR PREVIOUSLY OPENED DATABASES
+    WIDGET_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+    # DETAILS AND CURVES OF TESTS PREFETCHED AROUND THE SELECTED ONE
+    PREFETCH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    PREFETCH_NEIGHBOURS = 1
+
+    # RESULTS OF READ QUERIES SHARED BY THE TABLES, DETAILS AND REPORTS
+    QUERY_CACHE_MAX_BYTES = 128 * 1024 * 1024
+    # EVICTED RESULTS ARE KEPT IN .cache/queries NEXT TO THE DATABASES
+    QUERY_CACHE_ON_DISK = True
+    QUERY_CACHE_DISK_MAX_BYTES = 256 * 1024 * 1024
+
+    # LONG CURVES ARE REDUCED TO THIS MANY POINTS PER PIXEL OF PLOT WIDTH ('lttb' OR 'minmax')
+    PLOT_POINTS_PER_PIXEL = 2
+    PLOT_DECIMATION = 'lttb'
+
+    # RENDERED GRAPHS KEPT IN MEMORY, AND REPORT CHARTS AS IMAGES IN databases/.cache/plots FOR LATER SESSIONS
+    PLOT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    PLOT_CACHE_ON_DISK = True
+    PLOT_CACHE_DISK_MAX_BYTES = 128 * 1024 * 1024
+
+    # PROCESSES DRAWING A REPORT'S CHARTS AT ONCE (1 DRAWS THEM ONE BY ONE, NEVER MORE THAN THE CPU CORES)
+    CHART_RENDER_WORKERS = 3
+
+    # X VALUES OF THE GRID TESTS ARE RESAMPLED ONTO WHEN THEY ARE OVERLAID
+    COMPARISON_GRID_POINTS = 4000
+
+    # HOW OFTEN OPEN TABLES ARE CHECKED FOR NEW TESTS (MS)
+    DB_REFRESH_INTERVAL = 10000
+
+    # QUIET TIME BEFORE CHANGES IN THE DATABASES DIRECTORY ARE PICKED UP (MS)
+    DB_WATCH_DEBOUNCE = 1000
+
+    # SQLITE MEMORY MAP AND PAGE CACHE PER CONNECTION (BYTES)
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE = 64 * 1024 * 1024
+
+    # DATABASES QUERIED AT ONCE WHEN A QUERY RUNS ON ALL DATABASES
+    FAN_OUT_THREADS = 4
+
     # BTNS LEFT AND RIGHT BOX COLORS
     BTN_LEFT_BOX_COLOR = "background-color: rgb(44, 49, 58);"
     BTN_RIGHT_BOX_COLOR = "background-color: #ff79c6;"
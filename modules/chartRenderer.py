@@ -0,0 +1,137 @@
+import atexit
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+from modules.app_settings import Settings
+from modules.chartWorker import INCHES_PER_POINT, drawChart, workerMain
+from modules.plotCache import contentKey, plotCache, plotKey
+
+
+def makeChart(data, title, xAxis, yAxis, width, height):
+    """A chart of [(label, x, y)] curves, ``width`` by ``height`` points in the report."""
+    return (data, title, xAxis, yAxis, width, height)
+
+
+def chartKey(chart, dpi=None):
+    data, title, xAxis, yAxis, width, height = chart
+    dpi = dpi or matplotlib.rcParams['figure.dpi']
+    return plotKey(contentKey(data, ('report', title, xAxis, yAxis)),
+                   width * INCHES_PER_POINT * dpi, height * INCHES_PER_POINT * dpi, dpi)
+
+
+_chartPool = None
+
+
+def chartWorkers():
+    # More processes than cores only add the cost of sending the curves over
+    return max(min(Settings.CHART_RENDER_WORKERS, os.cpu_count() or 1), 1)
+
+
+def getChartPool():
+    """
+    Process pool the charts are drawn on, bounded by Settings.CHART_RENDER_WORKERS.
+    Drawing is Python bound, so threads would take turns holding the GIL.
+
+    Workers are spawned, not forked: a forked child would inherit locks held at that
+    moment by the database tasks (sqlite, the pools, the curve cache) and Qt's state,
+    and could hang on them. A spawned worker starts a fresh interpreter, so all of them
+    are started here at once with modules/chartWorker.py as their main module, and only
+    import numpy, scipy and matplotlib instead of the GUI. That still takes a moment,
+    so the app starts the pool when it opens, see ``startChartPool``.
+    """
+    global _chartPool
+    if _chartPool is None:
+        _chartPool = ProcessPoolExecutor(max_workers=chartWorkers(), mp_context=multiprocessing.get_context('spawn'))
+        atexit.register(_chartPool.shutdown, cancel_futures=True)
+
+        # Each task submitted while no worker is idle spawns one, right away
+        main = sys.modules['__main__']
+        sys.modules['__main__'] = workerMain()
+        try:
+            for _ in range(chartWorkers()):
+                _chartPool.submit(int)
+        finally:
+            sys.modules['__main__'] = main
+    return _chartPool
+
+
+def startChartPool():
+    """Starts the chart workers ahead of the first report, if charts are drawn in parallel."""
+    if chartWorkers() > 1:
+        getChartPool()
+
+
+def renderCharts(charts, parallel=True):
+    """
+    Returns the PNG bytes of every chart, in order. Charts drawn before come from the plot
+    cache; the rest are drawn at once on the chart pool, or one by one if ``parallel`` is
+    False or only one is left, and are added to the cache.
+    """
+    keys = [chartKey(chart) for chart in charts]
+    images = [plotCache.read(key, 'png') for key in keys]
+    missing = [index for index, image in enumerate(images) if image is None]
+
+    if parallel and len(missing) > 1 and chartWorkers() > 1:
+        drawn = getChartPool().map(drawChart, [charts[index] for index in missing])
+    else:
+        drawn = map(drawChart, [charts[index] for index in missing])
+
+    for index, image in zip(missing, drawn):
+        images[index] = image
+        plotCache.write(keys[index], 'png', image)
+    return images
+
+
+def benchmark(charts, repeat=3):
+    """
+    Wall time of drawing ``charts`` one after another and on the chart pool, best of
+    ``repeat``, without the plot cache. 'cold' is the first parallel run, which includes
+    starting the pool unless it was already running.
+    """
+    started = time.perf_counter()
+    list(getChartPool().map(drawChart, charts))
+    results = {'cold': time.perf_counter() - started}
+    for name, draw in (('serial', lambda: list(map(drawChart, charts))),
+                       ('parallel', lambda: list(getChartPool().map(drawChart, charts)))):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            draw()
+            timings.append(time.perf_counter() - started)
+        results[name] = min(timings)
+    return results
+
+
+if __name__ == "__main__":
+    # e.g. `python -m modules.chartRenderer databases/VICAT.db 1`, the charts of the five lines of a test
+    import numpy as np
+    # The pool finds the functions it runs by their module, which must not be __main__
+    from modules.chartRenderer import benchmark, chartWorkers, makeChart
+
+    if len(sys.argv) > 2:
+        from modules.curveCache import getCurveCache
+        curveCache = getCurveCache(sys.argv[1])
+        curves = [curveCache.getCurve(int(sys.argv[2]), line) for line in range(1, 6)]
+        charts = [makeChart([('batma', curve['sıcaklık'], curve['batma'])], 'Sıcaklık-Batma Grafiği',
+                            'Batma [mm]', 'Sıcaklık [°C]', 357, 168)
+                  for curve in curves if curve and len(curve.get('batma', []))]
+    else:
+        # The three charts of a DSC-OIT report, from a 30k-point run
+        seconds = np.linspace(0.0, 3600.0, 30000)
+        sample = 200.0 + 0.01 * seconds
+        noise = np.random.default_rng(0).normal(0.0, 0.05, len(seconds))
+        watt = np.exp((seconds - 3600.0) / 600.0) + noise
+        charts = [makeChart([('numunesicakligi', seconds, sample), ('referanssicakligi', seconds, sample + noise)],
+                            'Sıcaklık-Zaman Grafiği', 'Zaman [sn]', 'Sıcaklık [°C]', 357, 168),
+                  makeChart([('watt', seconds, watt)], 'Isı-Zaman Grafiği', 'Zaman [sn]', 'Isı [Watt]', 357, 168),
+                  makeChart([('Isı', sample, watt)], 'Isı-Sıcaklık Grafiği', 'Sıcaklık [°C]', 'Isı [Watt]', 357, 168)]
+
+    results = benchmark(charts)
+    print(f"{len(charts)} charts, {chartWorkers()} workers: serial {results['serial'] * 1000:.0f} ms, "
+          f"parallel {results['parallel'] * 1000:.0f} ms ({results['serial'] / results['parallel']:.2f}x), "
+          f"{results['cold'] * 1000:.0f} ms with starting the pool")
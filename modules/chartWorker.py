@@ -0,0 +1,59 @@
+import os
+import sys
+import types
+from io import BytesIO
+
+if 'modules' not in sys.modules:
+    # Run as the main module of a spawned chart worker: the package's __init__ builds the
+    # whole GUI, so the worker sets the package up bare and imports only what a chart needs
+    package = types.ModuleType('modules')
+    package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules['modules'] = package
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from modules.curvePrep import prepareCurve
+from modules.decimation import decimate, pointsForWidth
+
+
+# Report charts are sized in points and drawn at this many inches per point
+INCHES_PER_POINT = 0.03
+
+
+def drawChart(chart):
+    """
+    Draws a chart as PNG bytes on its own Figure and Agg canvas. Nothing is shared with
+    pyplot or other figures, so charts can be drawn in any thread or process at once.
+    """
+    data, title, xAxis, yAxis, width, height = chart
+    figure = Figure(figsize=(width * INCHES_PER_POINT, height * INCHES_PER_POINT))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+
+    for label, x, y in data:
+        # Cleaned and smoothed the same way as the graphs on screen, then reduced to the image's width
+        x, y = prepareCurve(x, y)
+        x, y = decimate(x, y, pointsForWidth(figure.get_figwidth() * figure.get_dpi()))
+        axes.plot(x, y, label=label)
+
+    axes.set_title(title)
+    axes.set_xlabel(xAxis)
+    axes.set_ylabel(yAxis)
+    axes.grid(color='gray', linestyle='dashdot', linewidth=1)
+    axes.legend()
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png', bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def workerMain():
+    """
+    Stands in for the app's main module while chart workers are spawned. A spawned
+    process runs the parent's main module again before its first task, which for the
+    app means PySide6 and the whole GUI; with this it runs this file instead.
+    """
+    main = types.ModuleType('__mp_main__')
+    main.__file__ = os.path.abspath(__file__)
+    return main
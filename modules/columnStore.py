@@ -0,0 +1,244 @@
+import sys
+
+import numpy as np
+
+
+INITIAL_CAPACITY = 256
+
+
+def columnKind(declaredType):
+    """Storage kind of a column from its declared type, following SQLite's affinity rules."""
+    declaredType = (declaredType or '').upper()
+    if 'INT' in declaredType:
+        return 'int'
+    if any(keyword in declaredType for keyword in ('CHAR', 'CLOB', 'TEXT')):
+        return 'text'
+    if not declaredType or 'BLOB' in declaredType:
+        return 'object'
+    return 'float'
+
+
+def isMissing(value):
+    # The instruments write '' into numeric columns they have no value for
+    return value is None or value == ''
+
+
+def floatArray(values):
+    """
+    Returns ``values`` as a float64 array with NaN for missing values. Typed columns and
+    cached curves convert without copying; anything else is parsed value by value.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+        return values
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    parsed = np.full(len(values), np.nan)
+    for position, value in enumerate(values):
+        try:
+            parsed[position] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return parsed
+
+
+def columnArrays(columns, declaredTypes, rows, wanted):
+    """Typed arrays of the ``wanted`` columns of some rows, with [] for a column that is not there."""
+    store = ColumnStore(columns, declaredTypes)
+    store.extend(rows)
+    return [store.array(column) if column in store.columns else [] for column in wanted]
+
+
+class TypedColumn:
+    """
+    One column of a ColumnStore.
+
+    ``int`` columns are an int64 array with a mask of the NULLs, ``float`` columns a
+    float64 array with NaN for NULLs, and ``text`` and ``object`` columns a list whose
+    strings are interned, as a table repeats the same operators, standards and codes on
+    every row. Numeric arrays grow by doubling. A value the kind cannot hold, like text in
+    a REAL column, demotes the column: int to float, float to object.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.reset()
+
+    def reset(self):
+        self.size = 0
+        if self.kind == 'int':
+            self.data = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+            self.nulls = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        elif self.kind == 'float':
+            self.data = np.zeros(INITIAL_CAPACITY, dtype=np.float64)
+        else:
+            self.data = []
+
+    def accepts(self, values):
+        if self.kind == 'int':
+            return all(isMissing(value) or type(value) is int or (type(value) is float and value.is_integer()) for value in values)
+        if self.kind == 'float':
+            return all(isMissing(value) or type(value) in (int, float) for value in values)
+        return True
+
+    def demote(self):
+        values = self.values()
+        self.kind = 'float' if self.kind == 'int' else 'object'
+        self.reset()
+        self.store(values, 0)
+
+    def reserve(self, size):
+        if self.kind not in ('int', 'float') or size <= len(self.data):
+            return
+        capacity = max(size, 2 * len(self.data))
+        data = np.zeros(capacity, dtype=self.data.dtype)
+        data[:self.size] = self.data[:self.size]
+        self.data = data
+        if self.kind == 'int':
+            nulls = np.zeros(capacity, dtype=bool)
+            nulls[:self.size] = self.nulls[:self.size]
+            self.nulls = nulls
+
+    def store(self, values, position):
+        """Writes ``values`` from ``position`` on; the column then ends after them."""
+        end = position + len(values)
+        if self.kind == 'int':
+            self.reserve(end)
+            self.nulls[position:end] = [isMissing(value) for value in values]
+            self.data[position:end] = [0 if isMissing(value) else int(value) for value in values]
+        elif self.kind == 'float':
+            self.reserve(end)
+            self.data[position:end] = [np.nan if isMissing(value) else value for value in values]
+        else:
+            del self.data[position:]
+            self.data.extend(sys.intern(value) if type(value) is str else value for value in values)
+        self.size = end
+
+    def extend(self, values):
+        while not self.accepts(values):
+            self.demote()
+        self.store(values, self.size)
+
+    def prepend(self, values):
+        while not self.accepts(values):
+            self.demote()
+        if self.kind in ('int', 'float'):
+            # Only the new values are converted; the rows already loaded are copied as arrays
+            head = TypedColumn(self.kind)
+            head.store(values, 0)
+            self.data = np.concatenate((head.data[:head.size], self.data[:self.size]))
+            if self.kind == 'int':
+                self.nulls = np.concatenate((head.nulls[:head.size], self.nulls[:self.size]))
+        else:
+            self.data[:0] = [sys.intern(value) if type(value) is str else value for value in values]
+        self.size += len(values)
+
+    def value(self, row):
+        if self.kind == 'int':
+            return None if self.nulls[row] else int(self.data[row])
+        if self.kind == 'float':
+            value = self.data[row]
+            return None if value != value else float(value)
+        return self.data[row]
+
+    def values(self):
+        return [self.value(row) for row in range(self.size)]
+
+    def array(self):
+        """The column as an array: int64 without NULLs, float64 with NaN, or objects."""
+        if self.kind == 'int':
+            if self.nulls[:self.size].any():
+                return np.where(self.nulls[:self.size], np.nan, self.data[:self.size])
+            return self.data[:self.size]
+        if self.kind == 'float':
+            return self.data[:self.size]
+        return np.array(self.data, dtype=object)
+
+    def sortKeys(self):
+        if self.kind in ('int', 'float'):
+            return self.array()
+        # Numbers stored as text still sort as numbers
+        numbers = floatArray(self.data)
+        if np.isnan(numbers).sum() == sum(isMissing(value) for value in self.data):
+            return numbers
+        # Otherwise like SQLite: NULLs, then numbers, then text
+        return [(0, 0) if value is None else (1, value) if type(value) in (int, float) else (2, str(value))
+                for value in self.data]
+
+    def take(self, order):
+        if self.kind == 'int':
+            self.data[:self.size] = self.data[:self.size][order]
+            self.nulls[:self.size] = self.nulls[:self.size][order]
+        elif self.kind == 'float':
+            self.data[:self.size] = self.data[:self.size][order]
+        else:
+            self.data = [self.data[position] for position in order]
+
+
+class ColumnStore:
+    """
+    Result rows kept column by column in TypedColumns instead of as a list of tuples:
+    far fewer Python objects per row, numeric columns usable as arrays directly and
+    numeric sorting with a single argsort.
+    """
+
+    def __init__(self, columns, declaredTypes=None):
+        self.columns = list(columns)
+        declaredTypes = declaredTypes or {}
+        self.data = [TypedColumn(columnKind(declaredTypes.get(column))) for column in self.columns]
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, rows, first=0):
+        """Appends rows, taking the values from position ``first`` of each row on."""
+        if not rows:
+            return
+        for column, values in zip(self.data, list(zip(*rows))[first:]):
+            column.extend(values)
+        self.size += len(rows)
+
+    def prepend(self, rows, first=0):
+        if not rows:
+            return
+        for column, values in zip(self.data, list(zip(*rows))[first:]):
+            column.prepend(values)
+        self.size += len(rows)
+
+    def clear(self):
+        for column in self.data:
+            column.reset()
+        self.size = 0
+
+    def value(self, row, column):
+        return self.data[column].value(row)
+
+    def row(self, row):
+        return tuple(column.value(row) for column in self.data)
+
+    def array(self, column):
+        """The typed values of a column, by position or name."""
+        if isinstance(column, str):
+            column = self.columns.index(column)
+        return self.data[column].array()
+
+    def kind(self, column):
+        return self.data[column].kind
+
+    def sort(self, column, descending=False):
+        """Reorders the rows by a column. Returns the permutation applied."""
+        keys = self.data[column].sortKeys()
+        if isinstance(keys, np.ndarray):
+            # NaN sorts last ascending; NULLs go first, like in SQLite
+            order = np.lexsort((keys, ~np.isnan(keys))) if keys.dtype.kind == 'f' else np.argsort(keys, kind='stable')
+        else:
+            order = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+        if descending:
+            order = order[::-1]
+
+        for typedColumn in self.data:
+            typedColumn.take(order)
+        return order
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import threading
+
+from modules.app_settings import Settings
+from modules.dbHelpers import readOnlyUri
+
+
+def applyPragmas(conn):
+    """Memory-maps the file and keeps a larger page cache and temp tables in memory."""
+    conn.execute(f"PRAGMA mmap_size = {int(Settings.SQLITE_MMAP_SIZE)};")
+    conn.execute(f"PRAGMA cache_size = {-int(Settings.SQLITE_CACHE_SIZE // 1024)};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Read-only SQLite connections, one per database file and thread.
+
+    sqlite3 connections may not be shared between threads, so each thread (the GUI and
+    every pool worker) gets its own connection the first time it asks for a file, and the
+    same one afterwards. ``invalidate`` makes every thread reopen a file on its next
+    request, e.g. after the file was replaced.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.generations = {}
+        self.opened = 0
+        self.reused = 0
+
+    def connection(self, file_path, immutable=False):
+        """
+        Returns the calling thread's connection to ``file_path``. ``immutable`` is only for
+        files nothing writes to any more, like snapshot copies: SQLite then skips locking
+        and change detection entirely.
+        """
+        key = (os.path.abspath(file_path), immutable)
+        connections = getattr(self.local, 'connections', None)
+        if connections is None:
+            connections = self.local.connections = {}
+
+        with self.lock:
+            generation = self.generations.get(key[0], 0)
+
+        entry = connections.get(key)
+        if entry is not None and entry[0] == generation:
+            with self.lock:
+                self.reused += 1
+            return entry[1]
+
+        if entry is not None:
+            entry[1].close()
+
+        conn = applyPragmas(sqlite3.connect(readOnlyUri(key[0], immutable), uri=True))
+        connections[key] = (generation, conn)
+        with self.lock:
+            self.opened += 1
+        return conn
+
+    def invalidate(self, file_path):
+        with self.lock:
+            key = os.path.abspath(file_path)
+            self.generations[key] = self.generations.get(key, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            return {'opened': self.opened, 'reused': self.reused}
+
+
+connectionPool = ConnectionPool()
+
+
+def getConnection(file_path, immutable=False):
+    """Returns the calling thread's pooled read-only connection to a database file."""
+    return connectionPool.connection(file_path, immutable)
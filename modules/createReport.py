@@ -9,11 +9,16 @@ from io import BytesIO
 import numpy as np
 import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
 from fuzzywuzzy import process
 from typing import List, Union
 from src.testInfo import InfoContainer
+from modules.schemaAdapters import getSchemaAdapter
+from modules.sidecarIndex import getSidecarIndex
+from modules.curveCache import getCurveCache
+from modules.queryCache import queryCache
+from modules.chartRenderer import makeChart, renderCharts
+from modules.dbHelpers import fileFingerprint
 
 
 VALID_TEST_TYPES = ['DSC_OIT', "VICAT", "MFI"]
@@ -257,30 +262,35 @@ class ReportCreator():
             d.add(line)
             self.elements.append(d)
             
-            # Plots
+            # Plots, drawn together once all three are known
             indexes = ["numunesicakligi", "referanssicakligi", "watt"]
             data = []
-            x = filteredTestDetay['testsuresi'].values
-            
-            for column in filteredTestDetay.columns:
-                if column in indexes:
-                    y = filteredTestDetay[f'{column}'].values
-                    label = column
+            curve = getCurveCache(self.testDataBase).getCurve(self.testID)
+            x = curve.get('testsuresi')
+            
+            # The cache has no arrays for a test without detail rows, nor for columns not declared numeric
+            if x is not None and len(x) > 0:
+                for column in curve:
+                    if column in indexes:
+                        y = curve[column]
+                        label = column
+                        dataset = [label, x, y]
+                        data.append(dataset)
+                        
+                charts = [makeChart(data[0:2], 'Sıcaklık-Zaman Grafiği', 'Zaman [sn]', 'Sıcaklık [°C]', self.width*0.6, self.height*0.2),
+                          makeChart(data[2:], 'Isı-Zaman Grafiği', 'Zaman [sn]', 'Isı [Watt]', self.width*0.6, self.height*0.2)]
+                
+                x = curve.get('numunesicakligi')
+                y = curve.get('watt')
+                if x is not None and y is not None:
+                    label = 'Isı'
+                    
                     dataset = [label, x, y]
+                    data = []
                     data.append(dataset)
                     
-            self.addPlot(data[0:2], drawingWidth=self.width*0.6, drawingHeight=self.height*0.2, title='Sıcaklık-Zaman Grafiği', xAxis='Zaman [sn]', yAxis='Sıcaklık [°C]')
-            self.addPlot(data[2:], drawingWidth=self.width*0.6, drawingHeight=self.height*0.2, title='Isı-Zaman Grafiği', xAxis='Zaman [sn]', yAxis='Isı [Watt]')
-            
-            x = filteredTestDetay['numunesicakligi'].values
-            y = filteredTestDetay['watt'].values
-            label = 'Isı'
-            
-            dataset = [label, x, y]
-            data = []
-            data.append(dataset)
-            
-            self.addPlot(data, drawingWidth=self.width*0.6, drawingHeight=self.height*0.2, title='Isı-Sıcaklık Grafiği', xAxis='Sıcaklık [°C]', yAxis='Isı [Watt]')
+                    charts.append(makeChart(data, 'Isı-Sıcaklık Grafiği', 'Sıcaklık [°C]', 'Isı [Watt]', self.width*0.6, self.height*0.2))
+                self.addPlots(charts)
         elif testType.lower() == 'mfi':
             test_DataFrame  = pd.DataFrame(dataFrame['TestAna'])
             test_DataFrame2  = pd.DataFrame(dataFrame['TestDetay'])
@@ -355,86 +365,70 @@ class ReportCreator():
             
             #Plot
             indexes = ["batma"]
-            data = []
-            x = filteredTestDetay['sıcaklık'].values
-            
-            for column in filteredTestDetay.columns:
-                if column in indexes:
-                    y = filteredTestDetay[f'{column}'].values
-                    label = column
-                    dataset = [label, x, y]
-                    data.append(dataset)
-                    
-            self.addPlot(data, drawingWidth=self.width*0.6, drawingHeight=self.height*0.2, title='Sıcaklık-Batma Grafiği', xAxis='Batma [mm]', yAxis='Sıcaklık [°C]')
-            
-            dataset = [label, x, y]
-            data = []
-            data.append(dataset)
+            charts = {}
+            # The charts of every line of the test are drawn at once on the chart pool, so the
+            # reports of the other lines find theirs in the plot cache
+            for _, line, curve in getCurveCache(self.testDataBase).getCurves([(self.testID, None)]):
+                x = curve.get('sıcaklık')
+                
+                # As for DSC-OIT, a line without numeric detail rows gets no plot
+                if x is not None and len(x) > 0:
+                    data = [[column, x, curve[column]] for column in curve if column in indexes]
+                    charts[line] = makeChart(data, 'Sıcaklık-Batma Grafiği', 'Batma [mm]', 'Sıcaklık [°C]', self.width*0.6, self.height*0.2)
+                        
+            if self.lineNum in charts:
+                chart = charts.pop(self.lineNum)
+                self.addPlots([chart] + list(charts.values()), shown=1)
             
         else: 
             raise Exception("Invalid Test Type.")
             
     def getTestInfo(self, path): # AAA---------------------------------------------------------------------------
+        # Only the rows of this test are read, through the indexed sidecar copy of the database,
+        # and the detail rows the GUI already showed come from the shared query cache
         try:
-            with sqlite3.connect(path) as conn:
-                cur = conn.cursor()
-                cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                tables = cur.fetchall()
-                if len(tables) > 0:
-                    data_frames = {}
-                    for table in tables:
-                        table_name = table[0]
-                        cur.execute(f"SELECT COUNT(*) FROM {table_name};")
-                        row_count = cur.fetchone()[0]
-                        if row_count > 0:
-                            for table in tables:
-                                table_name = table[0]
-                                df = pd.read_sql_query(f"SELECT * FROM {table_name};", conn)
-                                data_frames[table_name] = df
-                            return data_frames   
-                    else:
-                        print("Empty Database.")
-                else:
-                    print("Empty Database.")
+            fingerprint = fileFingerprint(path)
+            adapter = getSchemaAdapter(path)
+            conn = getSidecarIndex(path).connection()
+            data_frames = {}
+            for table_name in adapter.testTables:
+                query, params = adapter.testQuery(table_name, self.testID, getattr(self, 'lineNum', None))
+                columns, rows = queryCache.fetch(path, conn, query, params, fingerprint)
+                data_frames[table_name] = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+            if len(data_frames) > 0:
+                return data_frames
+            else:
+                print("Empty Database.")
         except sqlite3.Error as e:
             print(e)
             
     def addPlot(self, data, drawingWidth=400, drawingHeight=200, title="Title", xAxis="X Axis", yAxis="Y Axis"):
-        spacer = Spacer(0, 10)
-        self.elements.append(spacer)
-        
-        buf = BytesIO()
+        self.addPlots([makeChart(data, title, xAxis, yAxis, drawingWidth, drawingHeight)])
         
-        plt.figure(figsize=(drawingWidth*0.03, drawingHeight*0.03))
+    def addPlots(self, charts, shown=None):
+        # Drawn without pyplot, at once on the chart pool, or taken from the plot cache; see modules/chartRenderer.py
+        # Only the first ``shown`` charts are added to the report, the rest are drawn for the cache
+        images = renderCharts(charts)
         
-        for dataset in data:
-            label, x, y = dataset
-            plt.plot(x, y, label=label)
-                
-        plt.title(title)
-        plt.xlabel(xAxis)
-        plt.ylabel(yAxis)
-        plt.grid(color='gray', linestyle='dashdot', linewidth=1)
-        plt.legend()
-        
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close()
-        
-        buf.seek(0)
-        
-        plot_image = Image(buf, width=drawingWidth, height=drawingHeight)
-        
-        self.elements.append(plot_image)
-        
-        spacer = Spacer(0, 5)
-        self.elements.append(spacer)
-        
-        d = Drawing(500, 1)
-        line = Line(0, 0, 445, 0)
-        line.strokeColor = Color((0.0/255), (0.0/255), (0.0/255), 1)
-        line.strokeWidth = 0.5
-        d.add(line)
-        self.elements.append(d)
+        for chart, png in list(zip(charts, images))[:shown]:
+            drawingWidth, drawingHeight = chart[4], chart[5]
+            
+            spacer = Spacer(0, 10)
+            self.elements.append(spacer)
+            
+            plot_image = Image(BytesIO(png), width=drawingWidth, height=drawingHeight)
+            
+            self.elements.append(plot_image)
+            
+            spacer = Spacer(0, 5)
+            self.elements.append(spacer)
+            
+            d = Drawing(500, 1)
+            line = Line(0, 0, 445, 0)
+            line.strokeColor = Color((0.0/255), (0.0/255), (0.0/255), 1)
+            line.strokeWidth = 0.5
+            d.add(line)
+            self.elements.append(d)
         
     def addTable(self, data, headerLabels, createAverage=False, tableWidth=400, colRatios='Equal'):
         spacer = Spacer(0, 10)
@@ -0,0 +1,252 @@
+import os
+import sys
+import glob
+import json
+import shutil
+import threading
+
+import numpy as np
+
+from modules.dbHelpers import quoteIdentifier, fileFingerprint
+from modules.schemaAdapters import getSchemaAdapter
+from modules.sidecarIndex import CACHE_DIR_NAME, getSidecarIndex
+
+
+NON_NUMERIC_TYPES = ('TEXT', 'CHAR', 'CLOB', 'DATE', 'TIME')
+INDEX_DTYPE = [('testId', 'i8'), ('line', 'i8'), ('start', 'i8'), ('stop', 'i8')]
+
+
+def integralKey(column):
+    """SQL condition holding where ``column`` is NULL or a whole number that fits in int64."""
+    return (f"(typeof({column}) IN ('integer', 'null') "
+            f"OR (typeof({column}) = 'real' AND {column} = CAST({column} AS INTEGER)))")
+
+
+class CurveCache:
+    """
+    Columnar copy of a database's TestDetay table, stored as one ``.npy`` file per numeric
+    column plus an index of the row range each (test id, line) occupies.
+
+    Rows are sorted by test id and line, so the curve of one test is a contiguous range
+    and ``getCurve`` hands out slices of the memory-mapped arrays without copying. A cache
+    generation is named after the source file's size and mtime; when the file changes a
+    new generation is written and the old one removed.
+    """
+
+    def __init__(self, file_path):
+        self.sourcePath = os.path.abspath(file_path)
+
+        baseName = os.path.splitext(os.path.basename(self.sourcePath))[0]
+        self.root = os.path.join(os.path.dirname(self.sourcePath), CACHE_DIR_NAME, f'{baseName}.curves')
+
+        self.fingerprint = None
+        self.columns = []
+        self.arrays = {}
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self.hasLines = False
+        self.lock = threading.RLock()
+
+        self.refresh()
+
+    def generationPath(self, fingerprint):
+        return os.path.join(self.root, f'{fingerprint[0]}-{fingerprint[1]}')
+
+    def refresh(self):
+        """Opens the generation matching the source file, building it if needed."""
+        with self.lock:
+            fingerprint = fileFingerprint(self.sourcePath)
+            if fingerprint == self.fingerprint:
+                return False
+
+            path = self.generationPath(fingerprint)
+            if not os.path.exists(os.path.join(path, 'columns.json')):
+                self.build(path)
+
+            self.load(path)
+            self.fingerprint = fingerprint
+
+        for entry in glob.glob(os.path.join(self.root, '*')):
+            if os.path.abspath(entry) != os.path.abspath(path) and '.tmp' not in os.path.basename(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+        return True
+
+    def build(self, path):
+        cursor = getSidecarIndex(self.sourcePath).connection().cursor()
+        try:
+            self.write(path, cursor)
+        finally:
+            cursor.close()
+
+    def write(self, path, cursor):
+        adapter = getSchemaAdapter(self.sourcePath)
+        table = adapter.detailTables[0] if adapter.detailTables else None
+
+        columns, testIdColumn, lineColumn, rows = [], None, None, []
+        if table is not None:
+            cursor.execute(f"PRAGMA table_info({quoteIdentifier(table)});")
+            declared = [(row[1], (row[2] or '').upper()) for row in cursor.fetchall()]
+
+            testIdColumn = adapter.roles[table].get('testId')
+            lineColumn = adapter.roles[table].get('line')
+            columns = [name for name, declType in declared
+                       if name not in (testIdColumn, lineColumn) and not any(t in declType for t in NON_NUMERIC_TYPES)]
+
+        if testIdColumn is not None:
+            keys = [testIdColumn] + ([lineColumn] if lineColumn else [])
+            selected = keys + columns
+            # Test ids and lines are stored as int64, so rows whose key is fractional (a line
+            # 19.5 would become 19) or text (sorted after every number) are left out
+            cursor.execute(f"SELECT {', '.join(quoteIdentifier(c) for c in selected)} FROM {quoteIdentifier(table)} "
+                           f"WHERE {' AND '.join(integralKey(quoteIdentifier(k)) for k in keys)} "
+                           f"ORDER BY {', '.join(quoteIdentifier(k) for k in keys)}, rowid;")
+            rows = cursor.fetchall()
+        else:
+            columns = []
+
+        def toArray(position, dtype, missing):
+            return np.fromiter(
+                (row[position] if isinstance(row[position], (int, float)) else missing for row in rows),
+                dtype=dtype, count=len(rows)
+            )
+
+        testIds = toArray(0, np.int64, -1)
+        lines = toArray(1, np.int64, -1) if lineColumn else np.full(len(rows), -1, dtype=np.int64)
+        offset = 2 if lineColumn else 1
+
+        if len(rows) > 0:
+            boundaries = np.flatnonzero((np.diff(testIds) != 0) | (np.diff(lines) != 0)) + 1
+            starts = np.concatenate(([0], boundaries))
+            stops = np.concatenate((boundaries, [len(rows)]))
+        else:
+            starts = stops = np.zeros(0, dtype=np.int64)
+
+        index = np.zeros(len(starts), dtype=INDEX_DTYPE)
+        index['testId'] = testIds[starts]
+        index['line'] = lines[starts]
+        index['start'] = starts
+        index['stop'] = stops
+
+        # Written to a scratch directory and renamed into place, so a reader in another
+        # process never sees a half written generation
+        tmpPath = f'{path}.tmp{os.getpid()}'
+        shutil.rmtree(tmpPath, ignore_errors=True)
+        os.makedirs(tmpPath)
+
+        np.save(os.path.join(tmpPath, 'index.npy'), index)
+        for position, column in enumerate(columns):
+            np.save(os.path.join(tmpPath, f'col{position}.npy'), toArray(position + offset, np.float64, np.nan))
+
+        with open(os.path.join(tmpPath, 'columns.json'), 'w', encoding='utf-8') as file:
+            json.dump({'table': table, 'columns': columns, 'hasLines': lineColumn is not None}, file, ensure_ascii=False)
+
+        try:
+            os.rename(tmpPath, path)
+        except OSError:
+            # Another process finished the same generation first
+            shutil.rmtree(tmpPath, ignore_errors=True)
+
+    def load(self, path):
+        with open(os.path.join(path, 'columns.json'), encoding='utf-8') as file:
+            info = json.load(file)
+
+        self.columns = info['columns']
+        self.hasLines = info['hasLines']
+        self.index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+        self.arrays = {
+            column.lower(): np.load(os.path.join(path, f'col{position}.npy'), mmap_mode='r')
+            for position, column in enumerate(self.columns)
+        }
+
+    def rowRange(self, testId, lineNum=None):
+        testIds = self.index['testId']
+        lo = np.searchsorted(testIds, testId, side='left')
+        hi = np.searchsorted(testIds, testId, side='right')
+        if lo == hi:
+            return None
+
+        if lineNum is not None and self.hasLines:
+            entries = self.index[lo:hi]
+            match = np.flatnonzero(entries['line'] == lineNum)
+            if len(match) == 0:
+                return None
+            entry = entries[match[0]]
+            return int(entry['start']), int(entry['stop'])
+
+        return int(self.index['start'][lo]), int(self.index['stop'][hi - 1])
+
+    def getCurve(self, testId, lineNum=None):
+        """
+        Returns {lower-cased column name: array} for one test (and line), as read-only
+        views into the cache. Returns an empty dict if the test has no detail rows.
+        """
+        with self.lock:
+            self.refresh()
+
+            rowRange = self.rowRange(int(testId), None if lineNum is None else int(lineNum))
+            if rowRange is None:
+                return {}
+
+            start, stop = rowRange
+            return {name: array[start:stop] for name, array in self.arrays.items()}
+
+    def getCurves(self, keys):
+        """
+        Returns the curves of several tests at once, under a single refresh of the cache:
+        [(test id, line, curve)] for every (test id, line) in ``keys``, with a test given
+        without a line standing for each of its lines. Tests without rows are left out.
+        """
+        with self.lock:
+            self.refresh()
+
+            curves = []
+            for testId, lineNum in keys:
+                testId = int(testId)
+                if lineNum is None and self.hasLines:
+                    lo, hi = np.searchsorted(self.index['testId'], [testId, testId + 1])
+                    lines = [int(line) for line in self.index['line'][lo:hi]]
+                else:
+                    lines = [None if lineNum is None else int(lineNum)]
+
+                for line in lines:
+                    rowRange = self.rowRange(testId, line)
+                    if rowRange is not None:
+                        start, stop = rowRange
+                        curves.append((testId, line, {name: array[start:stop] for name, array in self.arrays.items()}))
+            return curves
+
+
+_curveCaches = {}
+_buildLocks = {}
+_registryLock = threading.Lock()
+
+
+def getCurveCache(file_path):
+    """
+    Returns the shared curve cache of a database file. A cache is built under its own
+    file's lock, so building one does not hold up the others.
+    """
+    key = os.path.abspath(file_path)
+    with _registryLock:
+        cache = _curveCaches.get(key)
+        buildLock = _buildLocks.setdefault(key, threading.Lock())
+    if cache is not None:
+        return cache
+
+    with buildLock:
+        # Another thread may have built it while this one waited
+        with _registryLock:
+            cache = _curveCaches.get(key)
+        if cache is None:
+            cache = CurveCache(key)
+            with _registryLock:
+                _curveCaches[key] = cache
+    return cache
+
+
+if __name__ == "__main__":
+    # Prebuilds the caches, e.g. `python -m modules.curveCache databases`
+    for argument in sys.argv[1:] or ['databases']:
+        paths = glob.glob(os.path.join(argument, '*.db')) if os.path.isdir(argument) else [argument]
+        for db_path in paths:
+            cache = getCurveCache(db_path)
+            print(f"{db_path}: {len(cache.index)} curves, columns {cache.columns}")
@@ -0,0 +1,70 @@
+import sys
+import time
+
+import numpy as np
+
+from modules.app_settings import Settings
+from modules.curvePrep import cleanCurve, smoothCurve
+
+
+def commonGrid(curves, points):
+    """``points`` evenly spaced x values from the lowest to the highest x of all the curves."""
+    ranges = [(x[0], x[-1]) for x, _ in curves if len(x)]
+    if not ranges:
+        return np.zeros(0)
+    return np.linspace(min(low for low, _ in ranges), max(high for _, high in ranges), points)
+
+
+def overlayCurves(curves, points=None, smooth=True):
+    """
+    Puts [(x, y)] curves on shared axes: each is cleaned, sorted by x, smoothed like the
+    graphs of a single test and linearly interpolated onto one grid spanning them all.
+    Returns the grid and a (curves, points) float64 matrix, NaN where a curve has no data.
+    """
+    points = points or Settings.COMPARISON_GRID_POINTS
+    prepared = []
+    for x, y in curves:
+        x, y = cleanCurve(x, y)
+        if len(x) > 1 and np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind='stable')
+            x, y = x[order], y[order]
+        prepared.append((x, smoothCurve(y) if smooth else y))
+
+    grid = commonGrid(prepared, points)
+    matrix = np.full((len(prepared), len(grid)), np.nan)
+    for row, (x, y) in enumerate(prepared):
+        if len(x) == 0:
+            continue
+        lo, hi = np.searchsorted(grid, x[0], side='left'), np.searchsorted(grid, x[-1], side='right')
+        matrix[row, lo:hi] = np.interp(grid[lo:hi], x, y)
+    return grid, matrix
+
+
+def dataRange(values):
+    """Slice from the first to the last finite value, or None if there is none."""
+    finite = np.flatnonzero(np.isfinite(values))
+    if len(finite) == 0:
+        return None
+    return slice(int(finite[0]), int(finite[-1]) + 1)
+
+
+def benchmark(curves, repeat=5):
+    """Seconds overlayCurves takes for the curves, best of ``repeat``."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        overlayCurves(curves)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    # Cost of overlaying 24 VICAT runs of 30k points, e.g. `python -m modules.curveOverlay 24`
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    rng = np.random.default_rng(0)
+    curves = []
+    for run in range(count):
+        x = np.linspace(23.0 + run * 0.1, 160.0 - run * 0.2, 30000)
+        curves.append((x, np.exp((x - 150.0 - run * 0.3) / 12.0) + rng.normal(0.0, 0.005, len(x))))
+    print(f"{count} curves of 30000 points onto {Settings.COMPARISON_GRID_POINTS} x values: "
+          f"{benchmark(curves) * 1000:.1f} ms")
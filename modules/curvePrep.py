@@ -0,0 +1,99 @@
+import sys
+import time
+
+import numpy as np
+from scipy.signal import savgol_filter
+
+from modules.columnStore import floatArray
+
+
+SMOOTHING_WINDOW = 11
+SMOOTHING_POLYORDER = 2
+
+
+def cleanCurve(x, y):
+    """Returns x and y as float64 arrays of equal length without the points where either is missing."""
+    size = min(len(x), len(y))
+    x, y = floatArray(x[:size]), floatArray(y[:size])
+    valid = np.isfinite(x) & np.isfinite(y)
+    if valid.all():
+        return x, y
+    return x[valid], y[valid]
+
+
+def oddWindow(size, window=SMOOTHING_WINDOW, polyorder=SMOOTHING_POLYORDER):
+    """
+    Returns the (window, polyorder) to smooth ``size`` points with: the largest odd window
+    up to ``window`` that fits, or None when there are too few points to smooth.
+    """
+    if size <= 3:
+        return None
+    window = min(window, size if size % 2 else size - 1)
+    if window % 2 == 0:
+        window -= 1
+    return window, min(polyorder, window - 1)
+
+
+def smoothCurve(y, window=SMOOTHING_WINDOW, polyorder=SMOOTHING_POLYORDER):
+    """Savitzky-Golay smoothed copy of ``y``, or ``y`` itself if it is too short to smooth."""
+    fit = oddWindow(len(y), window, polyorder)
+    if fit is None:
+        return y
+    return savgol_filter(y, window_length=fit[0], polyorder=fit[1])
+
+
+def resampleCurve(x, y, points):
+    """Linearly interpolates a curve onto ``points`` evenly spaced x values."""
+    if len(x) < 2:
+        return x, y
+    if np.any(np.diff(x) < 0):
+        order = np.argsort(x, kind='stable')
+        x, y = x[order], y[order]
+    grid = np.linspace(x[0], x[-1], points)
+    return grid, np.interp(grid, x, y)
+
+
+def prepareCurve(x, y, smooth=True, points=None, window=SMOOTHING_WINDOW, polyorder=SMOOTHING_POLYORDER):
+    """
+    Prepares a curve for plotting: drops missing points, optionally resamples it onto
+    ``points`` evenly spaced x values, which is what the smoothing filter assumes, and
+    smooths it. Returns float64 (x, y) arrays.
+    """
+    x, y = cleanCurve(x, y)
+    if points is not None:
+        x, y = resampleCurve(x, y, points)
+    if smooth:
+        y = smoothCurve(y, window, polyorder)
+    return x, y
+
+
+def benchmark(x, y, repeat=20):
+    """Seconds prepareCurve takes per call on one curve, best of ``repeat``."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        prepareCurve(x, y)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    # Per-curve cost on a 30k-point curve, e.g. `python -m modules.curvePrep databases/VICAT.db`
+    points = 30000
+    if len(sys.argv) > 1:
+        from modules.curveCache import getCurveCache
+        curveCache = getCurveCache(sys.argv[1])
+        curveCache.refresh()
+        # All the VICAT lines end to end, repeated up to 30k points
+        temperature, penetration = curveCache.arrays['sıcaklık'], curveCache.arrays['batma']
+        repeats = -(-points // max(len(temperature), 1))
+        x, y = np.tile(temperature, repeats)[:points], np.tile(penetration, repeats)[:points]
+    else:
+        # A VICAT run: the bath heats at 50 °C/h while the needle slowly sinks, sampled with noise
+        x = np.linspace(23.0, 160.0, points)
+        y = np.exp((x - 160.0) / 12.0) + np.random.default_rng(0).normal(0.0, 0.005, points)
+    y = y.astype(object)
+    y[::97] = None
+
+    print(f"{len(x)} points: {benchmark(x, y) * 1000:.2f} ms per curve with missing values as objects, "
+          f"{benchmark(x, floatArray(y)) * 1000:.2f} ms from a float64 array")
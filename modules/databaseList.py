@@ -0,0 +1,267 @@
+import os
+import json
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QTimer
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate
+
+from modules.dbHelpers import fileFingerprint
+from modules.dbTasks import DatabaseSummaryTask
+from modules.sidecarIndex import CACHE_DIR_NAME
+
+
+SUMMARY_CACHE_NAME = 'summaries.json'
+SUMMARY_SAVE_DELAY = 1000
+
+
+def formatSize(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class SummaryCache:
+    """
+    Database summaries by file, kept in ``.cache/summaries.json`` so a restart does not
+    read every database again. A summary is only handed out while the file still has the
+    fingerprint it was computed for.
+    """
+
+    def __init__(self, directory):
+        self.path = os.path.join(os.path.abspath(directory), CACHE_DIR_NAME, SUMMARY_CACHE_NAME)
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, file_path):
+        summary = self.entries.get(os.path.abspath(file_path))
+        try:
+            if summary is not None and tuple(summary['fingerprint']) == fileFingerprint(file_path):
+                return summary
+        except OSError:
+            pass
+        return None
+
+    def put(self, file_path, summary):
+        self.entries[os.path.abspath(file_path)] = summary
+
+    def save(self):
+        self.entries = {path: summary for path, summary in self.entries.items() if os.path.exists(path)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file)
+        os.replace(temporary, self.path)
+
+
+class DatabaseListModel(QAbstractListModel):
+    """
+    The listed database files with a summary of each: instrument type, number of tests,
+    date range and file size.
+
+    A summary is read on a DatabaseSummaryTask the first time a view asks for it, unless
+    the SummaryCache still holds one for the file's fingerprint, so the list shows up at
+    once and fills in as the summaries arrive.
+    """
+
+    SummaryRole = Qt.UserRole + 1
+    SummaryTextRole = Qt.UserRole + 2
+
+    def __init__(self, directory, taskManager=None, nameFormatter=None, parent=None):
+        super().__init__(parent)
+        self.taskManager = taskManager
+        self.nameFormatter = nameFormatter
+
+        self.filePaths = []
+        self.summaries = {}
+        self.pending = {}
+        self.notes = {}
+
+        self.summaryCache = SummaryCache(directory)
+        self.saveTimer = QTimer(self)
+        self.saveTimer.setSingleShot(True)
+        self.saveTimer.setInterval(SUMMARY_SAVE_DELAY)
+        self.saveTimer.timeout.connect(self.summaryCache.save)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.filePaths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        file_path = self.filePaths[index.row()]
+        if role == Qt.DisplayRole:
+            name = os.path.splitext(os.path.basename(file_path))[0]
+            return self.nameFormatter(name) if self.nameFormatter else name
+        if role == Qt.UserRole:
+            return file_path
+        if role == self.SummaryRole:
+            return self.summary(file_path)
+        if role == self.SummaryTextRole:
+            return self.describe(self.summary(file_path))
+        if role == Qt.ToolTipRole:
+            key = os.path.abspath(file_path)
+            return "\n".join(text for text in (key, self.describe(self.summaries.get(key)), self.notes.get(key)) if text)
+        return None
+
+    def summary(self, file_path):
+        key = os.path.abspath(file_path)
+        summary = self.summaries.get(key)
+        if summary is None and key not in self.pending:
+            summary = self.summaryCache.get(key)
+            if summary is not None:
+                self.summaries[key] = summary
+            else:
+                self.requestSummary(key)
+        return summary
+
+    def requestSummary(self, key):
+        task = DatabaseSummaryTask(key)
+        task.signals.result.connect(self.onSummaryReady)
+        task.signals.finished.connect(self.onSummaryTaskFinished)
+        self.pending[key] = task
+        if self.taskManager is not None:
+            # Behind the page fetches of the open database
+            self.taskManager.start(task, priority=-1)
+        else:
+            task.run()
+
+    def onSummaryReady(self, task, summary):
+        if self.pending.get(task.filePath) is not task:
+            return
+
+        self.summaries[task.filePath] = summary
+        self.summaryCache.put(task.filePath, summary)
+        self.saveTimer.start()
+        self.emitChanged(task.filePath)
+
+    def onSummaryTaskFinished(self, task):
+        if self.pending.get(task.filePath) is not task:
+            return
+
+        del self.pending[task.filePath]
+        if task.filePath not in self.summaries:
+            # Not asked for again until the file changes
+            self.summaries[task.filePath] = {'error': True}
+            self.emitChanged(task.filePath)
+
+    @staticmethod
+    def describe(summary):
+        if summary is None:
+            return "Reading..."
+        if summary.get('error'):
+            return "Unreadable"
+
+        parts = [summary['testType']] if summary['testType'] else []
+        if summary['tests'] is not None:
+            parts.append(f"{summary['tests']} tests")
+        if summary['firstDate']:
+            parts.append(f"{str(summary['firstDate'])[:10]} - {str(summary['lastDate'])[:10]}")
+        parts.append(formatSize(summary['size']))
+        return " | ".join(parts)
+
+    def findRow(self, file_path):
+        key = os.path.abspath(file_path)
+        return next((row for row, path in enumerate(self.filePaths) if os.path.abspath(path) == key), -1)
+
+    def addDatabase(self, file_path):
+        """Lists a file unless it is listed already. Returns its index, or None if it was listed."""
+        if self.findRow(file_path) >= 0:
+            return None
+
+        row = len(self.filePaths)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.filePaths.append(file_path)
+        self.endInsertRows()
+        return self.index(row)
+
+    def removeDatabase(self, file_path):
+        row = self.findRow(file_path)
+        if row < 0:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.filePaths[row]
+        self.endRemoveRows()
+        self.invalidate(file_path, notify=False)
+
+    def invalidate(self, file_path, notify=True):
+        """Forgets the summary of a file that changed; it is read again when next shown."""
+        key = os.path.abspath(file_path)
+        self.summaries.pop(key, None)
+        task = self.pending.pop(key, None)
+        if task is not None:
+            task.cancel()
+        if notify:
+            self.emitChanged(key)
+
+    def setNote(self, file_path, note):
+        self.notes[os.path.abspath(file_path)] = note
+        self.emitChanged(file_path)
+
+    def emitChanged(self, file_path):
+        row = self.findRow(file_path)
+        if row >= 0:
+            self.dataChanged.emit(self.index(row), self.index(row))
+
+
+class DatabaseItemDelegate(QStyledItemDelegate):
+    """Paints a database of the list as a card with its name and summary."""
+
+    MARGIN = 5
+    PADDING = 8
+
+    COLORS = {
+        'normal': (QColor(52, 59, 72), QColor(44, 49, 58)),
+        'hover': (QColor(57, 65, 80), QColor(61, 70, 86)),
+        'selected': (QColor(189, 147, 249), QColor(170, 132, 255)),
+    }
+    NAME_COLOR = QColor(221, 221, 221)
+    SUMMARY_COLOR = QColor(170, 170, 170)
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.State_Selected:
+            background, border = self.COLORS['selected']
+        elif option.state & QStyle.State_MouseOver:
+            background, border = self.COLORS['hover']
+        else:
+            background, border = self.COLORS['normal']
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        painter.setPen(border)
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 5, 5)
+
+        textRect = rect.adjusted(self.PADDING, self.PADDING // 2, -self.PADDING, -self.PADDING // 2)
+        painter.setFont(self.nameFont(option))
+        painter.setPen(self.NAME_COLOR)
+        painter.drawText(textRect, Qt.AlignLeft | Qt.AlignTop, index.data(Qt.DisplayRole))
+        painter.setFont(option.font)
+        painter.setPen(self.SUMMARY_COLOR)
+        painter.drawText(textRect, Qt.AlignLeft | Qt.AlignBottom, index.data(DatabaseListModel.SummaryTextRole))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        nameMetrics = QFontMetrics(self.nameFont(option))
+        summaryMetrics = QFontMetrics(option.font)
+        width = max(nameMetrics.horizontalAdvance(index.data(Qt.DisplayRole)),
+                    summaryMetrics.horizontalAdvance(index.data(DatabaseListModel.SummaryTextRole)))
+        height = nameMetrics.height() + summaryMetrics.height()
+        return QSize(width + 2 * (self.MARGIN + self.PADDING), height + 2 * self.MARGIN + self.PADDING)
+
+    def onDataChanged(self, topLeft, bottomRight, roles=()):
+        # A summary that arrived changes the width of its card
+        for row in range(topLeft.row(), bottomRight.row() + 1):
+            self.sizeHintChanged.emit(topLeft.sibling(row, 0))
+
+    @staticmethod
+    def nameFont(option):
+        font = QFont(option.font)
+        font.setBold(True)
+        return font
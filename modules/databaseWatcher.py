@@ -0,0 +1,103 @@
+import glob
+import os
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+from modules.app_settings import Settings
+
+
+def fileState(file_path):
+    """Returns (inode, size, mtime) of a file, or None if it is gone."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class DatabaseWatcher(QObject):
+    """
+    Watches the databases directory, and every database file in it, for changes.
+
+    File system events come in bursts while a file is copied or written, so they only
+    restart a timer. Once things have been quiet for ``Settings.DB_WATCH_DEBOUNCE`` ms
+    every known file is stat'ed and compared with its previous state: a new file is
+    ``added``, a file with another inode or a smaller size is ``replaced``, and a file
+    that grew or was written in place is ``grown``. Unchanged files cost one stat call
+    and are never opened.
+    """
+
+    added = Signal(str)
+    removed = Signal(str)
+    replaced = Signal(str)
+    grown = Signal(str)
+
+    def __init__(self, directory, pattern='*.db', parent=None):
+        super().__init__(parent)
+        self.directory = os.path.abspath(directory)
+        self.pattern = pattern
+        self.states = {}
+        # Files added by hand from outside the directory
+        self.extraPaths = set()
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule)
+        self.watcher.fileChanged.connect(self.schedule)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(Settings.DB_WATCH_DEBOUNCE)
+        self.timer.timeout.connect(self.scan)
+
+        if os.path.isdir(self.directory):
+            self.watcher.addPath(self.directory)
+        for file_path in self.listFiles():
+            self.states[file_path] = fileState(file_path)
+        self.watchFiles()
+
+    def listFiles(self):
+        return [os.path.abspath(file_path) for file_path in glob.glob(os.path.join(self.directory, self.pattern))]
+
+    def watch(self, file_path):
+        """Starts tracking a database listed by hand, without reporting it as added."""
+        file_path = os.path.abspath(file_path)
+        if os.path.dirname(file_path) != self.directory:
+            self.extraPaths.add(file_path)
+        if file_path not in self.states:
+            self.states[file_path] = fileState(file_path)
+            self.watchFiles()
+
+    def watchFiles(self):
+        # The watcher drops a file that is deleted or replaced by a rename
+        watched = set(self.watcher.files())
+        missing = [file_path for file_path in self.states if file_path not in watched and os.path.exists(file_path)]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def schedule(self, path=None):
+        self.timer.start()
+
+    def scan(self):
+        current = set(self.listFiles()) | self.extraPaths
+
+        for file_path in sorted(current | set(self.states)):
+            old = self.states.get(file_path)
+            new = fileState(file_path) if file_path in current else None
+            if new == old:
+                continue
+
+            if new is None:
+                del self.states[file_path]
+                self.extraPaths.discard(file_path)
+                self.removed.emit(file_path)
+                continue
+
+            self.states[file_path] = new
+            if old is None:
+                self.added.emit(file_path)
+            elif new[0] != old[0] or new[1] < old[1]:
+                self.replaced.emit(file_path)
+            else:
+                self.grown.emit(file_path)
+
+        self.watchFiles()
@@ -0,0 +1,102 @@
+import os
+import re
+from urllib.request import pathname2url
+
+
+PUNCTUATION = r'[_\-\\p{P}\s]'
+TURKISH_LETTERS = str.maketrans('ıİşŞğĞüÜöÖçÇ', 'iIsSgGuUoOcC')
+
+
+def quoteIdentifier(name):
+    """Quotes a table or column name so it can be embedded in an SQL statement."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def stripPunctuation(string):
+    return re.sub(PUNCTUATION, '', string)
+
+
+def normalizeName(string):
+    """Strips punctuation and Turkish diacritics so 'Sıcaklık' matches 'Sicaklik'."""
+    return stripPunctuation(string.translate(TURKISH_LETTERS))
+
+
+def fileFingerprint(file_path):
+    """Size and modification time of a database file, used to notice rewrites."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def readOnlyUri(file_path, immutable=False):
+    uri = f"file:{pathname2url(os.path.abspath(file_path))}?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+
+def containsKeyword(name, keyword):
+    """Tells whether a table, column or file name contains the keyword, ignoring case, punctuation and diacritics."""
+    return normalizeName(keyword).lower() in normalizeName(name).lower()
+
+
+def sameName(name, other):
+    """Tells whether two names are the same, ignoring case, punctuation and diacritics."""
+    return normalizeName(name).lower() == normalizeName(other).lower()
+
+
+def findColumn(columns, keyword):
+    """Returns the first column whose normalized name contains the keyword."""
+    return next((column for column in columns if containsKeyword(column, keyword)), None)
+
+
+def whereClause(conditions):
+    return f" WHERE {' AND '.join(f'({condition})' for condition in conditions)}" if conditions else ""
+
+
+def keysetPageQuery(table_name, after, pageSize, where=None, params=(), sortColumn=None, descending=False):
+    """
+    Builds the keyset query for the page of rows after ``after``, optionally narrowed by
+    a WHERE condition with its own parameters.
+
+    Rows are ordered by ``sortColumn`` and then rowid, or by rowid alone without a sort
+    column, so ``after`` is the (value, rowid) of the last row read, or its rowid, or None
+    for the first page. NULLs come first ascending and last descending, as SQLite sorts
+    them. Seeking past the last key instead of using OFFSET keeps every page an index
+    range scan.
+    """
+    conditions = [where] if where else []
+    params = list(params)
+    direction, after_op = ("DESC", "<") if descending else ("ASC", ">")
+
+    if sortColumn is None:
+        if after is not None:
+            conditions.append(f"rowid {after_op} ?")
+            params.append(after)
+        order = f"rowid {direction}"
+    else:
+        key = quoteIdentifier(sortColumn)
+        if after is not None:
+            value, rowid = after
+            if value is None:
+                condition = f"{key} IS NULL AND rowid {after_op} ?"
+                params.append(rowid)
+                if not descending:
+                    condition = f"({condition}) OR {key} IS NOT NULL"
+            else:
+                # A row value comparison is a single range on an index of the sort column
+                condition = f"({key}, rowid) {after_op} (?, ?)"
+                params.extend((value, rowid))
+                if descending:
+                    condition += f" OR {key} IS NULL"
+            conditions.append(condition)
+        order = f"{key} {direction}, rowid {direction}"
+
+    query = f"SELECT rowid, * FROM {quoteIdentifier(table_name)}{whereClause(conditions)} ORDER BY {order} LIMIT ?;"
+    return query, tuple(params) + (pageSize,)
+
+
+def rowCountQuery(table_name, where=None, params=()):
+    return f"SELECT count(*) FROM {quoteIdentifier(table_name)}{whereClause([where] if where else [])};", tuple(params)
+
+
+def columnTypes(conn, table_name):
+    """Maps each column of a table to its declared type, e.g. 'REAL' or 'TEXT'."""
+    return {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({quoteIdentifier(table_name)});")}
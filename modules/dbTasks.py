@@ -0,0 +1,408 @@
+import time
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from modules.connectionPool import getConnection
+from modules.dbHelpers import quoteIdentifier, fileFingerprint, keysetPageQuery, rowCountQuery, columnTypes
+from modules.schemaAdapters import getSchemaAdapter
+from modules.searchIndex import getSearchIndex
+from modules.sidecarIndex import getSidecarIndex
+from modules.curveCache import getCurveCache
+from modules.queryCache import queryCache
+from modules.columnStore import columnArrays
+
+
+class TaskSignals(QObject):
+    # Every signal carries the emitting task so receivers can tell stale results apart
+    started = Signal(object, object)
+    rowsReady = Signal(object, object)
+    progress = Signal(object, int, int)
+    result = Signal(object, object)
+    error = Signal(object, str)
+    finished = Signal(object)
+
+
+class DatabaseTask(QRunnable):
+    """
+    Cancellable unit of database work run on the global QThreadPool.
+
+    Subclasses implement ``execute``, which runs on a worker thread with that thread's
+    pooled SQLite connection and reports back through ``signals``. Cancelling only sets a flag: the
+    task stops at the next batch and receivers ignore anything it still emits.
+    """
+
+    BATCH_SIZE = 500
+    description = "Loading"
+    # Tasks loading one database are cancelled when another database is selected
+    perDatabase = True
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.filePath = file_path
+        self.signals = TaskSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            if not self.cancelled:
+                self.execute()
+        except Exception as e:
+            self.signals.error.emit(self, str(e))
+        finally:
+            self.signals.finished.emit(self)
+
+    def execute(self):
+        raise NotImplementedError
+
+    def stream(self, cursor, key, total=0):
+        """Emits the cursor's rows in batches until it is exhausted or the task is cancelled."""
+        done = 0
+        while not self.cancelled:
+            rows = cursor.fetchmany(self.BATCH_SIZE)
+            if not rows:
+                break
+            done += len(rows)
+            self.signals.rowsReady.emit(self, (key, rows))
+            self.signals.progress.emit(self, done, total)
+        return done
+
+    def streamRows(self, rows, key):
+        """Emits rows that were already fetched in batches, like ``stream``."""
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            if self.cancelled:
+                break
+            batch = rows[start:start + self.BATCH_SIZE]
+            self.signals.rowsReady.emit(self, (key, batch))
+            self.signals.progress.emit(self, start + len(batch), len(rows))
+
+
+class PageFetchTask(DatabaseTask):
+    """Fetches the next page of a SQLiteTableModel, in its sort order and narrowed by its filter."""
+
+    def __init__(self, file_path, table_name, after, pageSize, loaded=0, total=None, where=None, params=(),
+                 sortColumn=None, descending=False):
+        super().__init__(file_path)
+        self.tableName = table_name
+        self.after = after
+        self.pageSize = pageSize
+        self.loaded = loaded
+        self.total = total
+        self.where = where
+        self.params = params
+        self.sortColumn = sortColumn
+        self.descending = descending
+        self.description = f"Loading {table_name}"
+
+    def execute(self):
+        conn = getConnection(self.filePath)
+        if self.total is None:
+            query, params = rowCountQuery(self.tableName, self.where, self.params)
+            self.total = queryCache.fetch(self.filePath, conn, query, params)[1][0][0]
+
+        query, params = keysetPageQuery(self.tableName, self.after, self.pageSize, self.where, self.params,
+                                        self.sortColumn, self.descending)
+        page = queryCache.fetch(self.filePath, conn, query, params)[1]
+
+        if not self.cancelled:
+            self.signals.progress.emit(self, self.loaded + len(page), self.total)
+            self.signals.result.emit(self, page)
+
+
+class DetailLoadTask(DatabaseTask):
+    """Streams the detail rows of one test (and line) from the sidecar index."""
+
+    def __init__(self, file_path, testId, lineNum=None):
+        super().__init__(file_path)
+        self.testId = testId
+        self.lineNum = lineNum
+        self.targets = {}
+        self.description = f"Loading details of test {testId}"
+
+    def execute(self):
+        # Taken before the sidecar copy catches up, see QueryCache.fetch
+        fingerprint = fileFingerprint(self.filePath)
+        adapter = getSchemaAdapter(self.filePath)
+        conn = getSidecarIndex(self.filePath).connection()
+        for table_name in adapter.detailTables:
+            if self.cancelled or table_name not in adapter.testTables:
+                continue
+
+            query, params = adapter.testQuery(table_name, self.testId, self.lineNum)
+            columns, rows = queryCache.fetch(self.filePath, conn, query, params, fingerprint)
+            types = columnTypes(conn, table_name)
+
+            self.signals.started.emit(self, (table_name, columns, types))
+            self.streamRows(rows, table_name)
+
+
+class CurveLoadTask(DatabaseTask):
+    """
+    Reads the given curve columns of one test as arrays, in the order given.
+
+    Curves are sliced out of the float array cache. ``tabular`` data, which is shown as
+    stored, and tests the cache does not hold are read from the first detail table
+    instead, typed by the columns' declared types.
+    """
+
+    def __init__(self, file_path, testType, testId, lineNum, columns, tabular=False):
+        super().__init__(file_path)
+        self.testType = testType
+        self.testId = testId
+        self.lineNum = lineNum
+        self.columns = columns
+        self.tabular = tabular
+        self.description = f"Loading curves of test {testId}"
+
+    def execute(self):
+        columns = None
+        if not self.tabular:
+            curve = getCurveCache(self.filePath).getCurve(self.testId, self.lineNum)
+            if curve:
+                columns = [curve.get(column.lower(), []) if column else [] for column in self.columns]
+        if columns is None:
+            columns = self.readTable()
+
+        if not self.cancelled:
+            self.signals.progress.emit(self, 1, 1)
+            self.signals.result.emit(self, columns)
+
+    def readTable(self):
+        fingerprint = fileFingerprint(self.filePath)
+        adapter = getSchemaAdapter(self.filePath)
+        table_name = adapter.detailTables[0] if adapter.detailTables else None
+        if table_name not in adapter.testTables:
+            return [[] for _ in self.columns]
+
+        conn = getSidecarIndex(self.filePath).connection()
+        query, params = adapter.testQuery(table_name, self.testId, self.lineNum)
+        columns, rows = queryCache.fetch(self.filePath, conn, query, params, fingerprint)
+        return columnArrays(columns, columnTypes(conn, table_name), rows, self.columns)
+
+
+class ComparisonLoadTask(DatabaseTask):
+    """
+    Reads the curves of several tests of one database to overlay them, in one lookup of
+    its curve cache. ``keys`` are (test id, line) pairs, a test without a line standing
+    for all of its lines. The result is [(test id, line, arrays of ``columns``)].
+    """
+
+    description = "Loading curves to compare"
+    # A comparison spans databases, so it is kept when another one is selected
+    perDatabase = False
+
+    def __init__(self, file_path, keys, columns):
+        super().__init__(file_path)
+        self.keys = keys
+        self.columns = columns
+
+    def execute(self):
+        curves = getCurveCache(self.filePath).getCurves(self.keys)
+        result = [(testId, lineNum, [curve.get(column.lower(), []) for column in self.columns])
+                  for testId, lineNum, curve in curves]
+
+        if not self.cancelled:
+            self.signals.progress.emit(self, 1, 1)
+            self.signals.result.emit(self, result)
+
+
+def lineKey(value):
+    # Line numbers are stored as integers or as integral reals
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class PrefetchTask(DatabaseTask):
+    """
+    Reads the detail rows of a test, and the curves of each of its lines, before they are
+    asked for. The result is {line: {'details': [(table, columns, types, rows)], 'curves':
+    {column: array}}} with an entry for every line of a VICAT test, or a single None entry
+    for a test without lines, and the file's fingerprint as ``fingerprint``.
+    """
+
+    description = "Prefetching test details"
+
+    def __init__(self, file_path, testId, withCurves=False):
+        super().__init__(file_path)
+        self.testId = testId
+        self.withCurves = withCurves
+        self.fingerprint = None
+
+    def execute(self):
+        # Taken first, so a file written meanwhile makes the entry stale rather than wrong
+        self.fingerprint = fileFingerprint(self.filePath)
+        adapter = getSchemaAdapter(self.filePath)
+        conn = getSidecarIndex(self.filePath).connection()
+
+        tables = []
+        lines = set()
+        for table_name in adapter.detailTables:
+            if self.cancelled or table_name not in adapter.testTables:
+                continue
+
+            query, params = adapter.testQuery(table_name, self.testId)
+            columns, rows = queryCache.fetch(self.filePath, conn, query, params, self.fingerprint)
+            rowsByLine = None
+            if 'line' in adapter.roles[table_name]:
+                position = columns.index(adapter.roles[table_name]['line'])
+                rowsByLine = {}
+                for row in rows:
+                    rowsByLine.setdefault(lineKey(row[position]), []).append(row)
+                lines.update(rowsByLine)
+            tables.append((table_name, columns, columnTypes(conn, table_name), rows, rowsByLine))
+
+        lines.discard(None)
+        entries = {}
+        for line in lines or [None]:
+            if self.cancelled:
+                return
+            details = [(table_name, columns, types, rows if rowsByLine is None else rowsByLine.get(line, []))
+                       for table_name, columns, types, rows, rowsByLine in tables]
+            curves = {}
+            if self.withCurves:
+                # Copied out of the memory map, so drawing never waits for the disk
+                curve = getCurveCache(self.filePath).getCurve(self.testId, line)
+                curves = {name: np.array(array) for name, array in curve.items()}
+            entries[line] = {'details': details, 'curves': curves}
+
+        if not self.cancelled:
+            self.signals.result.emit(self, entries)
+
+
+class DatabaseSummaryTask(DatabaseTask):
+    """Reads the instrument type, number of tests and date range of a database for the database list."""
+
+    description = "Reading database summaries"
+    perDatabase = False
+
+    def execute(self):
+        fingerprint = fileFingerprint(self.filePath)
+        adapter = getSchemaAdapter(self.filePath)
+        summary = {'fingerprint': fingerprint, 'size': fingerprint[0], 'testType': adapter.testType,
+                   'tests': None, 'firstDate': None, 'lastDate': None}
+
+        table_name = next((name for name in adapter.masterTables if 'testId' in adapter.roles[name]), None)
+        if table_name is not None:
+            roles = adapter.roles[table_name]
+            date = quoteIdentifier(roles['date']) if 'date' in roles else "NULL"
+            summary['tests'], summary['firstDate'], summary['lastDate'] = getConnection(self.filePath).execute(
+                f"SELECT count(DISTINCT {quoteIdentifier(roles['testId'])}), min({date}), max({date}) "
+                f"FROM {quoteIdentifier(table_name)};"
+            ).fetchone()
+
+        if not self.cancelled:
+            self.signals.result.emit(self, summary)
+
+
+class SearchIndexTask(DatabaseTask):
+    """Brings the full-text search index of a directory up to date with the listed databases."""
+
+    description = "Updating search index"
+    perDatabase = False
+
+    def __init__(self, directory, paths):
+        super().__init__(directory)
+        self.paths = paths
+
+    def execute(self):
+        written = getSearchIndex(self.filePath).update(self.paths, cancelled=lambda: self.cancelled)
+        if not self.cancelled:
+            self.signals.result.emit(self, written)
+
+
+class FanOutTask(DatabaseTask):
+    """
+    Runs a FanOutQuery on one database's sidecar index and streams its rows. The result
+    is the database's timing: rows returned, seconds to the first batch and in total.
+    """
+
+    perDatabase = False
+
+    def __init__(self, file_path, query):
+        super().__init__(file_path)
+        self.query = query
+        self.description = "Querying all databases"
+
+    def execute(self):
+        started = time.perf_counter()
+        timing = {'rows': 0, 'first': None, 'seconds': 0.0}
+
+        statement = self.query.statement(getSchemaAdapter(self.filePath))
+        if statement is not None:
+            cursor = getSidecarIndex(self.filePath).connection().cursor()
+            cursor.execute(*statement)
+            while not self.cancelled:
+                rows = cursor.fetchmany(self.BATCH_SIZE)
+                if not rows:
+                    break
+                if timing['first'] is None:
+                    timing['first'] = time.perf_counter() - started
+                timing['rows'] += len(rows)
+                self.signals.rowsReady.emit(self, (self.filePath, rows))
+            cursor.close()
+
+        timing['seconds'] = time.perf_counter() - started
+        if not self.cancelled:
+            self.signals.progress.emit(self, 1, 1)
+            self.signals.result.emit(self, timing)
+
+
+class TaskManager(QObject):
+    """
+    Starts DatabaseTasks on the global thread pool, or on the pool given, and keeps track
+    of them per database.
+    """
+
+    progressChanged = Signal(str, int, int)
+    idle = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self.tasks = {}
+
+    def start(self, task, priority=0, pool=None):
+        self.tasks.setdefault(task.filePath, set()).add(task)
+        task.signals.progress.connect(self.onTaskProgress)
+        task.signals.finished.connect(self.onTaskFinished)
+        (pool or self.pool).start(task, priority)
+        return task
+
+    def cancel(self, file_path):
+        for task in self.tasks.get(file_path, ()):
+            task.cancel()
+
+    def cancelAll(self):
+        for file_path in list(self.tasks):
+            self.cancel(file_path)
+
+    def cancelDatabaseTasks(self):
+        for tasks in self.tasks.values():
+            for task in tasks:
+                if task.perDatabase:
+                    task.cancel()
+
+    def isRunning(self, taskType):
+        return any(isinstance(task, taskType) for tasks in self.tasks.values() for task in tasks)
+
+    def isBusy(self):
+        return any(self.tasks.values())
+
+    def onTaskProgress(self, task, done, total):
+        if not task.cancelled:
+            self.progressChanged.emit(task.description, done, total)
+
+    def onTaskFinished(self, task):
+        tasks = self.tasks.get(task.filePath)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self.tasks[task.filePath]
+        if not self.isBusy():
+            self.idle.emit()
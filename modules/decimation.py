@@ -0,0 +1,69 @@
+import numpy as np
+
+from modules.app_settings import Settings
+
+
+def bucketEdges(size, buckets):
+    """Start of each of ``buckets`` index ranges splitting ``size`` points, and the end of the last one."""
+    return np.linspace(0, size, buckets + 1).astype(np.int64)
+
+
+def minMaxDecimate(x, y, target):
+    """
+    Keeps the lowest and highest point of each of ``target // 2`` buckets, in their
+    original order, so every peak and dip of the series survives.
+    """
+    size = len(y)
+    buckets = target // 2
+    if size <= target or buckets < 1:
+        return x, y
+
+    # Buckets of equal length, the last one padded with its own final value
+    length = -(-size // buckets)
+    padded = np.pad(y, (0, length * buckets - size), mode='edge').reshape(buckets, length)
+    offsets = np.arange(buckets) * length
+    keep = np.concatenate((padded.argmin(axis=1) + offsets, padded.argmax(axis=1) + offsets))
+    keep = np.unique(np.minimum(keep, size - 1))
+    return x[keep], y[keep]
+
+
+def lttbDecimate(x, y, target):
+    """
+    Largest-Triangle-Three-Buckets: keeps the first and last point and, from each bucket
+    in between, the point making the largest triangle with the point kept from the
+    previous bucket and the average of the next one. Keeps the shape of a curve, like
+    the softening knee of a VICAT run, with far fewer points.
+    """
+    size = len(y)
+    if size <= target or target < 3:
+        return x, y
+
+    edges = bucketEdges(size - 2, target - 2) + 1
+    # Averages of every bucket, and of the last point as the bucket after the last one
+    counts = np.diff(edges)
+    averageX = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts, x[-1])
+    averageY = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts, y[-1])
+
+    keep = np.empty(target, dtype=np.int64)
+    keep[0], keep[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(target - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # Twice the triangle areas, which is enough to compare them
+        areas = np.abs((x[previous] - averageX[bucket + 1]) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (averageY[bucket + 1] - y[previous]))
+        previous = start + int(areas.argmax())
+        keep[bucket + 1] = previous
+    return x[keep], y[keep]
+
+
+METHODS = {'lttb': lttbDecimate, 'minmax': minMaxDecimate}
+
+
+def pointsForWidth(pixels):
+    return max(int(pixels * Settings.PLOT_POINTS_PER_PIXEL), 3)
+
+
+def decimate(x, y, target, method=None):
+    """Reduces a series to about ``target`` points, see ``Settings.PLOT_DECIMATION``."""
+    return METHODS[method or Settings.PLOT_DECIMATION](np.asarray(x), np.asarray(y), int(target))
@@ -0,0 +1,215 @@
+import os
+from collections import deque
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThreadPool, Signal
+
+from modules.app_settings import Settings
+from modules.dbHelpers import quoteIdentifier, findColumn, whereClause
+from modules.dbTasks import FanOutTask
+from modules.testFilter import TestFilter
+
+
+class FanOutQuery:
+    """
+    A query asked of every registered database, phrased in schema adapter roles.
+
+    ``statement`` translates it for one database and returns (sql, params), or None if
+    that database cannot answer it. The SQL returns (date, test id, line, *columns) rows
+    ordered by date and test id, which is what the merge relies on.
+    """
+
+    columns = []
+
+    def statement(self, adapter):
+        raise NotImplementedError
+
+    @staticmethod
+    def selectList(columns):
+        return ", ".join(quoteIdentifier(column) if column else "NULL" for column in columns)
+
+
+class TestsBetween(FanOutQuery):
+    """All tests run between two dates (inclusive)."""
+
+    columns = ['Operator']
+
+    def __init__(self, dateFrom, dateTo):
+        self.testFilter = TestFilter(dateFrom=dateFrom, dateTo=dateTo)
+
+    def statement(self, adapter):
+        table_name = next((name for name in adapter.masterTables if {'testId', 'date'} <= adapter.roles[name].keys()), None)
+        if table_name is None:
+            return None
+
+        roles = adapter.roles[table_name]
+        where, params = self.testFilter.compile(adapter, table_name)
+        selected = self.selectList([roles['date'], roles['testId'], roles.get('line'), roles.get('operator')])
+        order = f"{quoteIdentifier(roles['date'])}, {quoteIdentifier(roles['testId'])}"
+        return f"SELECT {selected} FROM {quoteIdentifier(table_name)}{whereClause([where] if where else [])} ORDER BY {order};", params
+
+
+class FinalValueAbove(FanOutQuery):
+    """
+    Test lines whose last recorded value of a curve column is above a threshold, e.g.
+    ``FinalValueAbove("Sicaklik", 120)`` for the VICAT lines that ended above 120 degrees.
+    """
+
+    def __init__(self, keyword, threshold):
+        self.keyword = keyword
+        self.threshold = threshold
+        self.columns = [keyword]
+
+    def statement(self, adapter):
+        table_name = adapter.detailTables[0] if adapter.detailTables else None
+        roles = adapter.roles.get(table_name, {})
+        column = findColumn(adapter.tables.get(table_name, []), self.keyword)
+        if column is None or 'testId' not in roles:
+            return None
+
+        keys = ", ".join(quoteIdentifier(roles[role]) for role in ('testId', 'line') if role in roles)
+        selected = self.selectList([roles.get('date'), roles['testId'], roles.get('line'), column])
+        order = f"{quoteIdentifier(roles['date'])}, {quoteIdentifier(roles['testId'])}" if 'date' in roles else quoteIdentifier(roles['testId'])
+        # The last row written for each test line is the one with the largest rowid. The
+        # instruments write '' into numeric columns, and SQLite sorts text above every number
+        table = quoteIdentifier(table_name)
+        value = quoteIdentifier(column)
+        return (
+            f"SELECT {selected} FROM {table} WHERE rowid IN (SELECT max(rowid) FROM {table} GROUP BY {keys}) "
+            f"AND typeof({value}) IN ('integer', 'real') AND {value} > ? ORDER BY {order};",
+            (self.threshold,)
+        )
+
+
+_fanOutPool = None
+
+
+def getFanOutPool():
+    """Thread pool the fan-out queries share, bounded by Settings.FAN_OUT_THREADS."""
+    global _fanOutPool
+    if _fanOutPool is None:
+        _fanOutPool = QThreadPool()
+        _fanOutPool.setMaxThreadCount(Settings.FAN_OUT_THREADS)
+    return _fanOutPool
+
+
+class FanOutResultModel(QAbstractTableModel):
+    """
+    Merged, streaming result of a FanOutQuery run on several databases.
+
+    Each database runs the query on its own FanOutTask and hands back its rows, already
+    ordered by date, in batches. The batches are buffered per database and merged k-way:
+    the earliest buffered row is released into the model as soon as every database still
+    running has a buffered row to compare it with, so the view fills in date order while
+    slower databases are still working. ``timings`` holds each database's row count and
+    run time, ``errors`` the message of each database that failed.
+    """
+
+    finished = Signal(dict)
+
+    def __init__(self, query, parent=None):
+        super().__init__(parent)
+        self.query = query
+        self.headers = ['Database', 'Date', 'Test Id', 'Line'] + list(query.columns)
+
+        self.rows = []
+        self.tasks = []
+        self.buffers = {}
+        self.running = set()
+        self.timings = {}
+        self.errors = {}
+
+    def run(self, paths, taskManager):
+        self.cancel()
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
+        self.timings = {}
+        self.errors = {}
+
+        for path in paths:
+            task = FanOutTask(path, self.query)
+            task.signals.rowsReady.connect(self.onRowsReady)
+            task.signals.result.connect(self.onTaskTimed)
+            task.signals.error.connect(self.onTaskError)
+            task.signals.finished.connect(self.onTaskFinished)
+            self.tasks.append(task)
+            self.buffers[task.filePath] = deque()
+            self.running.add(task.filePath)
+            taskManager.start(task, pool=getFanOutPool())
+
+        if not self.tasks:
+            self.finished.emit(self.timings)
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        self.buffers = {}
+        self.running = set()
+
+    def isRunning(self):
+        return bool(self.running)
+
+    def onRowsReady(self, task, batch):
+        if task not in self.tasks:
+            return
+
+        name = os.path.basename(task.filePath)
+        _, rows = batch
+        self.buffers[task.filePath].extend((row[0] or '', (name,) + tuple(row)) for row in rows)
+        self.merge()
+
+    def onTaskTimed(self, task, timing):
+        if task in self.tasks:
+            self.timings[os.path.basename(task.filePath)] = timing
+
+    def onTaskError(self, task, message):
+        if task in self.tasks:
+            self.errors[os.path.basename(task.filePath)] = message
+
+    def onTaskFinished(self, task):
+        if task not in self.tasks:
+            return
+
+        self.running.discard(task.filePath)
+        self.merge()
+        if not self.running:
+            self.finished.emit(self.timings)
+
+    def merge(self):
+        released = []
+        while all(self.buffers[path] for path in self.running):
+            heads = [path for path, buffer in self.buffers.items() if buffer]
+            if not heads:
+                break
+            path = min(heads, key=lambda head: self.buffers[head][0][0])
+            released.append(self.buffers[path].popleft()[1])
+
+        if released:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(released) - 1)
+            self.rows.extend(released)
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return section + 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
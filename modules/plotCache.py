@@ -0,0 +1,164 @@
+import hashlib
+import os
+import threading
+
+import matplotlib
+import numpy as np
+from PySide6.QtGui import QPixmap, QPixmapCache
+
+from modules.app_settings import Settings
+from modules.columnStore import floatArray
+from modules.curvePrep import SMOOTHING_POLYORDER, SMOOTHING_WINDOW
+from modules.sidecarIndex import CACHE_DIR_NAME
+
+
+PLOT_CACHE_DIR_NAME = 'plots'
+# Next to the sidecar caches of the instrument databases, wherever the app is started from
+PLOT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'databases',
+                              CACHE_DIR_NAME, PLOT_CACHE_DIR_NAME)
+# Raised whenever the way graphs are drawn changes, so images drawn the old way are not reused
+PLOT_VERSION = 1
+STYLE_PARAMS = ('font.family', 'font.sans-serif', 'font.size', 'lines.linewidth', 'axes.prop_cycle',
+                'axes.facecolor', 'figure.facecolor', 'savefig.facecolor', 'text.color', 'axes.labelcolor')
+
+
+def styleKey():
+    """Everything besides the data and the plot's own settings that changes how it looks."""
+    return (PLOT_VERSION, matplotlib.__version__, Settings.PLOT_POINTS_PER_PIXEL, Settings.PLOT_DECIMATION,
+            SMOOTHING_WINDOW, SMOOTHING_POLYORDER,
+            tuple((name, repr(matplotlib.rcParams[name])) for name in STYLE_PARAMS))
+
+
+def contentKey(data, spec, style=None):
+    """
+    Digest of a plot's [(label, x, y)] data, ``spec`` (e.g. its kind, title and axis
+    labels) and style. Equal digests draw equal plots at any given size.
+    """
+    digest = hashlib.sha1(repr((spec, style or styleKey())).encode('utf-8'))
+    for label, x, y in data:
+        digest.update(repr(label).encode('utf-8'))
+        for values in (x, y):
+            values = np.ascontiguousarray(floatArray(values))
+            digest.update(repr(values.shape).encode('utf-8'))
+            digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def plotKey(content, width, height, dpi):
+    """Key of a plot with the given ``contentKey`` rendered at a size in pixels and a dpi."""
+    return f'{content}-{round(width)}x{round(height)}-{round(float(dpi), 2)}'
+
+
+class PlotCache:
+    """
+    Rendered plots, shared by the graphs on screen and the report's charts.
+
+    Plots are addressed by ``plotKey``, a digest of everything they are drawn from, so a
+    plot is only rendered once for a given size. Graphs on screen are kept as pixmaps in
+    Qt's QPixmapCache, limited to ``Settings.PLOT_CACHE_MAX_BYTES``, which may only be
+    used from the GUI thread; they never go through PNG, as encoding one on the paint
+    path costs more than rendering it again. With ``Settings.PLOT_CACHE_ON_DISK`` the
+    report's charts, which are PNG already, are also written to ``databases/.cache/plots``,
+    where they are found by later sessions and by reports running in any thread; the
+    least recently used images are removed once the directory grows over
+    ``Settings.PLOT_CACHE_DISK_MAX_BYTES``.
+    """
+
+    def __init__(self, directory=None, maxBytes=Settings.PLOT_CACHE_MAX_BYTES, onDisk=Settings.PLOT_CACHE_ON_DISK,
+                 maxDiskBytes=Settings.PLOT_CACHE_DISK_MAX_BYTES):
+        self.directory = directory or PLOT_CACHE_DIR
+        self.maxBytes = maxBytes
+        self.onDisk = onDisk
+        self.maxDiskBytes = maxDiskBytes
+        self.lock = threading.Lock()
+        self.limitSet = False
+
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+    def count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def pixmap(self, key, ratio=1.0):
+        """Returns the rendered plot ``key`` as a QPixmap from memory, or None. GUI thread only."""
+        self.setLimit()
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            self.count('misses')
+            return None
+        self.count('hits')
+        pixmap.setDevicePixelRatio(ratio)
+        return pixmap
+
+    def insertImage(self, key, image):
+        """Keeps a rendered QImage as the plot ``key`` in memory. GUI thread only."""
+        self.setLimit()
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def setLimit(self):
+        # The cache belongs to the QApplication, so its limit is set once one exists
+        if not self.limitSet:
+            QPixmapCache.setCacheLimit(self.maxBytes // 1024)
+            self.limitSet = True
+
+    def path(self, key, fileFormat):
+        return os.path.join(self.directory, f'{key}.{fileFormat}')
+
+    def read(self, key, fileFormat='png', counted=True):
+        """Returns the bytes of the plot ``key`` saved as ``fileFormat`` ('png' or 'svg'), or None."""
+        data = None
+        if self.onDisk:
+            path = self.path(key, fileFormat)
+            try:
+                with open(path, 'rb') as file:
+                    data = file.read()
+                # The time of the last use decides which images are removed first
+                os.utime(path)
+            except OSError:
+                data = None
+        if counted:
+            self.count('diskHits' if data is not None else 'misses')
+        return data
+
+    def write(self, key, fileFormat, data):
+        if not self.onDisk:
+            return
+        path = self.path(key, fileFormat)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f'{path}.{threading.get_ident()}.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+            self.pruneDisk()
+        except OSError:
+            pass
+
+    def pruneDisk(self):
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(('.png', '.svg'))]
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime_ns):
+            if total <= self.maxDiskBytes:
+                break
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.diskHits + self.misses
+            return {
+                'hits': self.hits,
+                'diskHits': self.diskHits,
+                'misses': self.misses,
+                'hitRate': (self.hits + self.diskHits) / lookups if lookups else 0.0,
+            }
+
+
+plotCache = PlotCache()
@@ -0,0 +1,267 @@
+import sys
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from modules.decimation import decimate, pointsForWidth
+from modules.plotCache import plotCache, plotKey
+
+
+class PlotCanvas(QWidget):
+    """
+    Live matplotlib plot in a widget.
+
+    The figure is rendered by Agg straight into a buffer that the widget paints as a
+    QImage, with no PNG encoding or decoding and no dependency on the Qt binding
+    matplotlib would pick for its own canvases. The render is kept and only redone when
+    the widget is resized or ``draw`` is called after the figure changed; zooming and
+    panning change the axes limits and call it.
+
+    The mouse wheel zooms the axes under the cursor around the cursor, dragging with the
+    left button pans them and a double click restores the limits they were drawn with.
+
+    Series added with ``plot`` are decimated to the width of their axes in pixels before
+    each render, from the points in view when x only increases, so zooming in brings
+    back the detail.
+
+    With a ``cacheKey``, the ``contentKey`` of what the figure shows, its unzoomed image is
+    shared through the plot cache: a graph drawn before at the same size is painted from
+    there and the figure is only laid out once it is zoomed or panned.
+    """
+
+    ZOOM_STEP = 0.8
+    DEFAULT_SIZE = QSize(800, 600)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.figure = Figure()
+        self.agg = FigureCanvasAgg(self.figure)
+
+        self.image = None
+        self.buffer = None
+        self.dirty = True
+        self.cacheKey = None
+        self.laidOutSize = None
+        self.homeLimits = {}
+        self.drag = None
+        # [line, x, y, view it was last decimated for, whether x only increases, decimation method]
+        self.series = []
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(320, 240)
+
+    def sizeHint(self):
+        return self.DEFAULT_SIZE
+
+    def plot(self, axes, x, y, method=None, **kwargs):
+        """
+        Plots a series on ``axes``, decimated to the axes' width in pixels when rendered,
+        with ``method`` or ``Settings.PLOT_DECIMATION``.
+        """
+        x, y = np.asarray(x), np.asarray(y)
+        # All the points until the first render, so the axes are scaled to the full series
+        line, = axes.plot(x, y, **kwargs)
+        increasing = len(x) < 2 or bool(np.all(np.diff(x) >= 0))
+        self.series.append([line, x, y, None, increasing, method])
+        return line
+
+    def decimateSeries(self):
+        for series in self.series:
+            line, x, y, view, increasing, method = series
+            axes = line.axes
+            xlim = axes.get_xlim() if increasing else None
+            newView = (xlim, round(axes.bbox.width))
+            if newView == view:
+                continue
+
+            start, stop = 0, len(x)
+            if increasing:
+                # One point on either side, so the line runs to the edges of the axes
+                start = max(int(np.searchsorted(x, min(xlim), side='left')) - 1, 0)
+                stop = min(int(np.searchsorted(x, max(xlim), side='right')) + 1, len(x))
+            line.set_data(*decimate(x[start:stop], y[start:stop], pointsForWidth(axes.bbox.width), method))
+            series[3] = newView
+
+    def draw(self):
+        """Renders the figure again before the next paint."""
+        self.dirty = True
+        self.update()
+
+    def pixelSize(self):
+        ratio = self.devicePixelRatioF()
+        return round(max(self.width(), 1) * ratio), round(max(self.height(), 1) * ratio), ratio
+
+    def atHome(self):
+        return all((axes.get_xlim(), axes.get_ylim()) == self.homeLimits[axes]
+                   for axes in self.figure.axes if axes in self.homeLimits)
+
+    def layout(self):
+        """Draws the figure at the widget's size, which places its axes for zooming and panning."""
+        width, height, ratio = self.pixelSize()
+        dpi = self.figure.get_dpi()
+        self.figure.set_size_inches(width / dpi, height / dpi)
+        self.decimateSeries()
+        self.agg.draw()
+        self.laidOutSize = (width, height, ratio)
+
+        for axes in self.figure.axes:
+            self.homeLimits.setdefault(axes, (axes.get_xlim(), axes.get_ylim()))
+
+    def ensureLayout(self):
+        if self.laidOutSize != self.pixelSize():
+            self.layout()
+
+    def render(self):
+        width, height, ratio = self.pixelSize()
+        key = None
+        if self.cacheKey is not None and self.atHome():
+            key = plotKey(self.cacheKey, width, height, self.figure.get_dpi() * ratio)
+            pixmap = plotCache.pixmap(key, ratio)
+            if pixmap is not None:
+                self.image, self.buffer = pixmap, None
+                self.dirty = False
+                return
+
+        self.layout()
+        # The image shares the renderer's buffer, which is kept alive until the next render
+        self.buffer = self.agg.buffer_rgba()
+        height, width = self.buffer.shape[:2]
+        self.image = QImage(self.buffer, width, height, width * 4, QImage.Format_RGBA8888)
+        self.image.setDevicePixelRatio(ratio)
+        if key is not None:
+            plotCache.insertImage(key, self.image)
+        self.dirty = False
+
+    def imageBytes(self):
+        if isinstance(self.image, QPixmap):
+            return self.image.width() * self.image.height() * self.image.depth() // 8
+        return self.image.sizeInBytes() if self.image is not None else 0
+
+    def paintEvent(self, event):
+        if self.dirty or self.image is None:
+            self.render()
+        painter = QPainter(self)
+        if isinstance(self.image, QPixmap):
+            painter.drawPixmap(0, 0, self.image)
+        else:
+            painter.drawImage(0, 0, self.image)
+        painter.end()
+
+    def resizeEvent(self, event):
+        self.dirty = True
+        super().resizeEvent(event)
+
+    def axesAt(self, position):
+        # A graph painted from the plot cache is only laid out once it is used
+        self.ensureLayout()
+        # Figure pixels count up from the bottom
+        ratio = self.devicePixelRatioF()
+        x, y = position.x() * ratio, (self.height() - position.y()) * ratio
+        for axes in self.figure.axes:
+            if axes.bbox.contains(x, y):
+                return axes, (x, y)
+        return None, (x, y)
+
+    def wheelEvent(self, event):
+        axes, point = self.axesAt(event.position())
+        if axes is None:
+            return
+
+        factor = self.ZOOM_STEP ** (event.angleDelta().y() / 120)
+        centerX, centerY = axes.transData.inverted().transform(point)
+        left, right = axes.get_xlim()
+        bottom, top = axes.get_ylim()
+        axes.set_xlim(centerX - (centerX - left) * factor, centerX + (right - centerX) * factor)
+        axes.set_ylim(centerY - (centerY - bottom) * factor, centerY + (top - centerY) * factor)
+        self.draw()
+        event.accept()
+
+    def mousePressEvent(self, event):
+        axes, point = self.axesAt(event.position())
+        if event.button() == Qt.LeftButton and axes is not None:
+            # Kept from the press, as the limits move while dragging
+            self.drag = (axes, axes.transData.inverted(), point, axes.get_xlim(), axes.get_ylim())
+            self.setCursor(Qt.ClosedHandCursor)
+
+    def mouseMoveEvent(self, event):
+        if self.drag is None:
+            return
+
+        axes, inverse, start, xlim, ylim = self.drag
+        _, point = self.axesAt(event.position())
+        (startX, startY), (x, y) = inverse.transform([start, point])
+        axes.set_xlim(xlim[0] - (x - startX), xlim[1] - (x - startX))
+        axes.set_ylim(ylim[0] - (y - startY), ylim[1] - (y - startY))
+        self.draw()
+
+    def mouseReleaseEvent(self, event):
+        if self.drag is not None:
+            self.drag = None
+            self.unsetCursor()
+
+    def mouseDoubleClickEvent(self, event):
+        axes, _ = self.axesAt(event.position())
+        if axes in self.homeLimits:
+            xlim, ylim = self.homeLimits[axes]
+            axes.set_xlim(xlim)
+            axes.set_ylim(ylim)
+            self.draw()
+
+
+def benchmark(drawCurves, repeat=5):
+    """
+    Compares a PlotCanvas with the previous path, pyplot saving a PNG that is decoded
+    into a QImage, for the curves ``drawCurves(axes)`` plots. Returns the seconds to the
+    first image and the bytes of image memory kept per graph for both.
+    """
+    from io import BytesIO
+    import matplotlib.pyplot as plt
+
+    def pngPath():
+        plt.figure(figsize=(8, 6))
+        drawCurves(plt.gca())
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', bbox_inches='tight')
+        plt.close()
+        image = QImage()
+        image.loadFromData(buffer.getvalue())
+        return image.sizeInBytes()
+
+    def canvasPath():
+        canvas = PlotCanvas()
+        canvas.resize(PlotCanvas.DEFAULT_SIZE)
+        drawCurves(canvas.figure.add_subplot())
+        canvas.render()
+        return canvas.imageBytes()
+
+    results = {}
+    for name, path in (('png', pngPath), ('canvas', canvasPath)):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = path()
+            timings.append(time.perf_counter() - started)
+        results[name] = (min(timings), size)
+    return results
+
+
+if __name__ == "__main__":
+    # e.g. `python -m modules.plotCanvas`
+    import numpy as np
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    x = np.linspace(23.0, 160.0, 30000)
+
+    def drawCurves(axes):
+        axes.plot(x, np.exp((x - 160.0) / 12.0), label='Batma')
+        axes.grid(color='gray', linestyle='dashdot', linewidth=1)
+        axes.legend()
+
+    for name, (seconds, size) in benchmark(drawCurves).items():
+        print(f"{name}: {seconds * 1000:.1f} ms to the first image, {size / 2**20:.2f} MB of image per graph")
@@ -0,0 +1,148 @@
+import os
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject
+
+from modules.app_settings import Settings
+from modules.columnStore import columnArrays
+from modules.dbHelpers import fileFingerprint
+from modules.dbTasks import PrefetchTask, lineKey
+
+
+class PrefetchCache:
+    """
+    LRU cache of prefetched tests, keyed by (database, test id).
+
+    Entries are weighed by an estimate of the memory their rows and curves hold and the
+    least recently used tests are dropped once the total goes over ``maxBytes``. An entry
+    is only handed out while its database still has the fingerprint it was read at.
+    """
+
+    BYTES_PER_VALUE = 32
+
+    def __init__(self, maxBytes=Settings.PREFETCH_CACHE_MAX_BYTES):
+        self.entries = OrderedDict()
+        self.maxBytes = maxBytes
+        self.totalBytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, key, fingerprint, entries):
+        self.remove(key)
+        size = self.estimateSize(entries)
+        self.entries[key] = (fingerprint, entries, size)
+        self.totalBytes += size
+
+        while self.totalBytes > self.maxBytes and len(self.entries) > 1:
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def get(self, key):
+        cached = self.entries.get(key)
+        if cached is not None:
+            try:
+                fresh = cached[0] == fileFingerprint(key[0])
+            except OSError:
+                fresh = False
+            if fresh:
+                self.entries.move_to_end(key)
+                return cached[1]
+            self.remove(key)
+        return None
+
+    def lookup(self, key, line):
+        entries = self.get(key)
+        entry = entries.get(lineKey(line)) if entries is not None else None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def remove(self, key):
+        cached = self.entries.pop(key, None)
+        if cached is not None:
+            self.totalBytes -= cached[2]
+
+    def estimateSize(self, entries):
+        size = 0
+        for entry in entries.values():
+            size += sum(len(rows) * len(columns) for _, columns, _, rows in entry['details']) * self.BYTES_PER_VALUE
+            size += sum(array.nbytes for array in entry['curves'].values())
+        return size
+
+
+class Prefetcher(QObject):
+    """
+    Reads the details and curves of the tests around the selected one in the background,
+    so "Get Details" and "Visualize" are served from memory. ``prefetch`` is called with
+    the tests worth having, most wanted first; the ones still being read for an earlier
+    selection and no longer wanted are cancelled.
+    """
+
+    def __init__(self, taskManager, parent=None):
+        super().__init__(parent)
+        self.taskManager = taskManager
+        self.cache = PrefetchCache()
+        self.tasks = {}
+
+    def prefetch(self, file_path, testIds, withCurves=False):
+        wanted = []
+        for testId in testIds:
+            try:
+                key = (os.path.abspath(file_path), int(testId))
+            except (TypeError, ValueError):
+                continue
+            if key not in wanted:
+                wanted.append(key)
+
+        for key in [key for key in self.tasks if key not in wanted]:
+            self.tasks.pop(key).cancel()
+
+        for position, key in enumerate(wanted):
+            # A task cancelled along with the database's other tasks is started again
+            if (key in self.tasks and not self.tasks[key].cancelled) or self.cache.get(key) is not None:
+                continue
+
+            task = PrefetchTask(key[0], key[1], withCurves)
+            task.signals.result.connect(self.onPrefetched)
+            task.signals.finished.connect(self.onTaskFinished)
+            self.tasks[key] = task
+            # Behind everything the user is waiting for, the selected test first
+            self.taskManager.start(task, priority=-1 if position == 0 else -2)
+
+    def cancel(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks = {}
+
+    def onPrefetched(self, task, entries):
+        key = (task.filePath, task.testId)
+        if self.tasks.get(key) is task:
+            self.cache.put(key, task.fingerprint, entries)
+
+    def onTaskFinished(self, task):
+        key = (task.filePath, task.testId)
+        if self.tasks.get(key) is task:
+            del self.tasks[key]
+
+    def details(self, file_path, testId, lineNum=None):
+        """Returns the prefetched [(table, columns, types, rows)] of a test, or None."""
+        entry = self.cache.lookup((os.path.abspath(file_path), int(testId)), lineNum)
+        return entry['details'] if entry is not None else None
+
+    def curves(self, file_path, testId, lineNum, columns, tabular=False):
+        """Returns the prefetched arrays of the given curve columns, or None; see CurveLoadTask for ``tabular``."""
+        entry = self.cache.lookup((os.path.abspath(file_path), int(testId)), lineNum)
+        if entry is None:
+            return None
+        if tabular:
+            if not entry['details']:
+                return None
+            _, names, types, rows = entry['details'][0]
+            return columnArrays(names, types, rows, columns)
+        if not entry['curves']:
+            return None
+        return [entry['curves'].get(column.lower(), []) if column else [] for column in columns]
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+from modules.app_settings import Settings
+from modules.dbHelpers import fileFingerprint
+from modules.sidecarIndex import CACHE_DIR_NAME
+
+
+QUERY_CACHE_DIR_NAME = 'queries'
+
+
+def normalizeSql(query):
+    """Collapses whitespace and drops the trailing semicolon, so equal queries share an entry."""
+    return re.sub(r'\s+', ' ', query).strip().rstrip(';').strip()
+
+
+def walFingerprint(file_path):
+    # Commits in WAL mode only touch the -wal file
+    try:
+        return fileFingerprint(file_path + '-wal')
+    except OSError:
+        return ()
+
+
+def estimateSize(columns, rows):
+    # A pointer per value plus the value itself; small ints and interned strings are overcounted
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(column) for column in columns)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class QueryCache:
+    """
+    Results of read queries, shared by every part of the application.
+
+    An entry is keyed by (database, normalized SQL, params, fingerprint of the database),
+    so a result is reused by anyone running the same query, the GUI or the report, for
+    as long as the file is unchanged, and is never handed out after it changed. Entries
+    are weighed by an estimate of their memory and the least recently used ones are
+    evicted once the total goes over ``maxBytes``. With ``Settings.QUERY_CACHE_ON_DISK``,
+    evicted results are pickled into the database's ``.cache/queries`` directory instead
+    of being dropped and read back from there on a later miss.
+    """
+
+    def __init__(self, maxBytes=Settings.QUERY_CACHE_MAX_BYTES, onDisk=Settings.QUERY_CACHE_ON_DISK,
+                 maxDiskBytes=Settings.QUERY_CACHE_DISK_MAX_BYTES):
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.sizes = {}
+        self.maxBytes = maxBytes
+        self.totalBytes = 0
+        self.onDisk = onDisk
+        self.maxDiskBytes = maxDiskBytes
+
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def makeKey(file_path, query, params, fingerprint):
+        return os.path.abspath(file_path), normalizeSql(query), tuple(params), tuple(fingerprint)
+
+    def fetch(self, file_path, conn, query, params=(), fingerprint=None):
+        """
+        Returns (columns, rows) of ``query`` run on ``conn``, a connection to ``file_path``
+        or to its sidecar copy, from the cache if possible. ``fingerprint`` should be taken
+        before the sidecar copy is brought up to date; by default it is taken now.
+        """
+        if fingerprint is None:
+            fingerprint = fileFingerprint(file_path)
+        key = self.makeKey(file_path, query, params, tuple(fingerprint) + walFingerprint(file_path))
+
+        result = self.get(key)
+        if result is not None:
+            return result
+
+        cursor = conn.execute(query, tuple(params))
+        columns = [description[0] for description in cursor.description] if cursor.description else []
+        result = (columns, cursor.fetchall())
+        self.put(key, result)
+        return result
+
+    def get(self, key):
+        with self.lock:
+            result = self.cache.get(key)
+            if result is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = self.readFromDisk(key)
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.diskHits += 1
+
+        self.put(key, result)
+        return result
+
+    def put(self, key, result):
+        size = estimateSize(*result)
+        evicted = []
+        with self.lock:
+            if key in self.cache:
+                self.totalBytes -= self.sizes[key]
+            self.cache[key] = result
+            self.cache.move_to_end(key)
+            self.sizes[key] = size
+            self.totalBytes += size
+
+            while self.totalBytes > self.maxBytes and len(self.cache) > 1:
+                oldKey, oldResult = self.cache.popitem(last=False)
+                self.totalBytes -= self.sizes.pop(oldKey)
+                self.evictions += 1
+                evicted.append((oldKey, oldResult))
+
+        for oldKey, oldResult in evicted:
+            self.writeToDisk(oldKey, oldResult)
+
+    def invalidate(self, file_path):
+        """Drops the results read from a database, e.g. after it was replaced."""
+        path = os.path.abspath(file_path)
+        with self.lock:
+            for key in [key for key in self.cache if key[0] == path]:
+                del self.cache[key]
+                self.totalBytes -= self.sizes.pop(key)
+
+    def diskPath(self, key):
+        # The fingerprint is checked inside the file, so a changed database overwrites its old results
+        digest = hashlib.sha1(repr(key[:3]).encode('utf-8')).hexdigest()
+        return os.path.join(os.path.dirname(key[0]), CACHE_DIR_NAME, QUERY_CACHE_DIR_NAME, f'{digest}.pickle')
+
+    def readFromDisk(self, key):
+        if not self.onDisk:
+            return None
+        try:
+            with open(self.diskPath(key), 'rb') as file:
+                storedKey, result = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None
+        return result if storedKey == key else None
+
+    def writeToDisk(self, key, result):
+        if not self.onDisk:
+            return
+        path = self.diskPath(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f'{path}.{threading.get_ident()}.tmp'
+            with open(temporary, 'wb') as file:
+                pickle.dump((key, result), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+            self.pruneDisk(os.path.dirname(path))
+        except OSError:
+            pass
+
+    def pruneDisk(self, directory):
+        entries = [entry for entry in os.scandir(directory) if entry.name.endswith('.pickle')]
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime_ns):
+            if total <= self.maxDiskBytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.diskHits + self.misses
+            return {
+                'entries': len(self.cache),
+                'bytes': self.totalBytes,
+                'maxBytes': self.maxBytes,
+                'hits': self.hits,
+                'diskHits': self.diskHits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': (self.hits + self.diskHits) / lookups if lookups else 0.0,
+            }
+
+
+queryCache = QueryCache()
@@ -0,0 +1,185 @@
+import os
+import threading
+
+from modules.connectionPool import getConnection
+from modules.dbHelpers import quoteIdentifier, containsKeyword, findColumn, fileFingerprint, sameName
+
+
+class SchemaAdapter:
+    """
+    Resolved schema of one instrument database.
+
+    The instruments name the same things differently (``TestId`` and ``Test_Id``,
+    ``Hat_Num`` and ``Hat_Numarasi``, ``TestDetay`` and ``Test_Detay``). An adapter
+    introspects its file once, maps tables and columns to canonical roles and prepares
+    the SQL run against them, so the GUI and the report only do dictionary lookups.
+
+    Roles are ``testId``, ``line``, ``date``, ``operator`` and ``standard``;
+    ``curveColumns`` holds the detail columns matching ``CURVE_KEYWORDS``, in the same
+    order, and ``searchColumns`` the free-text columns of each master table.
+    ``comparisonColumns`` are the (x, y) detail columns tests are overlaid by, matching
+    ``COMPARISON_KEYWORDS``, or None if the instrument's results are not curves.
+    """
+
+    testType = None
+    FILE_KEYWORD = None
+    CURVE_KEYWORDS = ()
+    # (x, y) curve overlaid when tests are compared, and the (title, x axis, y axis) of the graph
+    COMPARISON_KEYWORDS = None
+    COMPARISON_LABELS = None
+    # Keywords of each role, tried in order
+    ROLE_KEYWORDS = {
+        'testId': ("TestId",),
+        'line': ("Hat",),
+        'date': ("TestTarih", "TestBaslamaZamani"),
+        'operator': ("OperatorStr", "YapanStr"),
+        'standard': ("StandartAdi", "DeneyStandard", "Standart"),
+    }
+    # Names a column must have in full to take a role after the keywords, as other columns
+    # contain them too: 'Tarih' is the time of a detail row, but also ends 'Urun_Tarih'
+    ROLE_NAMES = {
+        'date': ("Tarih",),
+    }
+    # Sample descriptions, request numbers, operators and material codes
+    SEARCH_KEYWORDS = ("NumuneBilgisi", "NumuneTanimi", "NumuneKodu", "TalepNo", "OperatorStr", "YapanStr",
+                       "HammaddeKodu", "UrunKodu", "Aciklama")
+
+    def __init__(self, file_path, tables):
+        self.filePath = file_path
+        self.tables = tables
+
+        self.masterTables = [name for name in tables if containsKeyword(name, "TestAna")]
+        self.detailTables = [name for name in tables if containsKeyword(name, "TestDetay")]
+
+        self.roles = {name: self.resolveRoles(columns) for name, columns in tables.items()}
+        self.columnRoles = {}
+        for roles in self.roles.values():
+            for role, column in roles.items():
+                self.columnRoles.setdefault(column, role)
+        self.testTables = [name for name in tables if 'testId' in self.roles[name]]
+
+        detailColumns = tables[self.detailTables[0]] if self.detailTables else []
+        self.curveColumns = [findColumn(detailColumns, keyword) for keyword in self.CURVE_KEYWORDS]
+        self.comparisonColumns = None
+        if self.COMPARISON_KEYWORDS is not None:
+            self.comparisonColumns = tuple(findColumn(detailColumns, keyword) for keyword in self.COMPARISON_KEYWORDS)
+            if None in self.comparisonColumns:
+                self.comparisonColumns = None
+        self.searchColumns = {
+            name: [column for column in tables[name] if any(containsKeyword(column, keyword) for keyword in self.SEARCH_KEYWORDS)]
+            for name in self.masterTables
+        }
+
+        self.selectSql = {}
+        self.countSql = {}
+        for name in self.testTables:
+            self.prepareQueries(name)
+
+        self.indexCache = {}
+
+    @classmethod
+    def resolveRoles(cls, columns):
+        roles = {}
+        for role, keywords in cls.ROLE_KEYWORDS.items():
+            matches = [findColumn(columns, keyword) for keyword in keywords]
+            matches += [column for name in cls.ROLE_NAMES.get(role, ()) for column in columns if sameName(column, name)]
+            for column in matches:
+                if column is not None and column not in roles.values():
+                    roles[role] = column
+                    break
+        return roles
+
+    def prepareQueries(self, table_name):
+        roles = self.roles[table_name]
+        query = f"FROM {quoteIdentifier(table_name)} WHERE {quoteIdentifier(roles['testId'])} = ?"
+
+        for withLine in (False, True):
+            if withLine:
+                if 'line' not in roles:
+                    continue
+                query += f" AND {quoteIdentifier(roles['line'])} = ?"
+            self.selectSql[table_name, withLine] = f"SELECT * {query};"
+            self.countSql[table_name, withLine] = f"SELECT count(*) {query};"
+
+    def testQuery(self, table_name, testId, lineNum=None, count=False):
+        """
+        Returns the prepared (query, params) reading the rows of one test from a table,
+        narrowed to a line when the table has one. Raises ValueError if the table has no
+        test id column.
+        """
+        if table_name not in self.roles or 'testId' not in self.roles[table_name]:
+            raise ValueError(f"No test id column in table '{table_name}'")
+
+        withLine = lineNum is not None and 'line' in self.roles[table_name]
+        params = (int(testId), int(lineNum)) if withLine else (int(testId),)
+        return (self.countSql if count else self.selectSql)[table_name, withLine], params
+
+    def roleIndexes(self, columns):
+        """Maps each role to its position in ``columns``, e.g. the headers of a selected row."""
+        columns = tuple(columns)
+        indexes = self.indexCache.get(columns)
+        if indexes is None:
+            indexes = {}
+            for position, column in enumerate(columns):
+                role = self.columnRoles.get(column)
+                if role is not None:
+                    indexes.setdefault(role, position)
+            self.indexCache[columns] = indexes
+        return indexes
+
+
+class DscOitAdapter(SchemaAdapter):
+    testType = 'DSC-OIT'
+    FILE_KEYWORD = "DSCOIT"
+    CURVE_KEYWORDS = ("Numune", "Referans", "Watt", "TestSure")
+    COMPARISON_KEYWORDS = ("TestSure", "Watt")
+    COMPARISON_LABELS = ('Isı-Zaman Grafiği', 'Zaman [sn]', 'Isı [Watt]')
+
+
+class MfiAdapter(SchemaAdapter):
+    testType = 'MFI'
+    FILE_KEYWORD = "MFI"
+    CURVE_KEYWORDS = ("Agirlik", "Zaman", "MVR", "MFR")
+
+
+class VicatAdapter(SchemaAdapter):
+    testType = 'VICAT'
+    FILE_KEYWORD = "VICAT"
+    CURVE_KEYWORDS = ("Sicaklik", "Batma")
+    COMPARISON_KEYWORDS = ("Sicaklik", "Batma")
+    COMPARISON_LABELS = ('Sıcaklık-Batma Grafiği', 'Sıcaklık [°C]', 'Batma [mm]')
+
+
+ADAPTERS = [DscOitAdapter, MfiAdapter, VicatAdapter]
+
+
+def adapterClass(file_path):
+    """Picks the adapter from the file name; the last matching test type wins."""
+    matching = [adapter for adapter in ADAPTERS if containsKeyword(file_path, adapter.FILE_KEYWORD)]
+    return matching[-1] if matching else SchemaAdapter
+
+
+def introspect(file_path):
+    conn = getConnection(file_path)
+    names = [name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")]
+    return {name: [row[1] for row in conn.execute(f"PRAGMA table_info({quoteIdentifier(name)});")] for name in names}
+
+
+_adapters = {}
+_registryLock = threading.Lock()
+
+
+def getSchemaAdapter(file_path):
+    """Returns the schema adapter of a database file, introspecting it again only if the file changed."""
+    key = os.path.abspath(file_path)
+    fingerprint = fileFingerprint(key)
+
+    with _registryLock:
+        entry = _adapters.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+
+    adapter = adapterClass(key)(key, introspect(key))
+    with _registryLock:
+        _adapters[key] = (fingerprint, adapter)
+    return adapter
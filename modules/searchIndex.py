@@ -0,0 +1,172 @@
+import os
+import re
+import sqlite3
+import threading
+
+from modules.connectionPool import applyPragmas, getConnection
+from modules.dbHelpers import quoteIdentifier, fileFingerprint
+from modules.schemaAdapters import getSchemaAdapter
+from modules.sidecarIndex import CACHE_DIR_NAME, FULL_COPY_ROWS
+
+
+SEARCH_INDEX_NAME = 'search.fts.sqlite'
+SEARCH_LIMIT = 50
+
+
+class SearchHit:
+    def __init__(self, filePath, tableName, testId, lineNum, snippet, rank):
+        self.filePath = filePath
+        self.tableName = tableName
+        self.testId = testId
+        self.lineNum = lineNum
+        self.snippet = snippet
+        self.rank = rank
+
+    def __repr__(self):
+        return f"SearchHit({os.path.basename(self.filePath)}, {self.tableName}, {self.testId}, {self.lineNum})"
+
+
+class SearchIndex:
+    """
+    Full-text index over the test metadata of every database in a directory.
+
+    Each row of a master table (TestAna, Test_Ana, Test_Ana_Hat...) becomes one FTS5
+    document made of the columns the schema adapter lists in ``searchColumns`` (sample
+    description, request number, operator, material codes), tagged with its database,
+    table, test id and line. The index lives in ``.cache/search.fts.sqlite`` next to the
+    databases and is updated per table: rows past the indexed rowid are appended, and a
+    small table that changed is indexed again so edits to existing tests show up too.
+    """
+
+    def __init__(self, directory):
+        cacheDir = os.path.join(os.path.abspath(directory), CACHE_DIR_NAME)
+        os.makedirs(cacheDir, exist_ok=True)
+        self.path = os.path.join(cacheDir, SEARCH_INDEX_NAME)
+
+        self.lock = threading.RLock()
+        self.conn = applyPragmas(sqlite3.connect(self.path, isolation_level=None, check_same_thread=False))
+        self.conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS tests USING fts5("
+            "content, db UNINDEXED, table_name UNINDEXED, test_id UNINDEXED, line UNINDEXED, "
+            "tokenize='unicode61 remove_diacritics 2');"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS _search_sources ("
+            "db TEXT, table_name TEXT, size INTEGER, mtime INTEGER, last_rowid INTEGER, PRIMARY KEY (db, table_name));"
+        )
+
+    def update(self, paths, cancelled=lambda: False):
+        """
+        Brings the index up to date with ``paths`` and drops the databases no longer among
+        them. Returns the number of documents written.
+        """
+        paths = [os.path.abspath(path) for path in paths if os.path.exists(path)]
+        written = 0
+
+        with self.lock:
+            indexed = {db for db, in self.conn.execute("SELECT DISTINCT db FROM _search_sources;")}
+            for db in indexed - set(paths):
+                self.removeDatabase(db)
+
+            for path in paths:
+                if cancelled():
+                    break
+                written += self.updateDatabase(path)
+        return written
+
+    def updateDatabase(self, path):
+        fingerprint = fileFingerprint(path)
+        stored = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT table_name, size, mtime, last_rowid FROM _search_sources WHERE db = ?;", (path,))}
+        if stored and all((size, mtime) == fingerprint for size, mtime, _ in stored.values()):
+            return 0
+
+        adapter = getSchemaAdapter(path)
+        source = getConnection(path)
+        written = 0
+
+        self.conn.execute("BEGIN;")
+        try:
+            for table_name in stored.keys() - set(adapter.masterTables):
+                self.conn.execute("DELETE FROM tests WHERE db = ? AND table_name = ?;", (path, table_name))
+                self.conn.execute("DELETE FROM _search_sources WHERE db = ? AND table_name = ?;", (path, table_name))
+
+            for table_name in adapter.masterTables:
+                written += self.updateTable(path, fingerprint, adapter, source, table_name, stored.get(table_name))
+            self.conn.execute("COMMIT;")
+        except Exception:
+            self.conn.execute("ROLLBACK;")
+            raise
+        return written
+
+    def updateTable(self, path, fingerprint, adapter, source, table_name, stored):
+        roles = adapter.roles[table_name]
+        columns = adapter.searchColumns.get(table_name, [])
+        table = quoteIdentifier(table_name)
+
+        count, maxRowId = source.execute(f"SELECT count(*), max(rowid) FROM {table};").fetchone()
+        lastRowId = stored[2] if stored else None
+        if lastRowId is None or count <= FULL_COPY_ROWS or maxRowId is None or maxRowId < lastRowId:
+            self.conn.execute("DELETE FROM tests WHERE db = ? AND table_name = ?;", (path, table_name))
+            lastRowId = None
+
+        written = 0
+        if columns and 'testId' in roles and maxRowId is not None and (lastRowId is None or maxRowId > lastRowId):
+            keys = [roles['testId'], roles['line']] if 'line' in roles else [roles['testId']]
+            selected = ", ".join(quoteIdentifier(column) for column in keys + columns)
+            cursor = source.execute(
+                f"SELECT {selected} FROM {table} WHERE rowid > ? ORDER BY rowid;", (-1 if lastRowId is None else lastRowId,)
+            )
+            offset = len(keys)
+            documents = (
+                (" ".join(str(value) for value in row[offset:] if value not in (None, '')),
+                 path, table_name, row[0], row[1] if offset > 1 else None)
+                for row in cursor
+            )
+            written = self.conn.executemany(
+                "INSERT INTO tests (content, db, table_name, test_id, line) VALUES (?, ?, ?, ?, ?);", documents
+            ).rowcount
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO _search_sources (db, table_name, size, mtime, last_rowid) VALUES (?, ?, ?, ?, ?);",
+            (path, table_name, fingerprint[0], fingerprint[1], maxRowId)
+        )
+        return max(written, 0)
+
+    def removeDatabase(self, path):
+        self.conn.execute("DELETE FROM tests WHERE db = ?;", (path,))
+        self.conn.execute("DELETE FROM _search_sources WHERE db = ?;", (path,))
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """
+        Returns the best matching tests for ``text``, best first. Every word must match the
+        start of a word in the document, ignoring case and diacritics.
+        """
+        words = re.findall(r'\w+', text)
+        if not words:
+            return []
+
+        query = " AND ".join(f'"{word}"*' for word in words)
+        conn = getConnection(self.path)
+        rows = conn.execute(
+            "SELECT db, table_name, test_id, line, snippet(tests, 0, '[', ']', '...', 8), bm25(tests) "
+            "FROM tests WHERE tests MATCH ? ORDER BY bm25(tests) LIMIT ?;", (query, limit)
+        ).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+_searchIndexes = {}
+_registryLock = threading.Lock()
+
+
+def getSearchIndex(directory):
+    """Returns the shared search index of the databases in a directory."""
+    key = os.path.abspath(directory)
+    with _registryLock:
+        index = _searchIndexes.get(key)
+        if index is None:
+            index = _searchIndexes[key] = SearchIndex(key)
+    return index
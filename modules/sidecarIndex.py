@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+
+from modules.connectionPool import applyPragmas, getConnection
+from modules.dbHelpers import quoteIdentifier, fileFingerprint, readOnlyUri
+from modules.schemaAdapters import SchemaAdapter
+
+
+CACHE_DIR_NAME = '.cache'
+# Tables up to this size are copied again in full whenever the source changes, which also
+# picks up rows the instrument updates in place (e.g. a test's end time). Larger tables are
+# treated as append-only logs and only rows past the copied rowid are added.
+FULL_COPY_ROWS = 5000
+
+
+class SidecarIndex:
+    """
+    Indexed mirror of an instrument database.
+
+    The instrument software owns the files in ``databases/`` so no index can be added to
+    them. Instead every table is mirrored, with the same name, columns and rowids, into
+    ``.cache/<name>.idx.sqlite`` next to the source and indexed on its test id, line
+    number and date columns. Queries written against the source run unchanged on a
+    connection from ``connection``; ``conn`` itself is only used to keep the mirror current
+    and may be shared by several threads under ``lock``.
+    """
+
+    def __init__(self, file_path):
+        self.sourcePath = os.path.abspath(file_path)
+
+        cacheDir = os.path.join(os.path.dirname(self.sourcePath), CACHE_DIR_NAME)
+        os.makedirs(cacheDir, exist_ok=True)
+        baseName = os.path.splitext(os.path.basename(self.sourcePath))[0]
+        self.path = os.path.join(cacheDir, f'{baseName}.idx.sqlite')
+
+        self.lock = threading.RLock()
+        self.conn = applyPragmas(sqlite3.connect(self.path, uri=True, isolation_level=None, check_same_thread=False))
+        self.conn.execute("ATTACH DATABASE ? AS src;", (readOnlyUri(self.sourcePath),))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS _sidecar_meta (key TEXT PRIMARY KEY, value);")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS _sidecar_tables (name TEXT PRIMARY KEY, sql TEXT, last_rowid INTEGER);")
+
+        self.dataVersion = None
+        self.refresh()
+
+    def storedFingerprint(self):
+        meta = dict(self.conn.execute("SELECT key, value FROM _sidecar_meta;").fetchall())
+        if 'size' not in meta or 'mtime' not in meta:
+            return None
+        return meta['size'], meta['mtime']
+
+    def connection(self):
+        """Returns the calling thread's pooled read-only connection to the mirror."""
+        return getConnection(self.path)
+
+    def reattach(self):
+        """Attaches the source again after the file was replaced, so the mirror reads the new one."""
+        with self.lock:
+            self.conn.execute("DETACH DATABASE src;")
+            self.conn.execute("ATTACH DATABASE ? AS src;", (readOnlyUri(self.sourcePath),))
+            self.dataVersion = None
+
+    def refresh(self):
+        """Brings the mirror up to date. Returns True if the source had changed."""
+        with self.lock:
+            return self.sync()
+
+    def sync(self):
+        fingerprint = fileFingerprint(self.sourcePath)
+        dataVersion = self.conn.execute("PRAGMA src.data_version;").fetchone()[0]
+
+        if fingerprint == self.storedFingerprint() and dataVersion == self.dataVersion:
+            return False
+
+        self.conn.execute("BEGIN;")
+        try:
+            tables = self.conn.execute(
+                "SELECT name, sql FROM src.sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';"
+            ).fetchall()
+            for name, sql in tables:
+                self.syncTable(name, sql)
+
+            self.conn.executemany("INSERT OR REPLACE INTO _sidecar_meta (key, value) VALUES (?, ?);",
+                                  [('size', fingerprint[0]), ('mtime', fingerprint[1])])
+            self.conn.execute("COMMIT;")
+        except Exception:
+            self.conn.execute("ROLLBACK;")
+            raise
+
+        self.dataVersion = dataVersion
+        return True
+
+    def syncTable(self, name, sql):
+        table = quoteIdentifier(name)
+        columns = [row[1] for row in self.conn.execute(f"PRAGMA src.table_info({table});")]
+        columnList = ", ".join(quoteIdentifier(column) for column in columns)
+
+        stored = self.conn.execute("SELECT sql, last_rowid FROM _sidecar_tables WHERE name = ?;", (name,)).fetchone()
+        sourceCount, maxRowId = self.conn.execute(f"SELECT count(*), max(rowid) FROM src.{table};").fetchone()
+
+        rebuild = stored is None or stored[0] != sql or sourceCount <= FULL_COPY_ROWS
+        lastRowId = None if rebuild else stored[1]
+
+        if not rebuild and lastRowId is not None:
+            # Rows deleted or rewritten below the high-water mark mean the copy is stale
+            mirrorCount = self.conn.execute(f"SELECT count(*) FROM main.{table};").fetchone()[0]
+            sourceBelowMark = self.conn.execute(f"SELECT count(*) FROM src.{table} WHERE rowid <= ?;", (lastRowId,)).fetchone()[0]
+            if maxRowId is None or maxRowId < lastRowId or mirrorCount != sourceBelowMark:
+                rebuild = True
+                lastRowId = None
+
+        if rebuild:
+            self.conn.execute(f"DROP TABLE IF EXISTS main.{table};")
+            self.conn.execute(sql)
+
+        if maxRowId is not None and (lastRowId is None or maxRowId > lastRowId):
+            self.conn.execute(
+                f"INSERT INTO main.{table} (rowid, {columnList}) "
+                f"SELECT rowid, {columnList} FROM src.{table} WHERE rowid > ? ORDER BY rowid;",
+                (-1 if lastRowId is None else lastRowId,)
+            )
+
+        if rebuild:
+            self.createIndexes(name, columns)
+
+        self.conn.execute("INSERT OR REPLACE INTO _sidecar_tables (name, sql, last_rowid) VALUES (?, ?, ?);",
+                          (name, sql, maxRowId))
+
+    def createIndexes(self, name, columns):
+        table = quoteIdentifier(name)
+
+        roles = SchemaAdapter.resolveRoles(columns)
+        if 'testId' in roles:
+            keys = [roles['testId']] + ([roles['line']] if 'line' in roles else [])
+            keyList = ", ".join(quoteIdentifier(key) for key in keys)
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS main.{quoteIdentifier(name + '_test_idx')} ON {table} ({keyList});")
+
+        if 'date' in roles:
+            # Named after the column, so a mirror indexed before the date column changed gets a new index
+            dateIndex = quoteIdentifier(f"{name}_{roles['date']}_date_idx")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS main.{dateIndex} ON {table} ({quoteIdentifier(roles['date'])});")
+
+    def close(self):
+        self.conn.close()
+
+
+_sidecarIndexes = {}
+_buildLocks = {}
+_registryLock = threading.Lock()
+
+
+def getSidecarIndex(file_path):
+    """
+    Returns the shared, up to date sidecar index of a database file. A mirror is built
+    under its own file's lock, so building one does not hold up the others.
+    """
+    key = os.path.abspath(file_path)
+    with _registryLock:
+        index = _sidecarIndexes.get(key)
+        buildLock = _buildLocks.setdefault(key, threading.Lock())
+
+    if index is None:
+        with buildLock:
+            # Another thread may have built it while this one waited
+            with _registryLock:
+                index = _sidecarIndexes.get(key)
+            if index is None:
+                index = SidecarIndex(key)
+                with _registryLock:
+                    _sidecarIndexes[key] = index
+                return index
+    index.refresh()
+    return index
+
+
+def reattachSidecarIndex(file_path):
+    """Points an existing sidecar index at the file now at its source path."""
+    with _registryLock:
+        index = _sidecarIndexes.get(os.path.abspath(file_path))
+    if index is not None:
+        index.reattach()
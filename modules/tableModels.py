@@ -0,0 +1,391 @@
+import numpy as np
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from modules.columnStore import ColumnStore
+from modules.dbHelpers import quoteIdentifier, fileFingerprint, keysetPageQuery, rowCountQuery, columnTypes
+from modules.connectionPool import getConnection
+from modules.dbTasks import PageFetchTask
+from modules.queryCache import queryCache
+from modules.sidecarIndex import getSidecarIndex
+
+
+# Bounds of SQLite's rowids, to seek to the first or last row with a given key
+MIN_ROWID = -2 ** 63
+MAX_ROWID = 2 ** 63 - 1
+
+
+class SQLiteTableModel(QAbstractTableModel):
+    """
+    Read-only table model that pages the rows of an SQLite table in on demand.
+
+    Rows are fetched in pages of ``pageSize`` through ``canFetchMore``/``fetchMore``,
+    keyed on the table's rowid, so a view only pulls the rows that are scrolled into
+    sight. Loaded rows are kept in a ColumnStore, typed by the columns' declared types.
+
+    ``sort`` (called by the view when a header is clicked) pushes the order down to
+    SQLite: pages are then read by (sort column, rowid) keys, never by OFFSET. ``seek``
+    starts the rows at a key, e.g. a test id or date, and ``fetchPrevious`` pages in the
+    rows before it as the view is scrolled up.
+
+    Unsorted, the largest rowid loaded so far is the model's high-water mark; ``refresh``
+    uses it, together with the file's size, mtime and ``PRAGMA data_version``, to append
+    only the rows written since. A sorted model is loaded again instead.
+
+    Given a ``taskManager``, pages are read on the thread pool instead of the GUI thread;
+    ``canFetchMore`` stays False while a page is in flight so the view cannot ask twice.
+
+    ``setFilter`` narrows the model to the rows matching a WHERE condition. Filtered and
+    sorted pages are read from the indexed sidecar copy of the database, which keeps the
+    source's rowids, so paging and ``refresh`` work the same way.
+    """
+
+    PAGE_SIZE = 256
+    RawDataRole = Qt.UserRole + 1
+
+    def __init__(self, file_path, table_name, headerFormatter=None, pageSize=PAGE_SIZE, taskManager=None, parent=None):
+        super().__init__(parent)
+
+        self.filePath = file_path
+        self.tableName = table_name
+        self.pageSize = pageSize
+        self.taskManager = taskManager
+        self.pendingTask = None
+        self.totalRows = None
+
+        self.where = None
+        self.whereParams = ()
+        self.readPath = file_path
+
+        self.sortColumn = None
+        self.sortIndex = None
+        self.descending = False
+        # Key the rows start after, None when they start at the top of the table
+        self.startAfter = None
+
+        self.conn = getConnection(file_path)
+        cursor = self.conn.execute(f"SELECT * FROM {quoteIdentifier(table_name)} LIMIT 0;")
+        self.columns = [description[0] for description in cursor.description]
+        self.headers = [headerFormatter(column) for column in self.columns] if headerFormatter else list(self.columns)
+
+        self.store = ColumnStore(self.columns, columnTypes(self.conn, table_name))
+        self.firstKey = None
+        self.lastKey = None
+        self.atStart = True
+        self.atEnd = False
+
+        self.fingerprint = fileFingerprint(file_path)
+        self.dataVersion = self.conn.execute("PRAGMA data_version;").fetchone()[0]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role in (Qt.DisplayRole, self.RawDataRole):
+            return self.store.value(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return section + 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.atEnd and self.pendingTask is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        if self.taskManager is None:
+            self.appendPage(self.fetchPage())
+            return
+
+        task = PageFetchTask(self.readPath, self.tableName, self.lastKey, self.pageSize, len(self.store), self.totalRows,
+                             self.where, self.whereParams, self.sortColumn, self.descending)
+        task.signals.result.connect(self.onPageFetched)
+        task.signals.finished.connect(self.onPageTaskFinished)
+        self.pendingTask = task
+        self.taskManager.start(task)
+
+    def onPageFetched(self, task, page):
+        if task is not self.pendingTask:
+            return
+        self.pendingTask = None
+        self.totalRows = task.total
+        self.appendPage(page)
+
+    def onPageTaskFinished(self, task):
+        # A cancelled or failed fetch never delivers its page; let the view ask again
+        if task is self.pendingTask:
+            self.pendingTask = None
+
+    def cancelPending(self):
+        if self.pendingTask is not None:
+            self.pendingTask.cancel()
+            self.pendingTask = None
+
+    def appendPage(self, page):
+        if len(page) < self.pageSize:
+            self.atEnd = True
+        if not page:
+            return
+
+        first = len(self.store)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        # Page rows start with the rowid
+        self.store.extend(page, first=1)
+        if first == 0:
+            self.firstKey = self.pageKey(page[0])
+        self.lastKey = self.pageKey(page[-1])
+        self.endInsertRows()
+
+    def pageKey(self, pageRow):
+        return pageRow[0] if self.sortColumn is None else (pageRow[1 + self.sortIndex], pageRow[0])
+
+    def fetchPage(self):
+        query, params = keysetPageQuery(self.tableName, self.lastKey, self.pageSize, self.where, self.whereParams,
+                                        self.sortColumn, self.descending)
+        return queryCache.fetch(self.readPath, self.conn, query, params)[1]
+
+    def canFetchPrevious(self):
+        return not self.atStart and self.pendingTask is None
+
+    def fetchPrevious(self):
+        """Prepends the page of rows before the first one loaded. Returns how many were added."""
+        if not self.canFetchPrevious():
+            return 0
+
+        # The rows before a key are the rows after it in the opposite order
+        query, params = keysetPageQuery(self.tableName, self.firstKey if len(self.store) else self.startAfter, self.pageSize,
+                                        self.where, self.whereParams, self.sortColumn, not self.descending)
+        page = queryCache.fetch(self.readPath, self.conn, query, params)[1]
+        if len(page) < self.pageSize:
+            self.atStart = True
+        if not page:
+            return 0
+
+        # The cached page is shared, so it is reversed into a copy
+        page = page[::-1]
+        self.beginInsertRows(QModelIndex(), 0, len(page) - 1)
+        self.store.prepend(page, first=1)
+        self.firstKey = self.pageKey(page[0])
+        if self.lastKey == self.startAfter:
+            self.lastKey = self.pageKey(page[-1])
+        self.endInsertRows()
+        return len(page)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.setSort(self.columns[column] if 0 <= column < len(self.columns) else None, order == Qt.DescendingOrder)
+
+    def setSort(self, sortColumn, descending=False):
+        """Orders the rows by ``sortColumn`` in SQLite and loads them from the top; None restores table order."""
+        if (sortColumn, descending) == (self.sortColumn, self.descending):
+            return
+
+        self.sortColumn = sortColumn
+        self.sortIndex = self.columns.index(sortColumn) if sortColumn is not None else None
+        self.descending = descending and sortColumn is not None
+        self.startAfter = None
+        self.useReader()
+        self.reload()
+
+    def seek(self, column_name, value):
+        """
+        Sorts by ``column_name`` and starts the rows at the first one whose value is
+        ``value`` or comes after it, with a page of the rows before it. Returns the
+        position of that row, which equals ``rowCount`` when no row comes after it.
+        """
+        descending = self.descending if column_name == self.sortColumn else False
+        self.sortColumn = column_name
+        self.sortIndex = self.columns.index(column_name)
+        self.descending = descending
+        self.startAfter = (value, MAX_ROWID if descending else MIN_ROWID)
+        self.useReader()
+
+        self.clearRows()
+        self.appendPage(self.fetchPage())
+        return self.fetchPrevious()
+
+    def useReader(self):
+        # Filtered and sorted reads need the indexes of the sidecar copy
+        self.readPath = getSidecarIndex(self.filePath).path if self.where or self.sortColumn else self.filePath
+        self.conn = getConnection(self.readPath)
+        self.fingerprint = fileFingerprint(self.filePath)
+        self.dataVersion = self.conn.execute("PRAGMA data_version;").fetchone()[0]
+
+    def countRows(self):
+        """Counts the rows the model holds once fully loaded, i.e. the matches of the filter."""
+        query, params = rowCountQuery(self.tableName, self.where, self.whereParams)
+        self.totalRows = queryCache.fetch(self.readPath, self.conn, query, params)[1][0][0]
+        return self.totalRows
+
+    def setFilter(self, where=None, params=()):
+        """Shows only the rows matching ``where``; None shows the whole table again."""
+        self.cancelPending()
+        self.where = where or None
+        self.whereParams = tuple(params) if where else ()
+        self.startAfter = None
+        self.useReader()
+        self.reload()
+
+    def isFiltered(self):
+        return self.where is not None
+
+    def fetchAll(self):
+        """Loads the remaining rows synchronously, taking over from any page in flight."""
+        self.cancelPending()
+        while not self.atEnd:
+            self.appendPage(self.fetchPage())
+
+    def refresh(self):
+        """
+        Picks up rows written to the table since it was loaded and returns how many were
+        added. A table that was rewritten underneath the model is loaded again.
+        """
+        fingerprint = fileFingerprint(self.filePath)
+        if self.readPath != self.filePath and fingerprint != self.fingerprint:
+            # The sidecar copy has to catch up before rows can be read from it
+            getSidecarIndex(self.filePath)
+
+        dataVersion = self.conn.execute("PRAGMA data_version;").fetchone()[0]
+        if fingerprint == self.fingerprint and dataVersion == self.dataVersion:
+            return 0
+
+        previousSize = self.fingerprint[0]
+        self.fingerprint, self.dataVersion = fingerprint, dataVersion
+        self.totalRows = None
+
+        if self.sortColumn is not None:
+            # New rows may sort anywhere
+            self.reload()
+            return self.rowCount()
+
+        maxRowId = self.conn.execute(f"SELECT max(rowid) FROM {quoteIdentifier(self.tableName)};").fetchone()[0]
+        if self.lastKey is not None and (maxRowId is None or maxRowId < self.lastKey or fingerprint[0] < previousSize):
+            self.reload()
+            return self.rowCount()
+
+        if not self.atEnd:
+            # New rows arrive with the pages that are still to be fetched
+            return 0
+
+        before = len(self.store)
+        self.atEnd = False
+        self.fetchAll()
+        return len(self.store) - before
+
+    def reload(self):
+        self.clearRows()
+        self.fetchMore()
+
+    def clearRows(self):
+        self.cancelPending()
+        self.totalRows = None
+        self.beginResetModel()
+        self.store.clear()
+        self.firstKey = None
+        self.lastKey = self.startAfter
+        self.atStart = self.startAfter is None
+        self.atEnd = False
+        self.endResetModel()
+
+    def rowData(self, row):
+        return self.store.row(row)
+
+    def close(self):
+        # The connection belongs to the pool and stays open for the next model
+        self.cancelPending()
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """
+    Read-only table model over rows streamed in by a task, such as the detail rows of a
+    test, kept in a ColumnStore. ``sort`` reorders the loaded rows in memory by their
+    typed values, so numeric columns sort as numbers and not as text.
+    """
+
+    RawDataRole = Qt.UserRole + 1
+
+    def __init__(self, columns, declaredTypes=None, headerFormatter=None, parent=None):
+        super().__init__(parent)
+
+        self.columns = list(columns)
+        self.headers = [headerFormatter(column) for column in self.columns] if headerFormatter else list(self.columns)
+        self.store = ColumnStore(self.columns, declaredTypes)
+
+        self.sortIndex = None
+        self.descending = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role in (Qt.DisplayRole, self.RawDataRole):
+            return self.store.value(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return section + 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def appendRows(self, rows):
+        if not rows:
+            return
+
+        first = len(self.store)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.store.extend(rows)
+        self.endInsertRows()
+        if self.sortIndex is not None:
+            self.applySort()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not 0 <= column < len(self.columns):
+            return
+
+        self.sortIndex = column
+        self.descending = order == Qt.DescendingOrder
+        self.applySort()
+
+    def applySort(self):
+        self.layoutAboutToBeChanged.emit()
+        order = self.store.sort(self.sortIndex, self.descending)
+
+        # Selected rows move along with their values
+        positions = np.empty_like(order)
+        positions[order] = np.arange(len(order))
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [self.index(int(positions[index.row()]), index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+    def rowData(self, row):
+        return self.store.row(row)
@@ -0,0 +1,117 @@
+import datetime
+
+from modules.dbHelpers import quoteIdentifier
+
+
+# Test ids are SQLite integers, so every one fits in this many digits
+MAX_ID_DIGITS = 18
+
+
+def escapeLike(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def prefixRanges(prefix, maxDigits=MAX_ID_DIGITS):
+    """
+    Splits "integers starting with the digits of ``prefix``" into ranges, e.g. 12 up to
+    four digits gives 12-12, 120-129 and 1200-1299, so the match can use an index. The
+    ranges do not depend on the ids in the table, so a compiled filter also matches the
+    tests written after it.
+    """
+    digits = len(str(prefix))
+
+    ranges = [(prefix, prefix)]
+    if prefix > 0:
+        for extra in range(1, maxDigits - digits + 1):
+            scale = 10 ** extra
+            ranges.append((prefix * scale, (prefix + 1) * scale - 1))
+    return ranges
+
+
+class TestFilter:
+    """
+    Criteria of the Search and Filter panel.
+
+    ``compile`` turns them into a WHERE condition over the columns the schema adapter
+    resolved for a table, so filtering runs in SQLite against the indexed sidecar copy
+    and only matching rows reach the view. Test ids match as a prefix unless ``exactId``
+    is set; dates match the inclusive range ``dateFrom``..``dateTo``; operator and
+    standard match anywhere in the column.
+    """
+
+    def __init__(self, testId='', exactId=False, dateFrom=None, dateTo=None, operator='', standard='', lineNum=None):
+        self.testId = testId.strip()
+        self.exactId = exactId
+        self.lineNum = lineNum
+        self.dateFrom = dateFrom
+        self.dateTo = dateTo
+        self.operator = operator.strip()
+        self.standard = standard.strip()
+
+    def isEmpty(self):
+        return not (self.testId or self.dateFrom or self.dateTo or self.operator or self.standard or self.lineNum is not None)
+
+    def describe(self):
+        parts = []
+        if self.testId:
+            parts.append(f"Test ID {'=' if self.exactId else 'starts with'} {self.testId}")
+        if self.lineNum is not None:
+            parts.append(f"Line {self.lineNum}")
+        if self.dateFrom or self.dateTo:
+            parts.append(f"Date {self.dateFrom or '...'} - {self.dateTo or '...'}")
+        if self.operator:
+            parts.append(f"Operator '{self.operator}'")
+        if self.standard:
+            parts.append(f"Standard '{self.standard}'")
+        return ", ".join(parts)
+
+    def compile(self, adapter, table_name):
+        """
+        Returns (where, params) for ``table_name``. Raises ValueError if a criterion is
+        malformed or the table has no column for it.
+        """
+        roles = adapter.roles.get(table_name, {})
+        conditions, params = [], []
+
+        def column(role, label):
+            if role not in roles:
+                raise ValueError(f"{label} is not recorded in table '{table_name}'")
+            return quoteIdentifier(roles[role])
+
+        if self.testId:
+            if not self.testId.isdigit():
+                raise ValueError("Test ID must be a number")
+            if len(self.testId) > MAX_ID_DIGITS:
+                raise ValueError(f"Test ID has at most {MAX_ID_DIGITS} digits")
+
+            testIdColumn = column('testId', "Test ID")
+            if self.exactId:
+                conditions.append(f"{testIdColumn} = ?")
+                params.append(int(self.testId))
+            else:
+                ranges = prefixRanges(int(self.testId))
+                conditions.append(" OR ".join(f"{testIdColumn} BETWEEN ? AND ?" for _ in ranges))
+                params.extend(value for bounds in ranges for value in bounds)
+
+        if self.lineNum is not None:
+            conditions.append(f"{column('line', 'Line')} = ?")
+            params.append(int(self.lineNum))
+
+        if self.dateFrom or self.dateTo:
+            dateColumn = column('date', "Test date")
+            if self.dateFrom:
+                conditions.append(f"{dateColumn} >= ?")
+                params.append(self.dateFrom.isoformat())
+            if self.dateTo:
+                # Dates are stored as text, possibly followed by a time
+                conditions.append(f"{dateColumn} < ?")
+                params.append((self.dateTo + datetime.timedelta(days=1)).isoformat())
+
+        for role, label, text in (('operator', "Operator", self.operator), ('standard', "Standard", self.standard)):
+            if text:
+                conditions.append(f"{column(role, label)} LIKE ? ESCAPE '\\'")
+                params.append(f"%{escapeLike(text)}%")
+
+        if not conditions:
+            return None, ()
+        return " AND ".join(f"({condition})" for condition in conditions), tuple(params)
@@ -1155,7 +1155,7 @@ class Ui_MainWindow(object):
         self.verticalLayout_28.setSpacing(0)
         self.verticalLayout_28.setObjectName(u"verticalLayout_28")
         self.verticalLayout_28.setContentsMargins(0, 0, 0, 0)
-        self.listWidget = QListWidget(self.tableFrame)
+        self.listWidget = QListView(self.tableFrame)
         self.listWidget.setObjectName(u"listWidget")
         self.listWidget.setMaximumSize(QSize(16777215, 60))
         self.listWidget.setFlow(QListView.Flow.LeftToRight)
@@ -0,0 +1,32 @@
+import os
+import sqlite3
+import sys
+import types
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, ROOT)
+
+# modules/__init__.py builds the whole GUI, so the tests import the submodules from a bare package
+if "modules" not in sys.modules:
+    package = types.ModuleType("modules")
+    package.__path__ = [os.path.join(ROOT, "modules")]
+    sys.modules["modules"] = package
+
+
+@pytest.fixture
+def makeDatabase(tmp_path):
+    """Writes a database file named ``name`` from {table: (columns, rows)} and returns its path."""
+    def make(name, tables):
+        path = str(tmp_path / name)
+        conn = sqlite3.connect(path)
+        for table, (columns, rows) in tables.items():
+            conn.execute(f"CREATE TABLE {table} ({', '.join(columns)});")
+            conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))});", rows)
+        conn.commit()
+        conn.close()
+        return path
+    return make
@@ -0,0 +1,91 @@
+import sqlite3
+
+import numpy as np
+
+from modules.columnStore import ColumnStore, TypedColumn, columnKind
+
+
+def test_prepend_keeps_the_kind_when_the_values_fit():
+    column = TypedColumn('int')
+    column.extend((3, None, 4))
+    column.prepend((1, 2.0))
+    assert column.kind == 'int'
+    assert column.values() == [1, 2, 3, None, 4]
+    assert column.data.dtype == np.int64
+
+
+def test_prepend_demotes_only_for_values_the_kind_cannot_hold():
+    column = TypedColumn('int')
+    column.extend((3, 4))
+    column.prepend((1.5,))
+    assert column.kind == 'float'
+    assert column.values() == [1.5, 3.0, 4.0]
+
+    column.prepend(('x', None))
+    assert column.kind == 'object'
+    assert column.values() == ['x', None, 1.5, 3.0, 4.0]
+
+
+def test_extend_after_prepend_grows_the_array():
+    column = TypedColumn('float')
+    column.prepend((1.0, 2.0))
+    column.extend(tuple(float(value) for value in range(3, 100)))
+    assert column.size == 99
+    assert list(column.array()) == [float(value) for value in range(1, 100)]
+
+
+def test_demote_keeps_the_values_already_stored():
+    column = TypedColumn('int')
+    column.extend((1, None, 3))
+    column.extend((2.5,))
+    assert column.kind == 'float'
+    assert column.values() == [1.0, None, 3.0, 2.5]
+    column.extend(('x',))
+    assert column.kind == 'object'
+    assert column.values() == [1.0, None, 3.0, 2.5, 'x']
+
+
+def test_missing_values_do_not_demote():
+    column = TypedColumn('float')
+    column.extend((1.5, '', None, 2))
+    assert column.kind == 'float'
+    assert column.values() == [1.5, None, None, 2.0]
+
+
+def test_column_kinds_follow_sqlite_affinity():
+    assert [columnKind(declared) for declared in ('INTEGER', 'BIGINT', 'VARCHAR(20)', 'TEXT', 'REAL', 'DOUBLE', '', None, 'BLOB')] == \
+        ['int', 'int', 'text', 'text', 'float', 'float', 'object', 'object', 'object']
+
+
+def sortedRows(declared, values, descending=False):
+    store = ColumnStore(['value', 'position'], {'value': declared, 'position': 'INTEGER'})
+    store.extend([(value, position) for position, value in enumerate(values)])
+    order = store.sort(0, descending)
+    assert list(order) == [row[1] for row in map(store.row, range(len(store)))]
+    return [store.row(row)[0] for row in range(len(store))]
+
+
+def test_numeric_sort_puts_nulls_first():
+    assert sortedRows('REAL', [3.5, None, -1.0, 10.0, None, 2.0]) == [None, None, -1.0, 2.0, 3.5, 10.0]
+    assert sortedRows('INTEGER', [3, None, -1, 10, 2]) == [None, -1, 2, 3, 10]
+    assert sortedRows('INTEGER', [3, None, -1, 10, 2], descending=True) == [10, 3, 2, -1, None]
+
+
+def test_sort_is_stable_for_repeated_values():
+    store = ColumnStore(['value', 'position'], {'value': 'INTEGER', 'position': 'INTEGER'})
+    store.extend([(1, 0), (0, 1), (1, 2), (0, 3)])
+    store.sort(0)
+    assert [store.row(row) for row in range(4)] == [(0, 1), (0, 3), (1, 0), (1, 2)]
+
+
+def test_numbers_stored_as_text_sort_as_numbers():
+    assert sortedRows('TEXT', ['10', '9', None, '100', '9.5']) == [None, '9', '9.5', '10', '100']
+
+
+def test_mixed_values_sort_like_sqlite():
+    values = ['b', 3, None, 'a', 1.5, 'B']
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE t (value);")
+    conn.executemany("INSERT INTO t VALUES (?);", [(value,) for value in values])
+    assert sortedRows('', values) == [value for value, in conn.execute("SELECT value FROM t ORDER BY value;")]
+    conn.close()
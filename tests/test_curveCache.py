@@ -0,0 +1,40 @@
+import numpy as np
+
+from modules.curveCache import CurveCache
+
+
+def vicatDatabase(makeDatabase, rows):
+    return makeDatabase("VICAT.db", {
+        'Test_Ana': (['Test_Id', 'Tarih'], [(1, '2024-06-13'), (2, '2024-06-14')]),
+        'Test_Detay': (['Detail_Id', 'Test_Id', 'Hat_Numarasi', 'Sicaklik', 'Batma'], rows),
+    })
+
+
+def test_curves_are_sliced_by_test_and_line(makeDatabase):
+    path = vicatDatabase(makeDatabase, [
+        (1, 2, 1, 30.0, 0.1), (2, 1, 2, 20.0, 0.2), (3, 1, 1, 10.0, 0.3), (4, 1, 2, 21.0, 0.4),
+    ])
+    cache = CurveCache(path)
+    assert list(cache.getCurve(1, 2)['sicaklik']) == [20.0, 21.0]
+    assert list(cache.getCurve(1)['sicaklik']) == [10.0, 20.0, 21.0]
+    assert cache.getCurve(3) == {}
+
+
+def test_fractional_lines_are_not_merged_into_whole_ones(makeDatabase):
+    path = vicatDatabase(makeDatabase, [
+        (1, 1, 19, 10.0, 0.1), (2, 1, 19.5, 99.0, 0.2), (3, 1, 19.0, 11.0, 0.3),
+    ])
+    cache = CurveCache(path)
+    assert list(cache.getCurve(1, 19)['sicaklik']) == [10.0, 11.0]
+    assert list(cache.index['line']) == [19]
+
+
+def test_text_keys_are_left_out_and_the_index_stays_sorted(makeDatabase):
+    path = vicatDatabase(makeDatabase, [
+        (1, 2, 1, 30.0, 0.1), (2, '1', 1, 99.0, 0.2), (3, 1, 'x', 98.0, 0.3), (4, 1, 1, 10.0, 0.4),
+    ])
+    cache = CurveCache(path)
+    assert list(cache.index['testId']) == [1, 2]
+    assert np.all(np.diff(cache.index['testId']) >= 0)
+    assert list(cache.getCurve(1)['sicaklik']) == [10.0]
+    assert list(cache.getCurve(2, 1)['sicaklik']) == [30.0]
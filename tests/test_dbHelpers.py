@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+from modules.dbHelpers import containsKeyword, findColumn, keysetPageQuery
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE Test_Ana (Test_Id INTEGER, Operator TEXT);")
+    operators = ['b', None, 'a', 'b', None, 'c', 'a', None, 'b', 'c', 'a', None, 'd']
+    conn.executemany("INSERT INTO Test_Ana VALUES (?, ?);", enumerate(operators, 1))
+    conn.execute("CREATE INDEX operator ON Test_Ana (Operator);")
+    yield conn
+    conn.close()
+
+
+def readPages(conn, pageSize, sortColumn=None, descending=False, where=None, params=()):
+    """Every rowid, read a page at a time by seeking past the last key of the page before."""
+    rowids, after = [], None
+    while True:
+        query, queryParams = keysetPageQuery('Test_Ana', after, pageSize, where, params, sortColumn, descending)
+        rows = conn.execute(query, queryParams).fetchall()
+        rowids.extend(row[0] for row in rows)
+        if len(rows) < pageSize:
+            return rowids
+        last = rows[-1]
+        after = last[0] if sortColumn is None else (last[2], last[0])
+
+
+def ordered(conn, order, where="1"):
+    return [rowid for rowid, in conn.execute(f"SELECT rowid FROM Test_Ana WHERE {where} ORDER BY {order};")]
+
+
+@pytest.mark.parametrize('pageSize', [1, 2, 3, 5, 20])
+def test_pages_by_rowid(conn, pageSize):
+    assert readPages(conn, pageSize) == ordered(conn, "rowid")
+    assert readPages(conn, pageSize, descending=True) == ordered(conn, "rowid DESC")
+
+
+@pytest.mark.parametrize('pageSize', [1, 2, 3, 4, 20])
+def test_pages_by_a_column_with_nulls_and_repeated_values(conn, pageSize):
+    assert readPages(conn, pageSize, 'Operator') == ordered(conn, "Operator, rowid")
+    assert readPages(conn, pageSize, 'Operator', descending=True) == ordered(conn, "Operator DESC, rowid DESC")
+
+
+def test_pages_keep_to_the_where_condition(conn):
+    where = "Test_Id > ?"
+    assert readPages(conn, 2, 'Operator', where=where, params=(4,)) == ordered(conn, "Operator, rowid", "Test_Id > 4")
+    assert readPages(conn, 2, 'Operator', True, where, (4,)) == ordered(conn, "Operator DESC, rowid DESC", "Test_Id > 4")
+
+
+def test_column_names_match_without_case_punctuation_or_diacritics():
+    assert containsKeyword('Test_Detay', 'TestDetay')
+    assert containsKeyword('Sıcaklık', 'Sicaklik')
+    assert findColumn(['Detail_Id', 'Hat_Numarasi', 'Sıcaklık'], 'sicak') == 'Sıcaklık'
+    assert findColumn(['Detail_Id'], 'Batma') is None
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from modules.decimation import bucketEdges, decimate, lttbDecimate, minMaxDecimate, pointsForWidth
+
+
+def referenceLttb(x, y, target):
+    """Largest-Triangle-Three-Buckets written point by point, over the same buckets."""
+    edges = bucketEdges(len(y) - 2, target - 2) + 1
+    keep, previous = [0], 0
+    for bucket in range(target - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < target - 2:
+            nextStart, nextStop = edges[bucket + 1], edges[bucket + 2]
+            averageX, averageY = np.mean(x[nextStart:nextStop]), np.mean(y[nextStart:nextStop])
+        else:
+            averageX, averageY = x[-1], y[-1]
+        areas = [abs((x[previous] - averageX) * (y[point] - y[previous]) - (x[previous] - x[point]) * (averageY - y[previous]))
+                 for point in range(start, stop)]
+        previous = start + int(np.argmax(areas))
+        keep.append(previous)
+    keep.append(len(y) - 1)
+    return x[keep], y[keep]
+
+
+@pytest.fixture
+def curve():
+    x = np.linspace(23.0, 160.0, 10007)
+    y = np.exp((x - 150.0) / 12.0) + np.random.default_rng(0).normal(0.0, 0.05, len(x))
+    return x, y
+
+
+@pytest.mark.parametrize('target', [3, 4, 10, 333, 1000])
+def test_lttb_matches_the_point_by_point_algorithm(curve, target):
+    x, y = lttbDecimate(*curve, target)
+    expectedX, expectedY = referenceLttb(*curve, target)
+    assert len(x) == target
+    np.testing.assert_array_equal(x, expectedX)
+    np.testing.assert_array_equal(y, expectedY)
+
+
+def test_lttb_keeps_the_ends_and_the_order(curve):
+    x, y = lttbDecimate(*curve, 500)
+    assert (x[0], x[-1]) == (curve[0][0], curve[0][-1])
+    assert np.all(np.diff(x) > 0)
+
+
+@pytest.mark.parametrize('target', [2, 10, 301, 1000])
+def test_min_max_keeps_every_peak_and_dip(curve, target):
+    x, y = minMaxDecimate(*curve, target)
+    assert len(x) <= target
+    assert np.all(np.diff(x) > 0)
+    assert y.max() == curve[1].max() and y.min() == curve[1].min()
+
+    # Each bucket's lowest and highest point survive
+    buckets = target // 2
+    length = -(-len(curve[1]) // buckets)
+    for start in range(0, len(curve[1]), length):
+        values = curve[1][start:start + length]
+        assert values.min() in y and values.max() in y
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_short_series_are_left_alone(method):
+    x, y = np.arange(5.0), np.array([1.0, 3.0, 2.0, 5.0, 4.0])
+    decimatedX, decimatedY = decimate(x, y, 5, method)
+    np.testing.assert_array_equal(decimatedX, x)
+    np.testing.assert_array_equal(decimatedY, y)
+
+
+def test_points_for_width_never_drops_below_three():
+    assert pointsForWidth(0) == 3
+    assert pointsForWidth(400) >= 400
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+
+from modules import fanOutQuery
+from modules.fanOutQuery import FanOutResultModel, FinalValueAbove
+from modules.schemaAdapters import getSchemaAdapter
+
+
+VICAT_TABLES = {
+    'Test_Ana': (['Test_Id', 'Tarih'], [(1, '2024-06-13'), (2, '2024-06-14'), (3, '2024-06-15')]),
+    'Test_Detay': (['Detail_Id', 'Test_Id', 'Hat_Numarasi', 'Sicaklik', 'Tarih'], [
+        (1, 1, 1, 100.0, '2024-06-13'), (2, 1, 1, 130.0, '2024-06-13'),
+        (3, 1, 2, 150.0, '2024-06-13'), (4, 1, 2, 110.0, '2024-06-13'),
+        # The instruments leave numeric columns empty as ''
+        (5, 2, 1, 140.0, '2024-06-14'), (6, 2, 1, '', '2024-06-14'),
+        (7, 3, 1, 125, '2024-06-15'),
+    ]),
+}
+
+
+def finalValues(path, threshold):
+    sql, params = FinalValueAbove("Sicaklik", threshold).statement(getSchemaAdapter(path))
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_final_value_above_uses_the_last_row_of_each_line(makeDatabase):
+    path = makeDatabase("VICAT.db", VICAT_TABLES)
+    assert finalValues(path, 120) == [('2024-06-13', 1, 1, 130.0), ('2024-06-15', 3, 1, 125)]
+
+
+def test_final_value_above_skips_empty_text_values(makeDatabase):
+    path = makeDatabase("VICAT.db", VICAT_TABLES)
+    assert [row[1:3] for row in finalValues(path, 1e9)] == []
+    assert (2, 1) not in [row[1:3] for row in finalValues(path, 0)]
+
+
+def test_final_value_above_needs_the_column(makeDatabase):
+    path = makeDatabase("VICAT.db", VICAT_TABLES)
+    assert FinalValueAbove("Batma", 0).statement(getSchemaAdapter(path)) is None
+
+
+class IdleTaskManager:
+    """Takes the tasks without running them, so a test hands the model their rows itself."""
+
+    def start(self, task, priority=0, pool=None):
+        return task
+
+
+def startedModel(paths):
+    model = FanOutResultModel(fanOutQuery.TestsBetween(None, None))
+    model.run(paths, IdleTaskManager())
+    return model, {os.path.basename(task.filePath): task for task in model.tasks}
+
+
+def dates(model):
+    return [(row[0], row[1]) for row in model.rows]
+
+
+def test_rows_are_released_once_every_running_database_has_one():
+    model, tasks = startedModel(['/db/a.db', '/db/b.db', '/db/c.db'])
+    model.onRowsReady(tasks['a.db'], ('/db/a.db', [('2024-01-01', 1, None, ''), ('2024-01-05', 2, None, '')]))
+    model.onRowsReady(tasks['b.db'], ('/db/b.db', [('2024-01-02', 1, None, '')]))
+    assert model.rowCount() == 0
+
+    model.onRowsReady(tasks['c.db'], ('/db/c.db', [('2024-01-03', 1, None, ''), ('2024-01-04', 2, None, '')]))
+    assert dates(model) == [('a.db', '2024-01-01'), ('b.db', '2024-01-02')]
+
+    # b.db has nothing buffered, so nothing more can be released until it sends or finishes
+    model.onTaskFinished(tasks['b.db'])
+    assert dates(model) == [('a.db', '2024-01-01'), ('b.db', '2024-01-02'), ('c.db', '2024-01-03'), ('c.db', '2024-01-04')]
+
+
+def test_every_row_is_merged_by_date_when_the_databases_finish():
+    model, tasks = startedModel(['/db/a.db', '/db/b.db'])
+    finished = []
+    model.finished.connect(finished.append)
+    model.onRowsReady(tasks['a.db'], ('/db/a.db', [('2024-01-01', 1, None, ''), ('2024-01-03', 2, None, '')]))
+    model.onRowsReady(tasks['b.db'], ('/db/b.db', [(None, 7, None, ''), ('2024-01-02', 1, None, '')]))
+    model.onTaskFinished(tasks['a.db'])
+    assert not finished
+    model.onRowsReady(tasks['b.db'], ('/db/b.db', [('2024-01-04', 2, None, '')]))
+    model.onTaskFinished(tasks['b.db'])
+
+    assert dates(model) == [('b.db', None), ('a.db', '2024-01-01'), ('b.db', '2024-01-02'), ('a.db', '2024-01-03'), ('b.db', '2024-01-04')]
+    assert len(finished) == 1
+
+
+def test_rows_of_cancelled_runs_are_ignored():
+    model, tasks = startedModel(['/db/a.db'])
+    model.run(['/db/b.db'], IdleTaskManager())
+    model.onRowsReady(tasks['a.db'], ('/db/a.db', [('2024-01-01', 1, None, '')]))
+    assert model.rowCount() == 0
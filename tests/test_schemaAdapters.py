@@ -0,0 +1,25 @@
+from modules import fanOutQuery
+from modules.schemaAdapters import DscOitAdapter, MfiAdapter, VicatAdapter, getSchemaAdapter
+
+
+def test_date_role_is_the_test_date_not_the_product_date():
+    assert VicatAdapter.resolveRoles(['Test_Id', 'Test_Tarihi', 'Test_Baslama_Zamani'])['date'] == 'Test_Tarihi'
+    assert 'date' not in VicatAdapter.resolveRoles(['Test_Id', 'Hat_Num', 'Urun_Tarih'])
+    assert MfiAdapter.resolveRoles(['TestId', 'TestTarih'])['date'] == 'TestTarih'
+    assert DscOitAdapter.resolveRoles(['TestId', 'UrunTarih', 'TestBaslamaZamani', 'TestBitisZamani'])['date'] == 'TestBaslamaZamani'
+
+
+def test_detail_rows_are_dated_by_their_own_column():
+    roles = VicatAdapter.resolveRoles(['Detail_Id', 'Test_Id', 'Hat_Numarasi', 'Sıcaklık', 'Tarih'])
+    assert roles == {'testId': 'Test_Id', 'line': 'Hat_Numarasi', 'date': 'Tarih'}
+
+
+def test_tests_between_dates_uses_the_test_date(makeDatabase):
+    path = makeDatabase("VICAT.db", {
+        'Test_Ana': (['Test_Id', 'Test_Tarihi'], [(1, '2024-06-13')]),
+        'Test_Ana_Hat': (['Test_Id', 'Hat_Num', 'Urun_Tarih'], [(1, 1, '2022-09-13')]),
+    })
+    adapter = getSchemaAdapter(path)
+    assert adapter.roles['Test_Ana_Hat'].get('date') is None
+    sql, _ = fanOutQuery.TestsBetween(None, None).statement(adapter)
+    assert '"Test_Tarihi"' in sql and 'Urun_Tarih' not in sql
@@ -0,0 +1,81 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from modules.schemaAdapters import getSchemaAdapter
+from modules import testFilter as criteria
+from modules.testFilter import MAX_ID_DIGITS
+
+
+def matchingIds(path, testFilter):
+    where, params = testFilter.compile(getSchemaAdapter(path), 'Test_Ana')
+    conn = sqlite3.connect(path)
+    try:
+        return [testId for testId, in conn.execute(f"SELECT Test_Id FROM Test_Ana WHERE {where} ORDER BY Test_Id;", params)]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def vicatPath(makeDatabase):
+    ids = [1, 9, 99, 990, 9999, 123456789012345678, 999999999999999999]
+    return makeDatabase("VICAT.db", {'Test_Ana': (['Test_Id', 'Tarih'], [(testId, '2024-06-13') for testId in ids])})
+
+
+def test_the_longest_prefix_binds_as_an_sqlite_integer(vicatPath):
+    assert matchingIds(vicatPath, criteria.TestFilter('9' * MAX_ID_DIGITS)) == [999999999999999999]
+    assert matchingIds(vicatPath, criteria.TestFilter('123456789012345678', exactId=True)) == [123456789012345678]
+
+
+@pytest.mark.parametrize('exactId', [False, True])
+def test_longer_ids_are_rejected(vicatPath, exactId):
+    with pytest.raises(ValueError):
+        criteria.TestFilter('9' * (MAX_ID_DIGITS + 1), exactId=exactId).compile(getSchemaAdapter(vicatPath), 'Test_Ana')
+
+
+def test_prefix_ranges_cover_every_longer_id():
+    assert criteria.prefixRanges(12, 4) == [(12, 12), (120, 129), (1200, 1299)]
+    assert criteria.prefixRanges(12)[-1] == (12 * 10 ** 16, 13 * 10 ** 16 - 1)
+    assert criteria.prefixRanges(0) == [(0, 0)]
+
+
+def test_prefix_matches_ids_starting_with_the_digits(vicatPath):
+    assert matchingIds(vicatPath, criteria.TestFilter('9')) == [9, 99, 990, 9999, 999999999999999999]
+    assert matchingIds(vicatPath, criteria.TestFilter('99')) == [99, 990, 9999, 999999999999999999]
+    assert matchingIds(vicatPath, criteria.TestFilter('99', exactId=True)) == [99]
+
+
+def test_prefix_matches_ids_added_after_compiling(vicatPath):
+    where, params = criteria.TestFilter('99').compile(getSchemaAdapter(vicatPath), 'Test_Ana')
+    conn = sqlite3.connect(vicatPath)
+    try:
+        conn.execute("INSERT INTO Test_Ana VALUES (99123456, '2024-06-14');")
+        assert 99123456 in [testId for testId, in conn.execute(f"SELECT Test_Id FROM Test_Ana WHERE {where};", params)]
+    finally:
+        conn.close()
+
+
+def test_dates_match_the_inclusive_range(makeDatabase):
+    path = makeDatabase("VICAT.db", {'Test_Ana': (['Test_Id', 'Tarih'], [
+        (1, '2024-06-12 23:59:59'), (2, '2024-06-13'), (3, '2024-06-14 18:00:00'), (4, '2024-06-15'),
+    ])})
+    testFilter = criteria.TestFilter(dateFrom=datetime.date(2024, 6, 13), dateTo=datetime.date(2024, 6, 14))
+    assert matchingIds(path, testFilter) == [2, 3]
+
+
+def test_operator_matches_anywhere_with_like_characters_escaped(makeDatabase):
+    path = makeDatabase("VICAT.db", {'Test_Ana': (['Test_Id', 'Tarih', 'OperatorStr'], [
+        (1, '2024-06-13', 'Ali Veli'), (2, '2024-06-13', 'A_i'), (3, '2024-06-13', 'Ayşe'),
+    ])})
+    assert matchingIds(path, criteria.TestFilter(operator='li')) == [1]
+    assert matchingIds(path, criteria.TestFilter(operator='_')) == [2]
+
+
+def test_malformed_or_unrecorded_criteria_are_rejected(vicatPath):
+    adapter = getSchemaAdapter(vicatPath)
+    with pytest.raises(ValueError):
+        criteria.TestFilter('12a').compile(adapter, 'Test_Ana')
+    with pytest.raises(ValueError):
+        criteria.TestFilter(standard='ISO').compile(adapter, 'Test_Ana')
+    assert criteria.TestFilter().compile(adapter, 'Test_Ana') == (None, ())